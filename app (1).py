@@ -1,614 +1,355 @@
-import streamlit as st
 import pandas as pd
-import re
-from typing import Dict, List, Tuple
-from collections import defaultdict
+import numpy as np
+import hashlib
+import io
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
 
-def extract_instance_details(config_text: str, service: str) -> Dict:
-    """Extrai detalhes das instâncias do texto de configuração"""
-    details = {'quantidade': 1, 'tipo': 'N/A', 'specs': []}
-    
-    if "EC2" in service:
-        # Extrair tipo de instância EC2
-        instance_match = re.search(r'Instância do EC2 avançada \(([^)]+)\)|Advance EC2 instance \(([^)]+)\)', config_text)
-        if instance_match:
-            details['tipo'] = instance_match.group(1) or instance_match.group(2)
-        
-        # Extrair quantidade
-        qty_match = re.search(r'Número de instâncias: (\d+)|Number of instances: (\d+)', config_text)
-        if qty_match:
-            details['quantidade'] = int(qty_match.group(1) or qty_match.group(2))
-        
-        # Extrair Pricing strategy
-        pricing_match = re.search(r'Pricing strategy \(([^)]+)\)', config_text)
-        pricing_strategy = pricing_match.group(1) if pricing_match else 'N/A'
-        
-        # Extrair Sistema operacional
-        os_match = re.search(r'Sistema operacional \(([^)]+)\)|Operating system \(([^)]+)\)', config_text)
-        os_system = (os_match.group(1) or os_match.group(2)) if os_match else 'N/A'
-        
-        details['specs'] = [pricing_strategy, os_system]
+# Leitura, precificação e resumos ficam no pacote `calculadora` (sem Streamlit); este arquivo é só a interface
+from calculadora import (
+    DEFAULT_EXCHANGE_RATE,
+    DEFAULT_TAX_RATE,
+    DIFF_STATUSES,
+    DIFF_TOTAL_LABELS,
+    GLOBAL_PAYMENT_TYPES,
+    PAYMENT_OPTIONS,
+    PRICING_RULES,
+    SCENARIO_COLUMN_LABELS,
+    PerformanceLog,
+    SummaryZipWriter,
+    aggregate_services,
+    arrow_available,
+    assemble_services,
+    cli,
+    consolidate_accounts,
+    default_cache,
+    diff_quotes,
+    generate_diff_report,
+    generate_portfolio_summary,
+    generate_summary,
+    iter_parsed_uploads,
+    measure_stage,
+    parse_export_cached,
+    parse_rate_list,
+    portfolio_region_totals,
+    price_line_items,
+    price_rule,
+    pricing_options,
+    scenario_matrix,
+    summarize_processed,
+    summary_file_name,
+    line_item_columns,
+    write_line_items
+)
+
+# Limites do cache do Streamlit para as etapas de leitura e processamento dos uploads
+CACHE_MAX_ENTRIES = 16
+CACHE_TTL_SECONDS = 3600
+# Linhas por página da tabela de debug e tamanho máximo do texto de configuração exibido
+DEBUG_PAGE_SIZES = [50, 200, 1000]
+DEBUG_CONFIG_CHARS = 200
+
+def _parse_upload(file_hash: str, _file_bytes: bytes) -> Dict:
+    """Lê e normaliza o CSV enviado; em cache pelo hash do conteúdo (os bytes não entram na chave).
+    Entre sessões e reinícios, o cache em disco evita ler de novo uma exportação já vista."""
+    return parse_export_cached(_file_bytes, file_hash)
+
+def _price_upload(file_hash: str, rule: str, option: Optional[str], _line_items: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Preços de uma regra; em cache pelo hash do conteúdo, pela regra e pela opção de pagamento dela"""
+    return price_rule(_line_items, rule, option)
+
+def _debug_items(file_hash: str, payment_options: Tuple[str, str, str], _data: Dict) -> pd.DataFrame:
+    """Itens processados como tabela para o painel de debug; em cache pelo hash do conteúdo e pelas formas de pagamento"""
+    return pd.DataFrame(line_item_columns(_data))
+
+def comparison_table(on_demand_cost: float, total_no_upfront_annual: float, total_all_upfront: float) -> pd.DataFrame:
+    """Tabela de comparação dos custos anuais com a economia sobre o On Demand"""
+    comparison_data = {
+        'Tipo de Pagamento': ['On Demand', 'No Upfront', 'All Upfront'],
+        'Custo Anual (USD)': [f"${on_demand_cost:,.2f}", f"${total_no_upfront_annual:,.2f}", f"${total_all_upfront:,.2f}"],
+        'Economia vs On Demand': ['0%', '', '']
+    }
     
-    elif "RDS" in service or "Aurora" in service:
-        # Extrair tipo de instância RDS/Aurora
-        instance_match = re.search(r'Tipo de instância \(([^)]+)\)|Instance type \(([^)]+)\)', config_text)
-        if instance_match:
-            details['tipo'] = instance_match.group(1) or instance_match.group(2)
-        
-        # Extrair número de nós
-        nodes_match = re.search(r'Nós \((\d+)\)|Nodes \((\d+)\)', config_text)
-        if nodes_match:
-            details['quantidade'] = int(nodes_match.group(1) or nodes_match.group(2))
-        
-        # Extrair AZ
-        az_config = 'Single AZ'
-        if 'Multi' in config_text or 'multi' in config_text:
-            az_config = 'Multi AZ'
-        
-        # Extrair opção de compra
-        purchase_option = 'Reserved Instance'
-        if 'OnDemand' in config_text:
-            purchase_option = 'On Demand'
-        elif 'No Upfront' in config_text:
-            purchase_option = 'No Upfront'
-        elif 'All Upfront' in config_text:
-            purchase_option = 'All Upfront'
-        
-        # Extrair período
-        period = '1 ano'
-        if '3 year' in config_text.lower() or '3-year' in config_text.lower():
-            period = '3 anos'
-        
-        # Engine type - usar o nome completo do serviço
-        engine_type = service
-        
-        details['specs'] = [az_config, purchase_option, period, engine_type]
+    # Calcular economias
+    if on_demand_cost > 0:
+        if total_no_upfront_annual > 0:
+            no_upfront_savings = ((on_demand_cost - total_no_upfront_annual) / on_demand_cost) * 100
+            comparison_data['Economia vs On Demand'][1] = f"{no_upfront_savings:.1f}%"
+        
+        if total_all_upfront > 0:
+            all_upfront_savings = ((on_demand_cost - total_all_upfront) / on_demand_cost) * 100
+            comparison_data['Economia vs On Demand'][2] = f"{all_upfront_savings:.1f}%"
     
-    elif "ElastiCache" in service:
-        # Buscar por todos os tipos de instância (português e inglês)
-        instance_types = re.findall(r'Tipo de instância \(([^)]+)\)|Instance type \(([^)]+)\)', config_text)
-        # Buscar por todos os números de nós (português e inglês)
-        nodes_counts = re.findall(r'Nós \((\d+)\)|Nodes \((\d+)\)', config_text)
-        
-        # Normalizar os resultados (pegar o grupo não vazio)
-        instance_types = [match[0] or match[1] for match in instance_types]
-        nodes_counts = [int(match[0] or match[1]) for match in nodes_counts]
-        
-        # Combinar tipos de instância com número de nós
-        for i, instance_type in enumerate(instance_types):
-            if i < len(nodes_counts):
-                nodes = nodes_counts[i]
-                # Pegar a instância com nós > 0 e que não seja r6gd.12xlarge
-                if nodes > 0 and 'r6gd.12xlarge' not in instance_type:
-                    details['tipo'] = instance_type
-                    details['quantidade'] = nodes
-                    break
-        
-        # Extrair opção de compra
-        purchase_option = 'Reserved Instance'
-        if 'OnDemand' in config_text:
-            purchase_option = 'On Demand'
-        elif 'Heavy Utilization' in config_text:
-            purchase_option = 'Heavy Utilization'
-        elif 'No Upfront' in config_text:
-            purchase_option = 'No Upfront'
-        elif 'All Upfront' in config_text:
-            purchase_option = 'All Upfront'
-        
-        # Extrair período
-        period = '1 ano'
-        if '3 year' in config_text.lower() or '3-year' in config_text.lower():
-            period = '3 anos'
-        
-        # Mecanismo de cache - buscar especificamente por Valkey, Memcached ou Redis
-        cache_engine = 'Redis'  # padrão
-        if 'Valkey' in config_text:
-            cache_engine = 'Valkey'
-        elif 'Memcached' in config_text:
-            cache_engine = 'Memcached'
-        
-        details['specs'] = [purchase_option, period, cache_engine]
-    
-    elif "AWS Fargate" in service or "Fargate" in service:
-        # Extrair número de tarefas/pods
-        tasks_match = re.search(r'Número de tarefas ou pods \((\d+) por dia\)|Number of tasks or pods \((\d+) per day\)', config_text)
-        if tasks_match:
-            details['quantidade'] = int(tasks_match.group(1) if tasks_match.group(1) else tasks_match.group(2))
-        else:
-            # Fallback: buscar apenas o número
-            fallback_match = re.search(r'(\d+) por dia', config_text)
-            if fallback_match:
-                details['quantidade'] = int(fallback_match.group(1))
-        
-        # Extrair vCPU
-        vcpu_match = re.search(r'Quantidade de vCPU \(([\d.]+)\)|Amount of vCPU \(([\d.]+)\)', config_text)
-        vcpu = vcpu_match.group(1) or vcpu_match.group(2) if vcpu_match else '0.25'
-        
-        # Extrair memória
-        memory_match = re.search(r'Quantidade de memória alocada \((\d+) GB\)|Amount of memory allocated \((\d+) GB\)', config_text)
-        memory = memory_match.group(1) or memory_match.group(2) if memory_match else '1'
-        
-        # Extrair arquitetura
-        architecture = 'X86_64'
-        if 'ARM' in config_text:
-            architecture = 'ARM64'
-        
-        details['specs'] = [architecture]
-    
-    return details
-
-def load_csv_file(file_path_or_buffer) -> pd.DataFrame:
-    """Carrega o CSV lidando com a estrutura complexa do arquivo AWS"""
-    if hasattr(file_path_or_buffer, 'read'):
-        content = file_path_or_buffer.read().decode('utf-8-sig')
-        lines = content.split('\n')
-    else:
-        with open(file_path_or_buffer, 'r', encoding='utf-8-sig') as f:
-            lines = f.readlines()
-    
-    # Encontrar o início da seção "Estimativa detalhada" ou "Detailed Estimate"
-    start_idx = -1
-    for i, line in enumerate(lines):
-        if 'Estimativa detalhada' in line or 'Detailed Estimate' in line:
-            start_idx = i + 1
-            break
-    
-    if start_idx == -1:
-        raise ValueError("Seção 'Estimativa detalhada' ou 'Detailed Estimate' não encontrada")
-    
-    # Encontrar o fim dos dados
-    end_idx = len(lines)
-    for i in range(start_idx + 1, len(lines)):
-        if lines[i].strip() == '' or 'Confirmação' in lines[i] or 'Acknowledgement' in lines[i]:
-            end_idx = i
-            break
-    
-    # Extrair apenas as linhas de dados
-    data_lines = lines[start_idx:end_idx]
-    
-    # Criar DataFrame
-    from io import StringIO
-    csv_data = '\n'.join(data_lines)
-    df = pd.read_csv(StringIO(csv_data))
-    
-    return df
+    return pd.DataFrame(comparison_data)
 
-def process_csv(df: pd.DataFrame, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS", global_payment_type: str = "All Upfront") -> Dict:
-    """Processa o DataFrame e extrai informações relevantes"""
-    result = {
-        'client_name': '',
-        'account_id': '',
-        'services_by_region': defaultdict(lambda: defaultdict(list)),
-        'regions': set()
+def render_items_download(st, processed: List[Dict], lambda_payment_option: str, fargate_payment_option: str, global_payment_type: str, file_name: str) -> None:
+    """Botão de download dos itens processados em Parquet (precisa do pyarrow), para o pipeline de FinOps"""
+    if not arrow_available():
+        return
+    options = {
+        'lambda_payment_option': lambda_payment_option,
+        'fargate_payment_option': fargate_payment_option,
+        'global_payment_type': global_payment_type
     }
+    buffer = io.BytesIO()
+    write_line_items(buffer, processed, options, 'parquet')
+    st.download_button(
+        label="📥 Download dos Itens (Parquet)",
+        data=buffer.getvalue(),
+        file_name=file_name,
+        mime="application/vnd.apache.parquet",
+        use_container_width=True
+    )
+
+def summaries_zip(accounts: List[Dict], aggregations: List[Dict], failures: List[Tuple[str, str]], exchange_rate: float, tax_rate: float, lambda_payment_option: str, fargate_payment_option: str) -> bytes:
+    """ZIP com o resumo de cada conta do portfólio e o CSV de totais; os arquivos com erro entram só nos totais"""
+    buffer = io.BytesIO()
+    with SummaryZipWriter(buffer) as writer:
+        for data, aggregation in zip(accounts, aggregations):
+            result = summarize_processed(data, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option, aggregation)
+            writer.add(f"{data['client_name']} - {data['account_id']}", result)
+        for name, error in failures:
+            writer.add(name, {'erro': error})
+    return buffer.getvalue()
+
+def render_portfolio(st, uploaded_files: List, exchange_rate: float, tax_rate: float, lambda_payment_option: str, fargate_payment_option: str, global_payment_type: str) -> None:
+    """Vários CSVs (uma exportação por conta): leitura em paralelo e relatório consolidado por conta e região"""
+    files = [(uploaded_file.name, uploaded_file.getvalue()) for uploaded_file in uploaded_files]
+    hashes = [hashlib.sha256(file_bytes).hexdigest() for _, file_bytes in files]
     
-    # Extrair nome do cliente e ID da conta
-    if not df.empty and 'Hierarquia de grupos' in df.columns:
-        first_hierarchy = df['Hierarquia de grupos'].iloc[0]
-        if ' > ' in first_hierarchy:
-            client_account = first_hierarchy.split(' > ')[0].strip()
-            
-            if ' - ' in client_account:
-                parts = client_account.split(' - ')
-                if len(parts) >= 3:
-                    result['client_name'] = ' - '.join(parts[:-1]).strip()
-                    result['account_id'] = parts[-1].strip()
-                elif len(parts) == 2:
-                    result['client_name'] = parts[0].strip()
-                    result['account_id'] = parts[1].strip()
-            elif ' ' in client_account:
-                client_parts = client_account.rsplit(' ', 1)
-                result['client_name'] = client_parts[0].strip()
-                result['account_id'] = client_parts[1].strip()
-    
-    # Processar todos os serviços
-    for _, row in df.iterrows():
-        region = row['Região']
-        service = row['Serviço']
-        upfront = float(row['Pagamento adiantado']) if pd.notna(row['Pagamento adiantado']) else 0
-        monthly = float(row['Mensal']) if pd.notna(row['Mensal']) else 0
-        config = row['Resumo da configuração']
-        hierarchy = row['Hierarquia de grupos']
-        
-        result['regions'].add(region)
-        
-        # Determinar tipo de pagamento e custo
-        payment_mode = 'No Upfront'
-        total_cost = 0
-        
-        # Usar tipo de pagamento global para EC2, RDS e ElastiCache
-        if ("EC2" in service or "RDS" in service or "Aurora" in service or "ElastiCache" in service):
-            payment_mode = global_payment_type
-            if payment_mode == 'All Upfront':
-                total_cost = upfront if upfront > 0 else monthly
-            else:
-                total_cost = monthly if monthly > 0 else upfront
-            
-            # Correção especial para ElastiCache cache.t2.micro
-            if "ElastiCache" in service and "cache.t2.micro" in config and payment_mode == 'All Upfront':
-                payment_mode = 'Heavy Utilization'
-        else:
-            # Para outros serviços, manter lógica original
-            if upfront > 0 and monthly == 0:
-                payment_mode = 'All Upfront'
-                total_cost = upfront
-            elif upfront == 0 and monthly > 0:
-                payment_mode = 'No Upfront'
-                total_cost = monthly
-            else:
-                payment_mode = 'No Upfront'
-                total_cost = monthly
-        
-        # Aplicar descontos específicos
-        if "CloudFront" in service:
-            payment_mode = 'No Upfront'
-            # Garantir que usa o valor mensal correto e aplica 30% de desconto
-            base_cost = monthly if monthly > 0 else upfront
-            total_cost = base_cost * 0.7  # 30% desconto
-        elif "AWS Lambda" in service or "Lambda" in service:
-            # Lambda sempre processa (mesmo On Demand)
-            payment_mode = 'All Upfront' if 'All Upfront' in lambda_payment_option else 'No Upfront'
-            is_sao_paulo = 'São Paulo' in region or 'América do Sul' in region
-            
-            if payment_mode == 'All Upfront':
-                base_cost = upfront if upfront > 0 else monthly
-            else:
-                base_cost = monthly
-            
-            if is_sao_paulo:
-                if payment_mode == 'All Upfront':
-                    total_cost = base_cost * 0.85  # 15% desconto
-                else:
-                    total_cost = base_cost * 0.90  # 10% desconto
-            else:
-                if payment_mode == 'All Upfront':
-                    total_cost = base_cost * 0.83  # 17% desconto
-                else:
-                    total_cost = base_cost * 0.88  # 12% desconto
-        elif "AWS Fargate" in service or "Fargate" in service:
-            # Fargate sempre processa (mesmo On Demand)
-            payment_mode = 'All Upfront' if 'All Upfront' in fargate_payment_option else 'No Upfront'
-            is_arm = 'ARM' in config
-            is_sao_paulo = 'São Paulo' in region or 'América do Sul' in region
-            
-            # Sempre usar o valor mensal como base para Fargate
-            base_cost = monthly
-            
-            if is_sao_paulo:
-                if payment_mode == 'All Upfront':
-                    if is_arm:
-                        total_cost = base_cost * 0.74  # 26% desconto
-                    else:
-                        total_cost = base_cost * 0.78  # 22% desconto
-                else:
-                    if is_arm:
-                        total_cost = base_cost * 0.79  # 21% desconto
-                    else:
-                        total_cost = base_cost * 0.85  # 15% desconto
-            else:
-                if payment_mode == 'All Upfront':
-                    if is_arm:
-                        total_cost = base_cost * 0.73  # 27% desconto
-                    else:
-                        total_cost = base_cost * 0.73  # 27% desconto
-                else:
-                    if is_arm:
-                        total_cost = base_cost * 0.79  # 21% desconto
-                    else:
-                        total_cost = base_cost * 0.80  # 20% desconto
-        elif "RDS" in service or "Aurora" in service:
-            # Aplicar desconto de armazenamento para RDS No Upfront
-            if payment_mode == 'No Upfront':
-                base_cost = monthly
-                # Verificar se tem especificação de armazenamento (20 GB)
-                if "Quantidade de armazenamento (20 GB)" in config:
-                    is_sao_paulo = 'São Paulo' in region or 'América do Sul' in region
-                    if is_sao_paulo:
-                        total_cost = base_cost - 4.38  # Desconto São Paulo
-                    else:
-                        total_cost = base_cost - 2.3   # Desconto outras regiões
-                else:
-                    total_cost = base_cost
-            else:
-                total_cost = upfront
-        else:
-            # Para outros serviços, usar a lógica padrão
-            if payment_mode == 'All Upfront':
-                total_cost = upfront
+    # Itens normalizados por hash do conteúdo, guardados na sessão: mudar câmbio, imposto
+    # ou forma de pagamento não lê os arquivos de novo
+    parsed_cache = st.session_state.setdefault('portfolio_parsed', {})
+    for file_hash in list(parsed_cache):
+        if file_hash not in hashes:
+            del parsed_cache[file_hash]
+    
+    pending = {}
+    for (name, file_bytes), file_hash in zip(files, hashes):
+        if file_hash not in parsed_cache:
+            pending.setdefault(file_hash, (name, file_bytes))
+    
+    st.header(f"📂 Portfólio: {len(files)} arquivos")
+    if pending:
+        progress = st.progress(0.0, text=f"Processando {len(pending)} arquivo(s)...")
+        status = st.container()
+        # Leitura em processos separados, como no lote e no serviço HTTP: a leitura e a normalização
+        # seguram o GIL, então threads não as executariam em paralelo
+        for done, (file_hash, name, parsed) in enumerate(iter_parsed_uploads(pending), 1):
+            parsed_cache[file_hash] = parsed
+            if 'erro' in parsed:
+                status.write(f"❌ {name}: {parsed['erro']}")
             else:
-                total_cost = monthly
-        
-        # Já tratado na lógica principal acima
-        
-        # Pular linhas On Demand (exceto Lambda, Fargate e CloudFront)
-        if ('On-demand' in hierarchy or 'On Demand' in hierarchy or 'On-Demand' in hierarchy):
-            # Permitir apenas Lambda, Fargate e CloudFront em On Demand
-            if ('AWS Lambda' not in service and 'Lambda' not in service and 
-                'AWS Fargate' not in service and 'Fargate' not in service and 
-                'CloudFront' not in service):
-                continue
-        
-        details = extract_instance_details(config, service)
-        
-        # Categorizar por serviço
-        service_key = None
-        if "EC2" in service:
-            service_key = 'EC2'
-        elif "RDS" in service or "Aurora" in service:
-            service_key = 'RDS'
-        elif "ElastiCache" in service:
-            service_key = 'ElastiCache'
-        elif "CloudFront" in service:
-            service_key = 'CloudFront'
-        elif "AWS Lambda" in service or "Lambda" in service:
-            service_key = 'Lambda'
-        elif "AWS Fargate" in service or "Fargate" in service:
-            service_key = 'Fargate'
-        
-        if service_key:
-            result['services_by_region'][region][service_key].append({
-                'tipo': details.get('tipo', 'N/A'),
-                'quantidade': details.get('quantidade', 1),
-                'specs': details.get('specs', []),
-                'payment_mode': payment_mode,
-                'cost': total_cost,
-                'upfront': upfront,
-                'service_name': service,
-                'config': config
-            })
+                status.write(f"✅ {name}")
+            progress.progress(done / len(pending), text=f"{done}/{len(pending)} arquivo(s) processado(s)")
     
-    return result
-
-def calculate_on_demand_costs(df: pd.DataFrame) -> float:
-    """Calcula o custo total On Demand anual"""
-    on_demand_total = 0
+    processed = []
+    failures = []
+    for (name, _), file_hash in zip(files, hashes):
+        parsed = parsed_cache[file_hash]
+        if 'erro' in parsed:
+            st.error(f"Erro ao processar {name}: {parsed['erro']}")
+            failures.append((name, parsed['erro']))
+            continue
+        processed.append(price_line_items(parsed, lambda_payment_option, fargate_payment_option, global_payment_type))
+    if not processed:
+        return
     
-    for _, row in df.iterrows():
-        hierarchy = row['Hierarquia de grupos']
-        monthly = float(row['Mensal']) if pd.notna(row['Mensal']) else 0
-        
-        # Identificar linhas On Demand
-        if ('On-demand' in hierarchy or 'On Demand' in hierarchy or 'On-Demand' in hierarchy):
-            on_demand_total += monthly * 12  # Converter para anual
+    accounts = consolidate_accounts(processed)
+    aggregations = [aggregate_services(data) for data in accounts]
+    on_demand_cost = sum(aggregation['on_demand_annual'] for aggregation in aggregations)
+    total_no_upfront_annual = sum(aggregation['no_upfront_annual'] for aggregation in aggregations)
+    total_all_upfront = sum(aggregation['all_upfront'] for aggregation in aggregations)
+    
+    st.header("💰 Comparação de Custos (todas as contas)")
+    st.dataframe(comparison_table(on_demand_cost, total_no_upfront_annual, total_all_upfront), use_container_width=True, hide_index=True)
+    
+    st.header("🗂️ Totais por Conta e Região")
+    region_totals = portfolio_region_totals(accounts, aggregations).rename(columns={
+        'client_name': 'Cliente',
+        'account_id': 'Conta AWS',
+        'region': 'Região',
+        'itens': 'Serviços',
+        'no_upfront_anual': 'No Upfront anual (USD)',
+        'all_upfront_anual': 'All Upfront anual (USD)'
+    })
+    st.dataframe(region_totals.round(2), use_container_width=True, hide_index=True)
+    
+    summary = generate_portfolio_summary(accounts, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option, aggregations)
+    
+    st.header("📋 Relatório Consolidado")
+    col1, col2 = st.columns([3, 1])
     
-    return on_demand_total
+    with col1:
+        st.text_area("Resumo dos Custos", value=summary, height=600)
+    
+    with col2:
+        st.download_button(
+            label="📥 Download do Relatório",
+            data=summary,
+            file_name=f"resumo_aws_consolidado_{len(accounts)}_contas.txt",
+            mime="text/plain",
+            use_container_width=True
+        )
+        # O ZIP só é montado quando o botão é clicado
+        st.download_button(
+            label="📥 Download dos Resumos por Conta (ZIP)",
+            data=lambda: summaries_zip(accounts, aggregations, failures, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option),
+            file_name=f"resumos_aws_{len(accounts)}_contas.zip",
+            mime="application/zip",
+            use_container_width=True
+        )
+        render_items_download(
+            st, accounts, lambda_payment_option, fargate_payment_option, global_payment_type,
+            f"itens_aws_consolidado_{len(accounts)}_contas.parquet"
+        )
+        st.metric("Total Contas", f"{len(accounts)}")
+        st.metric("Total Arquivos", f"{len(processed)}")
+        st.metric("Total Serviços", f"{sum(aggregation['item_count'] for aggregation in aggregations)}")
 
-def generate_summary(data: Dict, exchange_rate: float, tax_rate: float = 13.83, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS") -> str:
-    """Gera o resumo formatado baseado nos modelos"""
-    client_name = data['client_name']
-    account_id = data['account_id']
+def render_quote_diff(st, parse_upload: Callable, exchange_rate: float, tax_rate: float, lambda_payment_option: str, fargate_payment_option: str, global_payment_type: str) -> None:
+    """Modo de comparação: duas versões de uma exportação, itens adicionados, removidos e alterados e a diferença nos totais"""
+    st.header("🔀 Comparar Cotações")
+    col1, col2 = st.columns(2)
+    with col1:
+        old_file = st.file_uploader("Versão anterior (CSV)", type="csv", key="diff_old")
+    with col2:
+        new_file = st.file_uploader("Versão nova (CSV)", type="csv", key="diff_new")
+    if old_file is None or new_file is None:
+        st.info("Envie as duas versões da exportação para comparar")
+        return
     
-    summary = f"Resumos dos recursos a serem reservados\n{client_name} - {account_id}\n\n"
+    # Cada versão passa pelo mesmo cache de leitura do modo de resumo
+    versions = []
+    for uploaded_file in (old_file, new_file):
+        file_bytes = uploaded_file.getvalue()
+        try:
+            parsed = parse_upload(hashlib.sha256(file_bytes).hexdigest(), file_bytes)
+        except ValueError as e:
+            st.error(f"Erro ao processar {uploaded_file.name}: {e}")
+            return
+        versions.append(price_line_items(parsed, lambda_payment_option, fargate_payment_option, global_payment_type))
+    diff = diff_quotes(versions[0], versions[1], exchange_rate, tax_rate)
     
-    # Totais por tipo de pagamento
-    total_no_upfront = 0
-    total_all_upfront = 0
+    if (diff['antes']['client_name'], diff['antes']['account_id']) != (diff['depois']['client_name'], diff['depois']['account_id']):
+        st.warning("As duas versões são de contas diferentes")
     
-    # Processar por região
-    for region in sorted(data['regions']):
-        if region not in data['services_by_region']:
-            continue
-        
-        # Mapear nome da região
-        region_name = region
-        if "N. da Virgínia" in region or "N. Virginia" in region or "Leste dos EUA" in region:
-            region_name = "N. Virginia"
-        elif "São Paulo" in region or "América do Sul" in region:
-            region_name = "São Paulo"
-        
-        summary += f"{region_name}\n"
-        
-        services = data['services_by_region'][region]
-        
-        # Processar cada serviço
-        for service_type in ['EC2', 'RDS', 'ElastiCache', 'CloudFront', 'Lambda', 'Fargate']:
-            if service_type not in services or not services[service_type]:
-                continue
-            
-            instances = services[service_type]
-            
-            # Separar por tipo de pagamento
-            no_upfront_instances = [i for i in instances if i['payment_mode'] == 'No Upfront']
-            all_upfront_instances = [i for i in instances if i['payment_mode'] in ['All Upfront', 'Heavy Utilization']]
-            
-            # Calcular totais
-            no_upfront_cost = sum(i['cost'] for i in no_upfront_instances)
-            all_upfront_cost = sum(i['cost'] for i in all_upfront_instances)
-            
-            # Somar aos totais gerais
-            total_no_upfront += no_upfront_cost
-            
-            # Para Lambda e Fargate All Upfront, multiplicar por 12 no total geral
-            if service_type in ['Lambda', 'Fargate']:
-                total_all_upfront += all_upfront_cost * 12
-            else:
-                total_all_upfront += all_upfront_cost
-            
-            # Gerar seção do serviço
-            if service_type == 'EC2':
-                total_instances = sum(i['quantidade'] for i in instances)
-                summary += f"EC2 Instances - {total_instances:02d} instâncias - Conta AWS {account_id}\n"
-                summary += "Tipos de Instancias:\n"
-                
-                # Separar por tipo de pagamento
-                no_upfront_grouped = {}
-                all_upfront_grouped = {}
-                
-                for instance in instances:
-                    pricing_strategy = instance['specs'][0] if len(instance['specs']) > 0 else 'N/A'
-                    os_system = instance['specs'][1] if len(instance['specs']) > 1 else 'N/A'
-                    key = f"{instance['tipo']} ({pricing_strategy}, {os_system})"
-                    
-                    if instance['payment_mode'] == 'No Upfront':
-                        if key in no_upfront_grouped:
-                            no_upfront_grouped[key] += instance['quantidade']
-                        else:
-                            no_upfront_grouped[key] = instance['quantidade']
-                    else:
-                        if key in all_upfront_grouped:
-                            all_upfront_grouped[key] += instance['quantidade']
-                        else:
-                            all_upfront_grouped[key] = instance['quantidade']
-                
-                # Mostrar No Upfront
-                if no_upfront_grouped:
-                    summary += "No Upfront:\n"
-                    for instance_key, total_qty in no_upfront_grouped.items():
-                        summary += f"-{total_qty} - {instance_key}\n"
-                
-                # Mostrar All Upfront
-                if all_upfront_grouped:
-                    summary += "All Upfront:\n"
-                    for instance_key, total_qty in all_upfront_grouped.items():
-                        summary += f"-{total_qty} - {instance_key}\n"
-                
-                if no_upfront_cost > 0:
-                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
-                if all_upfront_cost > 0:
-                    summary += f"Valor total All Upfront: USD {all_upfront_cost:,.2f}/ano\n"
-            
-            elif service_type == 'RDS':
-                total_instances = sum(i['quantidade'] for i in instances)
-                summary += f"RDS - {total_instances:02d} instâncias - Conta AWS {account_id}\n"
-                summary += "Tipos de Instancias:\n"
-                
-                # Separar por tipo de pagamento
-                no_upfront_grouped = {}
-                all_upfront_grouped = {}
-                
-                for instance in instances:
-                    az = instance['specs'][0] if len(instance['specs']) > 0 else 'N/A'
-                    period = instance['specs'][2] if len(instance['specs']) > 2 else 'N/A'
-                    engine = instance['specs'][3] if len(instance['specs']) > 3 else 'N/A'
-                    key = f"{instance['tipo']} ({az}, {period}, {engine})"
-                    
-                    if instance['payment_mode'] == 'No Upfront':
-                        if key in no_upfront_grouped:
-                            no_upfront_grouped[key] += instance['quantidade']
-                        else:
-                            no_upfront_grouped[key] = instance['quantidade']
-                    else:
-                        if key in all_upfront_grouped:
-                            all_upfront_grouped[key] += instance['quantidade']
-                        else:
-                            all_upfront_grouped[key] = instance['quantidade']
-                
-                # Mostrar No Upfront
-                if no_upfront_grouped:
-                    summary += "No Upfront:\n"
-                    for instance_key, total_qty in no_upfront_grouped.items():
-                        summary += f"-{total_qty} - {instance_key}\n"
-                
-                # Mostrar All Upfront
-                if all_upfront_grouped:
-                    summary += "All Upfront:\n"
-                    for instance_key, total_qty in all_upfront_grouped.items():
-                        summary += f"-{total_qty} - {instance_key}\n"
-                
-                if no_upfront_cost > 0:
-                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
-                if all_upfront_cost > 0:
-                    summary += f"Valor total All Upfront: USD {all_upfront_cost:,.2f}/ano\n"
-            
-            elif service_type == 'ElastiCache':
-                total_nodes = sum(i['quantidade'] for i in instances)
-                summary += f"ElastiCache - {total_nodes:02d} nós - Conta AWS {account_id}\n"
-                summary += "Tipos de Instancias:\n"
-                
-                # Separar por tipo de pagamento
-                no_upfront_grouped = {}
-                all_upfront_grouped = {}
-                
-                for instance in instances:
-                    period = instance['specs'][1] if len(instance['specs']) > 1 else 'N/A'
-                    cache_engine = instance['specs'][2] if len(instance['specs']) > 2 else 'N/A'
-                    key = f"{instance['tipo']} ({period}, {cache_engine})"
-                    
-                    if instance['payment_mode'] == 'No Upfront':
-                        if key in no_upfront_grouped:
-                            no_upfront_grouped[key] += instance['quantidade']
-                        else:
-                            no_upfront_grouped[key] = instance['quantidade']
-                    else:
-                        if key in all_upfront_grouped:
-                            all_upfront_grouped[key] += instance['quantidade']
-                        else:
-                            all_upfront_grouped[key] = instance['quantidade']
-                
-                # Mostrar No Upfront
-                if no_upfront_grouped:
-                    summary += "No Upfront:\n"
-                    for instance_key, total_qty in no_upfront_grouped.items():
-                        summary += f"-{total_qty} - {instance_key}\n"
-                
-                # Mostrar All Upfront
-                if all_upfront_grouped:
-                    summary += "All Upfront:\n"
-                    for instance_key, total_qty in all_upfront_grouped.items():
-                        summary += f"-{total_qty} - {instance_key}\n"
-                
-                if no_upfront_cost > 0:
-                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
-                if all_upfront_cost > 0:
-                    summary += f"Valor total All Upfront: USD {all_upfront_cost:,.2f}/ano\n"
-            
-            elif service_type == 'CloudFront':
-                summary += f"CloudFront - Conta AWS {account_id}\n"
-                summary += "Período: 1 ano\n"
-                summary += "Forma de pagamento: No Upfront em 12x pela AWS\n"
-                summary += f"Valor total mensal: USD {no_upfront_cost:,.2f} (sem impostos)\n"
-            
-            elif service_type == 'Lambda':
-                summary += f"Lambda - Conta AWS {account_id}\n"
-                summary += f"Forma de pagamento: {lambda_payment_option}\n"
-                if no_upfront_cost > 0:
-                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
-                if all_upfront_cost > 0:
-                    summary += f"Valor total All Upfront: USD {all_upfront_cost * 12:,.2f}/ano\n"
-            
-            elif service_type == 'Fargate':
-                total_tasks = sum(i['quantidade'] for i in instances)
-                summary += f"ECS fargate - {region_name} - Conta AWS {account_id}\n"
-                summary += "Período: 1 ano\n"
-                summary += f"Forma de pagamento: {fargate_payment_option}\n"
-                summary += f"Total de tarefas/pods: {total_tasks}\n"
-                
-                if no_upfront_cost > 0:
-                    summary += f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n"
-                if all_upfront_cost > 0:
-                    summary += f"Valor total All Upfront: USD {all_upfront_cost * 12:,.2f}/ano\n"
-            
-            summary += "\n"
-    
-    # Resumo financeiro
-    if total_all_upfront > 0:
-        summary += "Resumo financeiro All Upfront:\n"
-        all_upfront_taxes = total_all_upfront * (tax_rate / 100)
-        all_upfront_with_taxes = total_all_upfront + all_upfront_taxes
-        all_upfront_brl = all_upfront_with_taxes * exchange_rate
-        all_upfront_parcela = all_upfront_brl / 6
-        
-        summary += f"Valor total (sem imposto): USD {total_all_upfront:,.2f}/ano\n"
-        summary += f"Impostos: USD {all_upfront_taxes:,.2f}/ano\n"
-        summary += f"Valor do dólar (aproximado): R$ {exchange_rate:.2f}\n"
-        summary += f"Valor total em reais (com imposto): R$ {all_upfront_brl:,.2f}/ano\n"
-        summary += f"Parcelamento TdSynnex(com imposto): 06x R$ {all_upfront_parcela:,.2f} via TdSynnex\n\n"
-    
-    if total_no_upfront > 0:
-        summary += "Resumo financeiro No Upfront:\n"
-        no_upfront_annual = total_no_upfront * 12
-        no_upfront_taxes = no_upfront_annual * (tax_rate / 100)
-        no_upfront_with_taxes = no_upfront_annual + no_upfront_taxes
-        no_upfront_brl_monthly = no_upfront_with_taxes * exchange_rate / 12
-        
-        summary += f"Valor total (sem imposto): USD {no_upfront_annual:,.2f}/ano\n"
-        summary += f"Impostos: USD {no_upfront_taxes:,.2f}/ano\n"
-        summary += f"Valor do dólar (aproximado): R$ {exchange_rate:.2f}\n"
-        summary += f"Valor total em reais (com imposto): 12x R$ {no_upfront_brl_monthly:,.2f} via AWS\n"
+    counts = diff['contagem']
+    for column, status in zip(st.columns(len(DIFF_STATUSES)), DIFF_STATUSES):
+        column.metric(status.capitalize() + "s", f"{counts[status]}")
+    
+    totals = pd.DataFrame([
+        {'Total': DIFF_TOTAL_LABELS[name], 'Antes': total['antes'], 'Depois': total['depois'], 'Diferença': total['diferenca']}
+        for name, total in diff['totais'].items()
+    ])
+    st.dataframe(totals.round(2), use_container_width=True, hide_index=True)
+    
+    statuses = st.multiselect("Mostrar", DIFF_STATUSES, default=[status for status in DIFF_STATUSES if status != 'inalterado'])
+    rows = pd.DataFrame([row for row in diff['linhas'] if row['situacao'] in statuses], columns=list(diff['linhas'][0]) if diff['linhas'] else None)
+    if not rows.empty:
+        rows['specs'] = rows['specs'].map(', '.join)
+    st.dataframe(rows.round(2), use_container_width=True, hide_index=True)
     
-    return summary
+    report = generate_diff_report(diff)
+    st.text_area("Relatório da comparação", value=report, height=400)
+    st.download_button(
+        label="📥 Download da Comparação",
+        data=report,
+        file_name=f"comparacao_aws_{diff['depois']['client_name']}_{diff['depois']['account_id']}.txt",
+        mime="text/plain"
+    )
+
+def render_debug_panel(st, debug_items: Callable[[], pd.DataFrame], on_demand_cost: float, total_no_upfront_annual: float, total_all_upfront: float) -> None:
+    """Painel "Dados Processados (Debug)": só é montado quando aberto e mostra os itens uma página por vez,
+    então o custo para o navegador não cresce com o tamanho da exportação"""
+    debug = st.expander("🔍 Dados Processados (Debug)", key="debug_panel", on_change="rerun")
+    if not debug.open:
+        return
+    
+    with debug:
+        with measure_stage('ui.debug_table') as record:
+            items = debug_items()
+            
+            col1, col2, col3 = st.columns([2, 2, 3])
+            regions = col1.multiselect("Regiões", sorted(items['region'].unique()), key="debug_regions")
+            services = col2.multiselect("Serviços", sorted(items['service_type'].unique()), key="debug_services")
+            search = col3.text_input("Buscar (tipo, serviço ou configuração)", key="debug_search")
+            
+            mask = np.ones(len(items), dtype=bool)
+            if regions:
+                mask &= items['region'].isin(regions).to_numpy()
+            if services:
+                mask &= items['service_type'].isin(services).to_numpy()
+            if search:
+                mask &= np.logical_or.reduce([
+                    items[column].astype(str).str.contains(search, case=False, regex=False).to_numpy()
+                    for column in ('tipo', 'service_name', 'config')
+                ])
+            filtered = items[mask]
+            
+            col1, col2 = st.columns([1, 3])
+            page_size = col1.selectbox("Linhas por página", DEBUG_PAGE_SIZES, key="debug_page_size")
+            pages = max(1, -(-len(filtered) // page_size))
+            page = col2.number_input(f"Página (de {pages})", min_value=1, max_value=pages, value=1, step=1, key="debug_page")
+            
+            # Só a página atual vai para o navegador, com a configuração encurtada
+            page_items = filtered.iloc[(page - 1) * page_size:page * page_size].copy()
+            page_items['specs'] = page_items['specs'].map(lambda specs: ', '.join(str(spec) for spec in specs))
+            page_items['config'] = page_items['config'].map(
+                lambda config: config if not isinstance(config, str) or len(config) <= DEBUG_CONFIG_CHARS else config[:DEBUG_CONFIG_CHARS] + "…"
+            )
+            st.dataframe(page_items, use_container_width=True, hide_index=True)
+            st.caption(f"{len(filtered)} de {len(items)} item(ns)")
+            record['rows'] = len(page_items)
+        
+        st.write(f"On Demand Total: ${on_demand_cost:,.2f}")
+        st.write(f"No Upfront Total: ${total_no_upfront_annual:,.2f}")
+        st.write(f"All Upfront Total: ${total_all_upfront:,.2f}")
+
+def render_performance_panel(st, performance: PerformanceLog, file_hash: str) -> None:
+    """Painel "Desempenho": tempo, linhas e memória por etapa e, se capturado, o perfil cProfile"""
+    with st.expander("⏱️ Desempenho"):
+        st.caption("Etapas servidas pelo cache não são executadas de novo e por isso não aparecem.")
+        if performance.records:
+            table = pd.DataFrame(performance.records).rename(columns={
+                'stage': 'Etapa',
+                'rows': 'Linhas',
+                'seconds': 'Tempo (s)',
+                'memory_delta_mb': 'Memória retida (MB)',
+                'memory_peak_mb': 'Pico de memória (MB)'
+            })
+            if not performance.track_memory:
+                table = table.drop(columns=['Memória retida (MB)', 'Pico de memória (MB)'])
+            st.dataframe(table, use_container_width=True, hide_index=True)
+        st.write(f"Tempo total: {performance.total_seconds:.3f}s")
+        
+        export_cache = default_cache()
+        if export_cache is not None:
+            entries = export_cache.entries()
+            st.caption(
+                f"Cache em disco: {len(entries)} exportação(ões), {sum(entry.stat().st_size for entry in entries) / 1e6:.1f} MB "
+                f"de {export_cache.max_bytes / 1e6:.0f} MB em {export_cache.directory}"
+            )
+        
+        profile_summary = performance.profile_summary()
+        if profile_summary:
+            st.text(profile_summary)
+            st.download_button(
+                label="📥 Download do perfil (.prof)",
+                data=performance.profile_bytes(),
+                file_name=f"perfil_{file_hash[:12]}.prof",
+                mime="application/octet-stream"
+            )
 
 def main():
+    import streamlit as st
+    
+    # Leitura e normalização só rodam de novo quando o arquivo muda, e cada regra de preço só
+    # quando a forma de pagamento dela muda; câmbio e imposto afetam apenas a geração do resumo
+    parse_upload = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner="Processando o arquivo...")(_parse_upload)
+    price_upload = st.cache_data(max_entries=CACHE_MAX_ENTRIES * len(PRICING_RULES) * 2, ttl=CACHE_TTL_SECONDS, show_spinner=False)(_price_upload)
+    debug_items = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(_debug_items)
+    
     st.title("🏦 Resumo de Custos AWS - Savings Plans")
     st.markdown("""
     Esta aplicação processa arquivos CSV exportados da **Calculadora de Preços da AWS** 
@@ -619,7 +360,7 @@ def main():
     st.sidebar.header("⚙️ Configurações")
     exchange_rate = st.sidebar.number_input(
         "Taxa de câmbio USD para BRL", 
-        value=5.50, 
+        value=DEFAULT_EXCHANGE_RATE, 
         min_value=1.0, 
         step=0.01,
         help="Taxa de conversão do dólar americano para real brasileiro"
@@ -627,7 +368,7 @@ def main():
     
     tax_rate = st.sidebar.number_input(
         "Taxa de Imposto (%)", 
-        value=13.83, 
+        value=DEFAULT_TAX_RATE, 
         min_value=0.0, 
         max_value=100.0,
         step=0.01,
@@ -636,163 +377,189 @@ def main():
     
     lambda_payment_option = st.sidebar.selectbox(
         "Forma de pagamento Lambda",
-        ["No Upfront 12x pela AWS", "All Upfront 06x pela TdSynnex"],
+        PAYMENT_OPTIONS,
         help="Selecione a forma de pagamento específica para Lambda"
     )
     
     fargate_payment_option = st.sidebar.selectbox(
         "Forma de pagamento ECS Fargate",
-        ["No Upfront 12x pela AWS", "All Upfront 06x pela TdSynnex"],
+        PAYMENT_OPTIONS,
         help="Selecione a forma de pagamento específica para ECS Fargate"
     )
     
     # Opção global de tipo de pagamento
     global_payment_type = st.sidebar.selectbox(
         "Tipo de pagamento para EC2/RDS/ElastiCache",
-        ["All Upfront", "No Upfront"],
+        GLOBAL_PAYMENT_TYPES,
         help="Força todos os serviços EC2, RDS e ElastiCache para este tipo de pagamento"
     )
     
+    # Diagnóstico de desempenho (painel "Desempenho")
+    st.sidebar.header("⏱️ Diagnóstico")
+    track_memory = st.sidebar.checkbox(
+        "Medir memória por etapa",
+        help="Registra a memória alocada em cada etapa (tracemalloc); deixa o processamento mais lento"
+    )
+    capture_profile = st.sidebar.checkbox(
+        "Gerar perfil (cProfile)",
+        help="Captura um perfil do processamento deste upload, disponível para download no painel Desempenho"
+    )
+    
+    # Modo de comparação: duas versões da mesma exportação
+    mode = st.sidebar.radio(
+        "Modo",
+        ["Resumo", "Comparar cotações"],
+        help="Comparar cotações mostra o que mudou entre duas versões de uma exportação"
+    )
+    if mode == "Comparar cotações":
+        render_quote_diff(st, parse_upload, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option, global_payment_type)
+        return
+    
     # Upload do arquivo
     st.header("📁 Upload do Arquivo")
-    uploaded_file = st.file_uploader(
+    uploaded_files = st.file_uploader(
         "Escolha um arquivo CSV da Calculadora AWS", 
         type="csv",
-        help="Faça upload do arquivo CSV exportado da Calculadora de Preços da AWS"
+        accept_multiple_files=True,
+        help="Faça upload do arquivo CSV exportado da Calculadora de Preços da AWS (vários arquivos geram um relatório consolidado por conta)"
     )
     
+    # Vários arquivos: relatório consolidado do portfólio
+    if uploaded_files and len(uploaded_files) > 1:
+        render_portfolio(st, uploaded_files, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option, global_payment_type)
+        return
+    
+    uploaded_file = uploaded_files[0] if uploaded_files else None
     if uploaded_file is not None:
         try:
-            # Ler CSV
-            df = load_csv_file(uploaded_file)
-            
-            # Verificar se tem as colunas necessárias
-            required_columns_pt = ['Hierarquia de grupos', 'Região', 'Serviço', 'Pagamento adiantado', 'Mensal', 'Resumo da configuração']
-            required_columns_en = ['Group hierarchy', 'Region', 'Service', 'Upfront', 'Monthly', 'Configuration summary']
-            
-            is_portuguese = all(col in df.columns for col in required_columns_pt)
-            is_english = all(col in df.columns for col in required_columns_en)
-            
-            if not is_portuguese and not is_english:
-                missing_pt = [col for col in required_columns_pt if col not in df.columns]
-                missing_en = [col for col in required_columns_en if col not in df.columns]
-                st.error(f"Colunas faltando no CSV. Português: {', '.join(missing_pt)} | Inglês: {', '.join(missing_en)}")
-                return
-            
-            # Normalizar nomes das colunas para português
-            if is_english:
-                column_mapping = {
-                    'Group hierarchy': 'Hierarquia de grupos',
-                    'Region': 'Região',
-                    'Service': 'Serviço',
-                    'Upfront': 'Pagamento adiantado',
-                    'Monthly': 'Mensal',
-                    'Configuration summary': 'Resumo da configuração'
-                }
-                df = df.rename(columns=column_mapping)
-            
-            # Processar dados
-            data = process_csv(df, lambda_payment_option, fargate_payment_option, global_payment_type)
-            
-            if not data['account_id']:
-                st.warning("Não foi possível extrair o ID da conta AWS do arquivo")
-            
-            # Calcular custos On Demand
-            on_demand_cost = calculate_on_demand_costs(df)
-            
-            # Calcular totais para comparação (usando mesma lógica da generate_summary)
-            total_no_upfront = 0
-            total_all_upfront = 0
-            
-            for region_services in data['services_by_region'].values():
-                for service_type, instances in region_services.items():
-                    no_upfront_instances = [i for i in instances if i['payment_mode'] == 'No Upfront']
-                    all_upfront_instances = [i for i in instances if i['payment_mode'] in ['All Upfront', 'Heavy Utilization']]
-                    
-                    no_upfront_cost = sum(i['cost'] for i in no_upfront_instances)
-                    all_upfront_cost = sum(i['cost'] for i in all_upfront_instances)
+            # Medir as etapas deste processamento (as que vêm do cache não aparecem)
+            performance = PerformanceLog(track_memory=track_memory, profile=capture_profile)
+            with performance:
+                # Ler CSV, verificar as colunas e normalizar os itens (em cache pelo hash do conteúdo)
+                file_bytes = uploaded_file.getvalue()
+                file_hash = hashlib.sha256(file_bytes).hexdigest()
+                try:
+                    parsed = parse_upload(file_hash, file_bytes)
+                except ValueError as e:
+                    st.error(str(e))
+                    return
+                
+                # Processar dados: preços de cada regra sobre os itens normalizados
+                options = pricing_options(lambda_payment_option, fargate_payment_option, global_payment_type)
+                priced = {}
+                for rule, option in options.items():
+                    with measure_stage(f'price_rule.{rule}'):
+                        priced[rule] = price_upload(file_hash, rule, option, parsed['line_items'])
+                data = assemble_services(parsed, priced)
+                
+                # Uma única agregação alimenta a tabela de comparação, as métricas, o debug e o resumo
+                aggregation = aggregate_services(data)
+                
+                if not data['account_id']:
+                    st.warning("Não foi possível extrair o ID da conta AWS do arquivo")
+                
+                on_demand_cost = aggregation['on_demand_annual']
+                total_no_upfront_annual = aggregation['no_upfront_annual']
+                total_all_upfront = aggregation['all_upfront']
+                
+                # Tabela de comparação de custos
+                st.header("💰 Comparação de Custos")
+                
+                # Exibir tabela
+                comparison_df = comparison_table(on_demand_cost, total_no_upfront_annual, total_all_upfront)
+                st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+                
+                # Cenários what-if: os itens já normalizados e os preços em cache de cada regra
+                # alimentam todas as combinações de formas de pagamento de uma vez
+                with st.expander("🧮 Cenários (formas de pagamento × câmbio × imposto)"):
+                    exchange_rates_text = st.text_input(
+                        "Câmbios USD para BRL",
+                        value=f"{exchange_rate - 0.30:.2f}; {exchange_rate:.2f}; {exchange_rate + 0.30:.2f}",
+                        help="Valores separados por ponto e vírgula"
+                    )
+                    tax_rates_text = st.text_input(
+                        "Impostos (%)",
+                        value=f"{tax_rate:.2f}",
+                        help="Valores separados por ponto e vírgula"
+                    )
+                    try:
+                        exchange_rates = parse_rate_list(exchange_rates_text)
+                        tax_rates = parse_rate_list(tax_rates_text)
+                    except ValueError as e:
+                        st.error(str(e))
+                    else:
+                        with measure_stage('scenario_matrix'):
+                            grid = scenario_matrix(
+                                parsed, exchange_rates, tax_rates,
+                                price=lambda rule, option: price_upload(file_hash, rule, option, parsed['line_items'])
+                            )
+                        
+                        if not grid.empty:
+                            best = grid.loc[grid['total_anual'].idxmin()]
+                            st.caption(
+                                f"Menor custo anual: EC2/RDS/ElastiCache {best['global_payment_type']}, "
+                                f"Lambda {best['lambda_payment_option']}, Fargate {best['fargate_payment_option']} "
+                                f"(USD {best['total_anual']:,.2f})"
+                            )
+                        st.dataframe(
+                            grid[list(SCENARIO_COLUMN_LABELS)].round(2).rename(columns=SCENARIO_COLUMN_LABELS),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+                
+                # Gerar resumo
+                summary = generate_summary(data, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option, aggregation)
+                
+                # Exibir resumo
+                st.header("📋 Resumo Gerado")
+                st.success("✅ Arquivo processado com sucesso!")
+                
+                col1, col2 = st.columns([3, 1])
+                
+                with col1:
+                    st.text_area(
+                        "Resumo dos Custos", 
+                        value=summary, 
+                        height=600,
+                        help="Copie este texto ou faça o download usando o botão ao lado"
+                    )
+                
+                with col2:
+                    st.download_button(
+                        label="📥 Download do Resumo",
+                        data=summary,
+                        file_name=summary_file_name(data['client_name'], data['account_id']),
+                        mime="text/plain",
+                        use_container_width=True
+                    )
+                    render_items_download(
+                        st, [data], lambda_payment_option, fargate_payment_option, global_payment_type,
+                        f"itens_aws_{data['client_name']}_{data['account_id']}.parquet"
+                    )
                     
-                    if no_upfront_instances:
-                        total_no_upfront += no_upfront_cost  # Mensal (será multiplicado por 12 depois)
+                    # Estatísticas rápidas
+                    st.metric("Total Regiões", f"{aggregation['region_count']}")
+                    st.metric("Total Serviços", f"{aggregation['item_count']}")
                     
-                    if all_upfront_instances:
-                        if service_type in ['Lambda', 'Fargate']:
-                            total_all_upfront += all_upfront_cost * 12
-                        else:
-                            total_all_upfront += all_upfront_cost
-            
-            # Converter No Upfront para anual
-            total_no_upfront_annual = total_no_upfront * 12
-            
-            # Tabela de comparação de custos
-            st.header("💰 Comparação de Custos")
-            
-            # Criar DataFrame para a tabela
-            comparison_data = {
-                'Tipo de Pagamento': ['On Demand', 'No Upfront', 'All Upfront'],
-                'Custo Anual (USD)': [f"${on_demand_cost:,.2f}", f"${total_no_upfront_annual:,.2f}", f"${total_all_upfront:,.2f}"],
-                'Economia vs On Demand': ['0%', '', '']
-            }
-            
-            # Calcular economias
-            if on_demand_cost > 0:
-                if total_no_upfront_annual > 0:
-                    no_upfront_savings = ((on_demand_cost - total_no_upfront_annual) / on_demand_cost) * 100
-                    comparison_data['Economia vs On Demand'][1] = f"{no_upfront_savings:.1f}%"
+                    # Mostrar economia principal
+                    if on_demand_cost > 0 and total_all_upfront > 0:
+                        main_savings = ((on_demand_cost - total_all_upfront) / on_demand_cost) * 100
+                        st.metric("Economia All Upfront", f"{main_savings:.1f}%")
                 
-                if total_all_upfront > 0:
-                    all_upfront_savings = ((on_demand_cost - total_all_upfront) / on_demand_cost) * 100
-                    comparison_data['Economia vs On Demand'][2] = f"{all_upfront_savings:.1f}%"
-            
-            # Exibir tabela
-            comparison_df = pd.DataFrame(comparison_data)
-            st.dataframe(comparison_df, use_container_width=True, hide_index=True)
-            
-            # Gerar resumo
-            summary = generate_summary(data, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option)
-            
-            # Exibir resumo
-            st.header("📋 Resumo Gerado")
-            st.success("✅ Arquivo processado com sucesso!")
-            
-            col1, col2 = st.columns([3, 1])
-            
-            with col1:
-                st.text_area(
-                    "Resumo dos Custos", 
-                    value=summary, 
-                    height=600,
-                    help="Copie este texto ou faça o download usando o botão ao lado"
-                )
-            
-            with col2:
-                st.download_button(
-                    label="📥 Download do Resumo",
-                    data=summary,
-                    file_name=f"resumo_aws_{data['client_name']}_{data['account_id']}.txt",
-                    mime="text/plain",
-                    use_container_width=True
+                # Mostrar dados processados (debug), montados só com o painel aberto
+                render_debug_panel(
+                    st,
+                    lambda: debug_items(file_hash, (lambda_payment_option, fargate_payment_option, global_payment_type), data),
+                    on_demand_cost, total_no_upfront_annual, total_all_upfront
                 )
-                
-                # Estatísticas rápidas
-                total_instances = sum(len(instances) for region_services in data['services_by_region'].values() for instances in region_services.values())
-                st.metric("Total Regiões", f"{len(data['regions'])}")
-                st.metric("Total Serviços", f"{total_instances}")
-                
-                # Mostrar economia principal
-                if on_demand_cost > 0 and total_all_upfront > 0:
-                    main_savings = ((on_demand_cost - total_all_upfront) / on_demand_cost) * 100
-                    st.metric("Economia All Upfront", f"{main_savings:.1f}%")
             
-            # Mostrar dados processados (debug)
-            with st.expander("🔍 Dados Processados (Debug)"):
-                st.json(data)
-                st.write(f"On Demand Total: ${on_demand_cost:,.2f}")
-                st.write(f"No Upfront Total: ${total_no_upfront_annual:,.2f}")
-                st.write(f"All Upfront Total: ${total_all_upfront:,.2f}")
-                
+            render_performance_panel(st, performance, file_hash)
+        
         except Exception as e:
             st.error(f"Erro ao processar arquivo: {str(e)}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # `streamlit run` não repassa argumentos; com argumentos, usar a linha de comando
+    if len(sys.argv) > 1:
+        sys.exit(cli(sys.argv[1:]))
+    main()
@@ -0,0 +1,192 @@
+"""Gerador de exportações sintéticas da Calculadora AWS (layouts PT e EN) para os benchmarks"""
+import argparse
+import csv
+import random
+import sys
+from typing import Dict, Optional
+
+# Regiões nos dois idiomas (mesma posição = mesma região)
+REGIONS = {
+    'pt': [
+        "América do Sul (São Paulo)", "Leste dos EUA (N. da Virgínia)", "Leste dos EUA (Ohio)",
+        "Oeste dos EUA (Oregon)", "Canadá (Central)"
+    ],
+    'en': [
+        "South America (Sao Paulo)", "US East (N. Virginia)", "US East (Ohio)",
+        "US West (Oregon)", "Canada (Central)"
+    ]
+}
+
+HEADERS = {
+    'pt': [
+        "Hierarquia de grupos", "Região", "Descrição", "Serviço", "Pagamento adiantado", "Mensal",
+        "Primeiros 12 meses (total)", "Moeda", "Status", "Resumo da configuração"
+    ],
+    'en': [
+        "Group hierarchy", "Region", "Description", "Service", "Upfront", "Monthly",
+        "First 12 months total", "Currency", "Status", "Configuration summary"
+    ]
+}
+
+# Textos antes de "Estimativa detalhada" e depois da tabela (seção de confirmação)
+PREAMBLE = {
+    'pt': ["Resumo da estimativa", "Custo inicial,Custo mensal,Custo total de 12 meses", "1200.00,850.00,11400.00", ""],
+    'en': ["Estimate summary", "Upfront cost,Monthly cost,Total 12 months cost", "1200.00,850.00,11400.00", ""]
+}
+SECTION_TITLE = {'pt': "Estimativa detalhada", 'en': "Detailed Estimate"}
+ACKNOWLEDGEMENT = {
+    'pt': ["", "Confirmação", "A Calculadora de Preços da AWS fornece apenas uma estimativa das tarifas da AWS."],
+    'en': ["", "Acknowledgement", "AWS Pricing Calculator provides only an estimate of your AWS fees."]
+}
+
+# Peso de cada tipo de serviço na exportação; "Outros" são serviços que o app ignora
+DEFAULT_MIX = {
+    'EC2': 30,
+    'RDS': 15,
+    'ElastiCache': 10,
+    'Lambda': 10,
+    'Fargate': 10,
+    'CloudFront': 10,
+    'Outros': 15
+}
+
+SERVICE_NAMES = {
+    'EC2': ["Amazon EC2"],
+    'RDS': ["Amazon RDS for PostgreSQL", "Amazon RDS for MySQL", "Amazon Aurora MySQL-Compatible"],
+    'ElastiCache': ["Amazon ElastiCache"],
+    'Lambda': ["AWS Lambda"],
+    'Fargate': ["AWS Fargate"],
+    'CloudFront': ["Amazon CloudFront"],
+    'Outros': ["Amazon Simple Storage Service (S3)", "Amazon Route 53", "Amazon Elastic Block Store (EBS)"]
+}
+
+GROUPS = ["Reservas", "Savings Plans", "On-Demand", "On Demand"]
+
+def _config(kind: str, rng: random.Random, language: str) -> str:
+    """Resumo da configuração de um serviço, no formato da Calculadora"""
+    en = language == 'en'
+    if kind == 'EC2':
+        instance = rng.choice(["t3.medium", "m5.large", "m6g.xlarge", "c6g.xlarge", "r5.2xlarge"])
+        strategy = rng.choice([
+            "EC2 Instance Savings Plans 1yr No Upfront", "Compute Savings Plans 3yr All Upfront",
+            "Standard Reserved Instances 1yr All Upfront", "OnDemand"
+        ])
+        system = rng.choice(["Linux", "Windows Server"])
+        count = rng.randint(1, 8)
+        if en:
+            return (f"Tenancy (Shared Instances), Operating system ({system}), Workload (Consistent, Number of instances: {count}), "
+                    f"Advance EC2 instance ({instance}), Pricing strategy ({strategy}), Enable monitoring (disabled)")
+        return (f"Locação (Instâncias compartilhadas), Sistema operacional ({system}), Carga de trabalho (Consistent, Número de instâncias: {count}), "
+                f"Instância do EC2 avançada ({instance}), Pricing strategy ({strategy}), Habilitar monitoramento (desabilitado)")
+    
+    if kind == 'RDS':
+        instance = rng.choice(["db.t3.medium", "db.m6g.large", "db.r6g.large", "db.r5.xlarge"])
+        storage = rng.choice([20, 20, 100, 500])
+        deployment = rng.choice(["Multi-AZ", "Single-AZ"])
+        term = rng.choice(["1 year", "3 Year"])
+        option = rng.choice(["No Upfront", "All Upfront", "Partial Upfront"])
+        nodes = rng.randint(1, 3)
+        if en:
+            return (f"Storage amount ({storage} GB), Nodes ({nodes}), Instance type ({instance}), Deployment option ({deployment}), "
+                    f"Pricing model (Reserved), Term ({term}), Purchase option ({option})")
+        return (f"Quantidade de armazenamento ({storage} GB), Nós ({nodes}), Tipo de instância ({instance}), Opção de implantação ({deployment}), "
+                f"Modelo de preço (Reserved), Prazo ({term}), Opção de compra ({option})")
+    
+    if kind == 'ElastiCache':
+        instance = rng.choice(["cache.t2.micro", "cache.t3.medium", "cache.m6g.large", "cache.r6g.large"])
+        engine = rng.choice(["Redis", "Valkey", "Memcached"])
+        option = rng.choice(["Heavy Utilization", "No Upfront", "All Upfront"])
+        term = rng.choice(["1 year", "3 year"])
+        nodes = rng.randint(1, 6)
+        if en:
+            return (f"Nodes (0), Instance type (cache.r6gd.12xlarge), Nodes ({nodes}), Instance type ({instance}), "
+                    f"Cache engine ({engine}), Term ({term}), Purchase option ({option})")
+        return (f"Nós (0), Tipo de instância (cache.r6gd.12xlarge), Nós ({nodes}), Tipo de instância ({instance}), "
+                f"Mecanismo de cache ({engine}), Prazo ({term}), Opção de compra ({option})")
+    
+    if kind == 'Lambda':
+        architecture = rng.choice(["x86", "ARM"])
+        requests = rng.choice([1, 10, 100])
+        if en:
+            return f"Architecture ({architecture}), Number of requests ({requests} million per month)"
+        return f"Arquitetura ({architecture}), Número de solicitações ({requests} milhões por mês)"
+    
+    if kind == 'Fargate':
+        architecture = rng.choice(["x86", "ARM"])
+        tasks = rng.randint(1, 30)
+        memory = rng.choice([1, 2, 4, 8])
+        vcpu = rng.choice(["0.25", "1", "2"])
+        if en:
+            return (f"Operating system (Linux), CPU Architecture ({architecture}), Number of tasks or pods ({tasks} per day), "
+                    f"Amount of memory allocated ({memory} GB), Amount of vCPU ({vcpu})")
+        return (f"Sistema operacional (Linux), Arquitetura da CPU ({architecture}), Número de tarefas ou pods ({tasks} por dia), "
+                f"Quantidade de memória alocada ({memory} GB), Quantidade de vCPU ({vcpu})")
+    
+    if kind == 'CloudFront':
+        transfer = rng.choice([100, 500, 1000])
+        if en:
+            return f"Data transfer out to internet ({transfer} GB per month)"
+        return f"Transferência de dados para a internet ({transfer} GB por mês)"
+    
+    size = rng.choice([50, 100, 1000])
+    if en:
+        return f"Storage ({size} GB)"
+    return f"Armazenamento ({size} GB)"
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """Converte 'EC2=30,RDS=10,...' no dicionário de pesos"""
+    mix = {}
+    for entry in text.split(','):
+        kind, _, weight = entry.partition('=')
+        kind = kind.strip()
+        if kind not in SERVICE_NAMES:
+            raise ValueError(f"Tipo de serviço desconhecido: {kind} (use {', '.join(SERVICE_NAMES)})")
+        mix[kind] = int(weight)
+    return mix
+
+def write_export(path: str, rows: int, language: str = 'pt', mix: Optional[Dict[str, int]] = None, seed: int = 0, crlf: bool = False,
+                 client: str = "ACME Ltda", account_id: str = "123456789012") -> None:
+    """Grava uma exportação sintética com `rows` linhas na tabela detalhada, linha a linha (sem montar o arquivo em memória)"""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    regions = REGIONS[language]
+    newline = '\r\n' if crlf else '\n'
+    
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for line in PREAMBLE[language] + [SECTION_TITLE[language]]:
+            f.write(line + newline)
+        
+        writer = csv.writer(f, lineterminator=newline)
+        writer.writerow(HEADERS[language])
+        
+        for kind in rng.choices(kinds, weights=weights, k=rows):
+            group = rng.choice(GROUPS)
+            upfront = rng.choice([0, 0, round(rng.uniform(10, 5000), 2)])
+            # Algumas linhas sem valor mensal, como nas exportações reais
+            monthly = "" if rng.random() < 0.02 else round(rng.uniform(1, 900), 2)
+            writer.writerow([
+                f"{client} - {account_id} > {group}", rng.choice(regions), "", rng.choice(SERVICE_NAMES[kind]),
+                upfront, monthly, "", "USD", "", _config(kind, rng, language)
+            ])
+        
+        for line in ACKNOWLEDGEMENT[language]:
+            f.write(line + newline)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Gera exportações sintéticas da Calculadora AWS")
+    parser.add_argument('output', help="Arquivo CSV de saída")
+    parser.add_argument('-n', '--rows', type=int, default=1000, help="Número de linhas na tabela detalhada")
+    parser.add_argument('--language', choices=sorted(HEADERS), default='pt', help="Layout das colunas (pt ou en)")
+    parser.add_argument('--mix', type=parse_mix, default=None, help="Pesos por serviço, ex.: EC2=30,RDS=15,Lambda=10")
+    parser.add_argument('--seed', type=int, default=0, help="Semente do gerador")
+    parser.add_argument('--crlf', action='store_true', help="Usar quebras de linha CRLF")
+    args = parser.parse_args(argv)
+    
+    write_export(args.output, args.rows, args.language, args.mix, args.seed, args.crlf)
+    print(f"{args.rows} linhas gravadas em {args.output}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Mede cada etapa do processamento (tempo, vazão e pico de memória) em exportações sintéticas de vários tamanhos"""
+import argparse
+import gc
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from generate_export import parse_mix, write_export
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+
+def load_core(root: str = REPO_ROOT):
+    """Importa o pacote `calculadora` do diretório indicado (permite medir outra cópia do repositório)"""
+    sys.path.insert(0, root)
+    return importlib.import_module('calculadora')
+
+def measure(function: Callable, repeat: int) -> Dict:
+    """Menor tempo entre `repeat` execuções e pico de memória (tracemalloc) de uma execução separada"""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    
+    # A medição de memória fica fora da cronometragem: o tracemalloc deixa as alocações mais lentas
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {'seconds': best, 'peak_mb': peak / 1e6}
+
+def benchmark_export(core, path: str, rows: int, repeat: int) -> List[Dict]:
+    """Mede as etapas em um arquivo; as entradas de cada etapa são preparadas fora da medição"""
+    df = core.normalize_columns(core.load_csv_file(path))
+    configs = list(zip(df['Resumo da configuração'].tolist(), df['Serviço'].tolist()))
+    data = core.process_csv(df)
+    # A memória de configurações é esvaziada antes de cada repetição: o tempo medido é o de um arquivo novo
+    # (árvores anteriores à memória não têm clear_config_cache)
+    clear_config_cache = getattr(core, 'clear_config_cache', lambda: None)
+    
+    def cold(function):
+        return lambda: (clear_config_cache(), function())
+    
+    stages = [
+        ('load_csv_file', lambda: core.load_csv_file(path)),
+        ('extract_instance_details', lambda: [core.extract_instance_details(config, service) for config, service in configs]),
+        ('process_csv', cold(lambda: core.process_csv(df))),
+        ('calculate_on_demand_costs', lambda: core.calculate_on_demand_costs(df)),
+        ('generate_summary', lambda: core.generate_summary(data, core.DEFAULT_EXCHANGE_RATE, core.DEFAULT_TAX_RATE)),
+    ]
+    if hasattr(core, 'cached_instance_details'):
+        stages.insert(2, ('cached_instance_details', cold(lambda: [core.cached_instance_details(config, service) for config, service in configs])))
+    
+    results = []
+    for stage, function in stages:
+        result = measure(function, repeat)
+        result.update({
+            'rows': rows,
+            'stage': stage,
+            'rows_per_second': rows / result['seconds'] if result['seconds'] > 0 else float('inf')
+        })
+        results.append(result)
+    return results
+
+def export_path(data_dir: str, rows: int, language: str, seed: int) -> str:
+    """Caminho do arquivo sintético; é gerado uma vez e reaproveitado entre execuções"""
+    return os.path.join(data_dir, f"export_{language}_{rows}_{seed}.csv")
+
+def print_results(results: List[Dict], baseline: Optional[Dict] = None) -> None:
+    """Tabela dos resultados; com uma execução de referência, mostra a razão entre os tempos"""
+    header = f"{'linhas':>9}  {'etapa':<26} {'tempo (s)':>10} {'linhas/s':>12} {'pico (MB)':>10}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    for result in results:
+        line = f"{result['rows']:>9}  {result['stage']:<26} {result['seconds']:>10.4f} {result['rows_per_second']:>12,.0f} {result['peak_mb']:>10.1f}"
+        previous = baseline.get((result['rows'], result['stage'])) if baseline else None
+        if previous:
+            line += f" {result['seconds'] / previous['seconds']:>7.2f}x"
+        print(line)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks das etapas do processamento de exportações da Calculadora AWS")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="Tamanhos (linhas) separados por vírgula; até 1000000")
+    parser.add_argument('--language', choices=['pt', 'en'], default='pt', help="Layout das colunas do arquivo gerado")
+    parser.add_argument('--mix', type=parse_mix, default=None, help="Pesos por serviço, ex.: EC2=30,RDS=15,Lambda=10")
+    parser.add_argument('--seed', type=int, default=0, help="Semente do gerador")
+    parser.add_argument('--repeat', type=int, default=3, help="Execuções por etapa (vale o menor tempo)")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'calculadora-benchmarks'),
+                        help="Onde os arquivos sintéticos ficam guardados")
+    parser.add_argument('--root', default=REPO_ROOT, help="Diretório com o pacote calculadora a medir")
+    parser.add_argument('--csv-engine', help="Leitor de CSV do load_csv_file (auto, pyarrow ou c); define CALCULADORA_CSV_ENGINE")
+    parser.add_argument('--json', dest='json_path', help="Grava os resultados em JSON")
+    parser.add_argument('--compare', help="JSON de uma execução anterior, para comparar os tempos")
+    args = parser.parse_args(argv)
+    
+    sizes = [int(size) for size in args.sizes.split(',')]
+    if args.csv_engine:
+        # Pela variável de ambiente, para valer também em cópias do pacote sem o parâmetro `engine`
+        os.environ['CALCULADORA_CSV_ENGINE'] = args.csv_engine
+    os.makedirs(args.data_dir, exist_ok=True)
+    core = load_core(args.root)
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = {(result['rows'], result['stage']): result for result in json.load(f)['results']}
+    
+    results = []
+    for rows in sizes:
+        path = export_path(args.data_dir, rows, args.language, args.seed)
+        # O mix entra no nome apenas quando informado, para reaproveitar os arquivos padrão
+        if args.mix:
+            path = path.replace('.csv', '_' + '_'.join(f"{kind}{weight}" for kind, weight in args.mix.items()) + '.csv')
+        if not os.path.exists(path):
+            print(f"Gerando {path}...", file=sys.stderr)
+            write_export(path, rows, args.language, args.mix, args.seed)
+        print(f"Medindo {rows} linhas...", file=sys.stderr)
+        results.extend(benchmark_export(core, path, rows, args.repeat))
+    
+    print_results(results, baseline)
+    
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'language': args.language,
+                'seed': args.seed,
+                'repeat': args.repeat,
+                'csv_engine': args.csv_engine or os.environ.get('CALCULADORA_CSV_ENGINE', 'auto'),
+                'results': results
+            }, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Verificação do serviço HTTP com um cliente local: sobe make_server em uma porta livre e envia uma exportação sintética"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from typing import Dict, Optional, Tuple
+
+from generate_export import write_export
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def request(base_url: str, path: str, body: Optional[bytes] = None) -> Tuple[int, Dict]:
+    """GET (sem corpo) ou POST com os bytes do CSV; devolve o status e o JSON da resposta"""
+    http_request = urllib.request.Request(base_url + path, data=body, method='POST' if body is not None else 'GET')
+    try:
+        with urllib.request.urlopen(http_request, timeout=120) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def request_headers_only(address: Tuple[str, int], path: str, length: int) -> Tuple[int, Dict]:
+    """POST só com os cabeçalhos: o servidor recusa pelo Content-Length e fecha a conexão sem ler o corpo"""
+    connection = http.client.HTTPConnection(*address, timeout=120)
+    try:
+        connection.putrequest('POST', path)
+        connection.putheader('Content-Length', str(length))
+        connection.endheaders()
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+def check(name: str, condition: bool, detail: str = '') -> bool:
+    print(f"{'OK  ' if condition else 'FALHA'} {name}" + (f": {detail}" if detail and not condition else ''))
+    return condition
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--rows', type=int, default=2000, help="Linhas da exportação sintética")
+    parser.add_argument('--language', choices=['pt', 'en'], default='pt', help="Layout das colunas do arquivo gerado")
+    parser.add_argument('-j', '--workers', type=int, default=1, help="Processos do servidor")
+    parser.add_argument('--root', default=REPO_ROOT, help="Diretório com o pacote calculadora a verificar")
+    args = parser.parse_args(argv)
+    
+    sys.path.insert(0, args.root)
+    from calculadora import make_server, summarize_export
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'exportacao.csv')
+        write_export(path, args.rows, args.language)
+        with open(path, 'rb') as f:
+            file_bytes = f.read()
+    
+    # Porta 0: o sistema escolhe uma porta livre; 1 MB de limite para verificar a recusa de CSVs grandes
+    server = make_server(port=0, workers=args.workers, max_upload_mb=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    print(f"Servidor em {base_url}")
+    
+    try:
+        results = []
+        status, body = request(base_url, '/health')
+        results.append(check("GET /health", status == 200 and body == {'status': 'ok'}, f"{status} {body}"))
+        
+        status, body = request(base_url, '/summary?exchange_rate=5.25&payment_type=No%20Upfront', file_bytes)
+        expected = summarize_export(file_bytes, exchange_rate=5.25, global_payment_type='No Upfront')
+        results.append(check("POST /summary", status == 200 and body['resumo'] == expected['resumo'] and body['totais'] == expected['totais'], f"{status} {body.get('erro', '')}"))
+        
+        status, body = request(base_url, '/scenarios?exchange_rate=5.2,5.5&tax_rate=13.83', file_bytes)
+        results.append(check("POST /scenarios", status == 200 and isinstance(body, list) and len(body) == 8 * 2, f"{status} {body if status != 200 else len(body)}"))
+        
+        status, body = request(base_url, '/summary', b"sem secao de detalhes\n")
+        results.append(check("POST /summary com CSV inválido (400)", status == 400 and 'erro' in body, f"{status} {body}"))
+        
+        status, body = request(base_url, '/summary?payment_type=Partial', file_bytes)
+        results.append(check("POST /summary com opção inválida (400)", status == 400, f"{status} {body}"))
+        
+        status, body = request_headers_only(server.server_address, '/summary', 1024 * 1024 + 1)
+        results.append(check("POST /summary acima do limite (413)", status == 413, f"{status} {body}"))
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.executor.shutdown()
+    
+    failed = results.count(False)
+    print(f"{len(results) - failed} verificação(ões) OK, {failed} falha(s)")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Núcleo da Calculadora AWS, sem Streamlit: leitura, precificação, resumos, cenários, lotes e serviço HTTP.
+
+Os nomes são carregados sob demanda: `import calculadora` não importa o pandas; ele só é
+importado quando uma função que depende dele (leitura, precificação, cenários) é usada.
+"""
+import importlib
+from typing import List
+
+# Nome público -> submódulo que o define
+_EXPORTS = {
+    # Opções, padrões da linha de comando e regras de preço
+    'PAYMENT_OPTIONS': 'options',
+    'GLOBAL_PAYMENT_TYPES': 'options',
+    'DEFAULT_EXCHANGE_RATE': 'options',
+    'DEFAULT_TAX_RATE': 'options',
+    'SERVER_DEFAULT_HOST': 'options',
+    'SERVER_DEFAULT_PORT': 'options',
+    'SERVER_MAX_UPLOAD_MB': 'options',
+    'CSV_ENGINES': 'options',
+    'CSV_ENGINE_ENV': 'options',
+    'PRICING_RULES': 'options',
+    'PRICING_RULE_OPTIONS': 'options',
+    'pricing_options': 'options',
+    # Desempenho
+    'PerformanceLog': 'performance',
+    'measure_stage': 'performance',
+    'timed_stage': 'performance',
+    # Leitura dos CSVs
+    'REQUIRED_COLUMNS_PT': 'loader',
+    'REQUIRED_COLUMNS_EN': 'loader',
+    'COLUMN_MAPPING': 'loader',
+    'load_csv_file': 'loader',
+    'normalize_columns': 'loader',
+    'COLUMN_DTYPES': 'loader',
+    'resolve_csv_engine': 'loader',
+    'ConfigRecord': 'config_summary',
+    'tokenize_config': 'config_summary',
+    'extract_instance_details': 'config_summary',
+    'CONFIG_DETAILS_CACHE_SIZE': 'config_summary',
+    'cached_instance_details': 'config_summary',
+    'config_cache_info': 'config_summary',
+    'clear_config_cache': 'config_summary',
+    # Catálogo de regiões
+    'AwsRegion': 'regions',
+    'AWS_REGIONS': 'regions',
+    'REGIONS_BY_CODE': 'regions',
+    'SAO_PAULO_GROUP': 'regions',
+    'DEFAULT_REGION_GROUP': 'regions',
+    'resolve_region': 'regions',
+    'region_code': 'regions',
+    'region_discount_group': 'regions',
+    'region_summary_name': 'regions',
+    # Descontos e precificação
+    'DISCOUNT_RULES_PATH': 'discounts',
+    'DISCOUNT_WILDCARD': 'discounts',
+    'DISCOUNT_CREDIT_CONDITIONS': 'discounts',
+    'load_discount_rules': 'discounts',
+    'lookup_discounts': 'discounts',
+    'LineItem': 'records',
+    'services_to_dict': 'records',
+    'LINE_ITEM_COLUMNS': 'records',
+    'line_item_columns': 'records',
+    'parse_line_items': 'pricing',
+    'price_rule': 'pricing',
+    'assemble_services': 'pricing',
+    'price_line_items': 'pricing',
+    'process_csv': 'pricing',
+    'calculate_on_demand_costs': 'pricing',
+    # Resumos
+    'SUMMARY_SERVICE_ORDER': 'summary',
+    'aggregate_services': 'summary',
+    'generate_summary': 'summary',
+    'parse_export': 'portfolio',
+    'merge_processed': 'portfolio',
+    'consolidate_accounts': 'portfolio',
+    'portfolio_region_totals': 'portfolio',
+    'generate_portfolio_summary': 'portfolio',
+    # Cache em disco das exportações já lidas
+    'CACHE_DIR_ENV': 'cache',
+    'CACHE_MAX_MB_ENV': 'cache',
+    'DEFAULT_CACHE_MAX_MB': 'cache',
+    'CACHE_FORMAT_VERSION': 'cache',
+    'ParsedExportCache': 'cache',
+    'content_hash': 'cache',
+    'parse_fingerprint': 'cache',
+    'default_cache': 'cache',
+    'default_cache_dir': 'cache',
+    # Conjuntos de itens processados (Parquet / Arrow IPC)
+    'DATASET_FORMATS': 'datasets',
+    'DATASET_COLUMNS': 'datasets',
+    'arrow_available': 'datasets',
+    'dataset_format': 'datasets',
+    'line_items_table': 'datasets',
+    'write_line_items': 'datasets',
+    'read_line_items_table': 'datasets',
+    'processed_from_table': 'datasets',
+    'read_line_items': 'datasets',
+    # Cenários
+    'scenario_totals': 'scenarios',
+    'scenario_matrix': 'scenarios',
+    'parse_rate_list': 'scenarios',
+    'SCENARIO_COLUMN_LABELS': 'scenarios',
+    # Comparação de versões de uma cotação
+    'DIFF_STATUSES': 'quote_diff',
+    'DIFF_TOTAL_LABELS': 'quote_diff',
+    'line_item_key': 'quote_diff',
+    'index_line_items': 'quote_diff',
+    'diff_quotes': 'quote_diff',
+    'generate_diff_report': 'quote_diff',
+    'diff_exports': 'quote_diff',
+    # Sem interface: lotes, serviço HTTP e linha de comando
+    'summarize_processed': 'batch',
+    'summarize_export': 'batch',
+    'summarize_path': 'batch',
+    'parse_export_cached': 'batch',
+    'iter_parsed_uploads': 'batch',
+    'scenario_records': 'batch',
+    'process_export': 'batch',
+    'find_exports': 'batch',
+    'run_batch': 'batch',
+    'price_export': 'batch',
+    'price_exports': 'batch',
+    'SUMMARY_TOTALS_COLUMNS': 'batch',
+    'SUMMARY_TOTALS_FILE': 'batch',
+    'summary_file_name': 'batch',
+    'SummaryZipWriter': 'batch',
+    'write_summary_zip': 'batch',
+    'FolderWatcher': 'watch',
+    'WatchManifest': 'watch',
+    'WATCH_MANIFEST_FILE': 'watch',
+    'process_watched_file': 'watch',
+    'SummaryRequestHandler': 'server',
+    'summary_request_options': 'server',
+    'make_server': 'server',
+    'serve': 'server',
+    'cli': 'command_line'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    """Importa o submódulo de um nome público no primeiro acesso e guarda o valor no pacote"""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,7 @@
+"""`python -m calculadora batch|scenarios|serve ...`"""
+import sys
+
+from .command_line import cli
+
+if __name__ == "__main__":
+    sys.exit(cli(sys.argv[1:]))
@@ -0,0 +1,330 @@
+"""Processamento sem interface: resumo de um CSV, cenários, lotes de arquivos em paralelo e ZIP de resumos"""
+import csv
+import glob
+import io
+import os
+import re
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .options import DEFAULT_EXCHANGE_RATE, DEFAULT_TAX_RATE, GLOBAL_PAYMENT_TYPES, PAYMENT_OPTIONS
+
+# As etapas que dependem do pandas são importadas dentro das funções: só os processos que leem
+# os CSVs pagam essa importação, não o que apenas distribui o trabalho (lote, serviço HTTP)
+
+def summarize_processed(data: Dict, exchange_rate: float = DEFAULT_EXCHANGE_RATE, tax_rate: float = DEFAULT_TAX_RATE, lambda_payment_option: str = PAYMENT_OPTIONS[0], fargate_payment_option: str = PAYMENT_OPTIONS[0], aggregation: Optional[Dict] = None) -> Dict:
+    """Resumo em texto e totais estruturados por região e serviço de um resultado já processado"""
+    from .summary import aggregate_services, generate_summary
+    
+    if aggregation is None:
+        aggregation = aggregate_services(data)
+    summary = generate_summary(data, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option, aggregation)
+    
+    return {
+        'client_name': data['client_name'],
+        'account_id': data['account_id'],
+        'resumo': summary,
+        'totais': {
+            'on_demand_anual': aggregation['on_demand_annual'],
+            'no_upfront_mensal': aggregation['no_upfront_monthly'],
+            'no_upfront_anual': aggregation['no_upfront_annual'],
+            'all_upfront_anual': aggregation['all_upfront'],
+            'regioes': aggregation['region_count'],
+            'servicos': aggregation['item_count']
+        },
+        'regioes': [
+            {
+                'regiao': region_entry['region'],
+                'nome': region_entry['region_name'],
+                'no_upfront_mensal': region_entry['no_upfront_monthly'],
+                'all_upfront_anual': region_entry['all_upfront'],
+                'servicos': [
+                    {
+                        'servico': service['service_type'],
+                        'itens': service['item_count'],
+                        'quantidade': service['total_quantity'],
+                        'no_upfront_mensal': service['no_upfront_cost'],
+                        'all_upfront_anual': service['all_upfront_annual']
+                    }
+                    for service in region_entry['services']
+                ]
+            }
+            for region_entry in aggregation['regions']
+        ]
+    }
+
+def summarize_export(file_bytes: bytes, exchange_rate: float = DEFAULT_EXCHANGE_RATE, tax_rate: float = DEFAULT_TAX_RATE, lambda_payment_option: str = PAYMENT_OPTIONS[0], fargate_payment_option: str = PAYMENT_OPTIONS[0], global_payment_type: str = GLOBAL_PAYMENT_TYPES[0], csv_engine: Optional[str] = None) -> Dict:
+    """Pipeline completo sobre os bytes de um CSV: resumo em texto e totais estruturados por região e serviço"""
+    from .portfolio import parse_export
+    from .pricing import price_line_items
+    
+    data = price_line_items(parse_export(file_bytes, csv_engine), lambda_payment_option, fargate_payment_option, global_payment_type)
+    return summarize_processed(data, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option)
+
+def scenario_records(file_bytes: bytes, exchange_rates: List[float], tax_rates: List[float]) -> List[Dict]:
+    """Grade de cenários de um CSV como lista de registros (para JSON)"""
+    from .portfolio import parse_export
+    from .scenarios import scenario_matrix
+    
+    grid = scenario_matrix(parse_export(file_bytes), exchange_rates, tax_rates)
+    # NaN (economia sem On Demand) não é JSON válido
+    return grid.astype(object).where(grid.notna(), None).to_dict(orient='records')
+
+def process_export(path: str, output_dir: str, exchange_rate: float = DEFAULT_EXCHANGE_RATE, tax_rate: float = DEFAULT_TAX_RATE, lambda_payment_option: str = PAYMENT_OPTIONS[0], fargate_payment_option: str = PAYMENT_OPTIONS[0], global_payment_type: str = GLOBAL_PAYMENT_TYPES[0], timings: bool = False, track_memory: bool = False, profile: bool = False, csv_engine: Optional[str] = None, input_root: Optional[str] = None) -> Dict:
+    """Processa um CSV da Calculadora AWS, grava o resumo em texto e devolve os totais
+    (e, se pedido, o tempo de cada etapa e um perfil cProfile ao lado do resumo).
+    
+    Com `input_root`, o resumo repete em `output_dir` as subpastas do CSV abaixo dessa pasta.
+    """
+    from .loader import load_csv_file, normalize_columns
+    from .performance import PerformanceLog
+    from .pricing import process_csv
+    from .summary import aggregate_services, generate_summary
+    
+    performance = PerformanceLog(track_memory=track_memory, profile=profile)
+    with performance:
+        df = normalize_columns(load_csv_file(path, csv_engine))
+        data = process_csv(df, lambda_payment_option, fargate_payment_option, global_payment_type)
+        aggregation = aggregate_services(data)
+        summary = generate_summary(data, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option, aggregation)
+    
+    stem = os.path.join(output_dir, _output_stem(path, input_root))
+    os.makedirs(os.path.dirname(stem) or '.', exist_ok=True)
+    summary_path = stem + '.txt'
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        f.write(summary)
+    
+    result = {
+        'arquivo': path,
+        'resumo': summary_path,
+        'client_name': data['client_name'],
+        'account_id': data['account_id'],
+        'on_demand_anual': aggregation['on_demand_annual'],
+        'no_upfront_anual': aggregation['no_upfront_annual'],
+        'all_upfront_anual': aggregation['all_upfront']
+    }
+    if timings or track_memory:
+        result['desempenho'] = {'total_segundos': performance.total_seconds, 'etapas': performance.records}
+    if profile:
+        result['perfil'] = stem + '.prof'
+        performance.dump_profile(result['perfil'])
+    return result
+
+def _output_stem(path: str, input_root: Optional[str] = None) -> str:
+    """Caminho do resumo (sem extensão) relativo à pasta de saída"""
+    relative = os.path.relpath(path, input_root) if input_root else os.path.basename(path)
+    return os.path.splitext(relative)[0]
+
+def batch_input_root(paths: List[str]) -> str:
+    """Pasta comum dos CSVs de um lote: os resumos repetem a estrutura de pastas abaixo dela"""
+    return os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths]) if paths else ''
+
+def find_exports(inputs: List[str]) -> List[str]:
+    """Expande diretórios e padrões glob na lista de CSVs a processar"""
+    paths = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            paths.extend(sorted(glob.glob(os.path.join(entry, '*.csv'))))
+        elif glob.has_magic(entry):
+            paths.extend(sorted(glob.glob(entry, recursive=True)))
+        else:
+            paths.append(entry)
+    # Remover duplicados mantendo a ordem
+    return list(dict.fromkeys(paths))
+
+def _compute_result(path: str, compute: Callable[[], Dict]) -> Dict:
+    """Resultado de um arquivo (ou o erro), informando o andamento"""
+    try:
+        result = compute()
+        print(f"OK    {path}", file=sys.stderr)
+    except Exception as e:
+        result = {'arquivo': path, 'erro': str(e)}
+        print(f"ERRO  {path}: {e}", file=sys.stderr)
+    return result
+
+def _iter_calls(function: Callable[..., Dict], calls: Dict[str, Tuple], workers: Optional[int], **options) -> Iterator[Tuple[str, Dict]]:
+    """Aplica `function(*argumentos, **options)` a cada chamada de `calls` (nome -> argumentos) em processos
+    separados e entrega (nome, resultado) à medida que cada uma termina; erros voltam como {'arquivo', 'erro'}"""
+    if len(calls) <= 1 or workers == 1:
+        # Uma chamada (ou um processo): processar aqui mesmo, sem criar o pool
+        for name, arguments in calls.items():
+            yield name, _compute_result(name, partial(function, *arguments, **options))
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(function, *arguments, **options): name for name, arguments in calls.items()}
+        for future in as_completed(futures):
+            # Soltar o futuro entregue: o resultado não fica retido até o fim do lote
+            name = futures.pop(future)
+            yield name, _compute_result(name, future.result)
+
+def _iter_parallel(function: Callable[..., Dict], paths: List[str], workers: Optional[int], *args, **options) -> Iterator[Tuple[str, Dict]]:
+    """Aplica `function(path, *args, **options)` a cada arquivo em processos separados e entrega
+    (path, resultado) à medida que cada um termina; erros voltam como {'arquivo', 'erro'}"""
+    return _iter_calls(function, {path: (path, *args) for path in paths}, workers, **options)
+
+def parse_export_cached(file_bytes: bytes, file_hash: Optional[str] = None) -> Dict:
+    """parse_export pelo cache em disco, quando ele está configurado (função de módulo, para rodar nos processos do pool)"""
+    from .cache import default_cache
+    from .portfolio import parse_export
+    
+    export_cache = default_cache()
+    if export_cache is None:
+        return parse_export(file_bytes)
+    return export_cache.parse_export(file_bytes, file_hash)
+
+def iter_parsed_uploads(uploads: Dict[str, Tuple[str, bytes]], workers: Optional[int] = None) -> Iterator[Tuple[str, str, Dict]]:
+    """Lê vários CSVs enviados (hash -> (nome, bytes)) em um pool de processos e entrega
+    (hash, nome, itens normalizados ou {'erro'}) à medida que cada um termina"""
+    # Nome e início do hash: o rótulo no andamento é legível e distingue arquivos de mesmo nome
+    calls = {f"{name} [{file_hash[:12]}]": (file_bytes, file_hash) for file_hash, (name, file_bytes) in uploads.items()}
+    keys = dict(zip(calls, uploads.items()))
+    for label, result in _iter_calls(parse_export_cached, calls, workers or min(len(calls), os.cpu_count() or 1)):
+        file_hash, (name, _) = keys[label]
+        yield file_hash, name, result
+
+def _run_parallel(function: Callable[..., Dict], paths: List[str], workers: Optional[int], *args, **options) -> List[Dict]:
+    """Aplica `function(path, *args, **options)` a cada arquivo em processos separados; resultados na ordem de entrada"""
+    results = dict(_iter_parallel(function, paths, workers, *args, **options))
+    return [results[path] for path in paths]
+
+def run_batch(paths: List[str], output_dir: str, workers: Optional[int] = None, **options) -> List[Dict]:
+    """Processa vários CSVs em paralelo (um processo por núcleo) e devolve os totais na ordem de entrada.
+    
+    Os resumos ficam nas subpastas relativas à pasta comum dos CSVs (`a/export.csv` e `b/export.csv`
+    não se sobrescrevem); dois CSVs que ainda assim dariam o mesmo resumo são um erro, antes de processar.
+    """
+    input_root = batch_input_root(paths)
+    stems = {}
+    for path in paths:
+        stem = os.path.normcase(_output_stem(path, input_root))
+        if stem in stems:
+            raise ValueError(f"{stems[stem]} e {path} gravariam o mesmo resumo em {output_dir}")
+        stems[stem] = path
+    
+    os.makedirs(output_dir, exist_ok=True)
+    return _run_parallel(process_export, paths, workers, output_dir, input_root=input_root, **options)
+
+def price_export(path: str, lambda_payment_option: str = PAYMENT_OPTIONS[0], fargate_payment_option: str = PAYMENT_OPTIONS[0], global_payment_type: str = GLOBAL_PAYMENT_TYPES[0], csv_engine: Optional[str] = None) -> Dict:
+    """Lê e precifica um CSV: o resultado processado (com os itens), para gravar como conjunto de dados"""
+    from .loader import load_csv_file, normalize_columns
+    from .pricing import process_csv
+    
+    return process_csv(normalize_columns(load_csv_file(path, csv_engine)), lambda_payment_option, fargate_payment_option, global_payment_type)
+
+def price_exports(paths: List[str], workers: Optional[int] = None, **options) -> List[Dict]:
+    """Lê e precifica vários CSVs em paralelo; os que falham voltam como {'arquivo', 'erro'}"""
+    return _run_parallel(price_export, paths, workers, **options)
+
+# Colunas do CSV de totais do ZIP de resumos
+SUMMARY_TOTALS_COLUMNS = [
+    'arquivo', 'resumo', 'client_name', 'account_id', 'on_demand_anual', 'no_upfront_mensal',
+    'no_upfront_anual', 'all_upfront_anual', 'regioes', 'servicos', 'erro'
+]
+SUMMARY_TOTALS_FILE = 'totais.csv'
+_UNSAFE_NAME_RE = re.compile(r'[^\w.\- ]+')
+
+def summary_file_name(client_name: str, account_id: str) -> str:
+    """Nome do arquivo do resumo de uma conta (o mesmo do download no app), sem caracteres inválidos em caminhos"""
+    return _UNSAFE_NAME_RE.sub('_', f"resumo_aws_{client_name}_{account_id}") + '.txt'
+
+def summarize_path(path: str, **options) -> Dict:
+    """summarize_export de um arquivo em disco (lido no processo que o resume)"""
+    with open(path, 'rb') as f:
+        return summarize_export(f.read(), **options)
+
+class SummaryZipWriter:
+    """ZIP com o resumo de cada conta e um CSV de totais, gravado à medida que os resumos ficam prontos.
+    
+    Cada resumo é comprimido e gravado assim que é adicionado (o destino pode ser um fluxo sem
+    `seek`, como a saída padrão); só as linhas de totais ficam em memória até `close`.
+    """
+    
+    def __init__(self, destination):
+        self.zip_file = zipfile.ZipFile(destination, 'w', compression=zipfile.ZIP_DEFLATED)
+        self.rows: List[Dict] = []
+        self.closed = False
+        self._names = set()
+    
+    def _entry_name(self, client_name: str, account_id: str) -> str:
+        """Nome da entrada; contas repetidas ganham um sufixo numérico"""
+        name = summary_file_name(client_name, account_id)
+        stem, counter = name[:-len('.txt')], 2
+        while name in self._names:
+            name = f"{stem}_{counter}.txt"
+            counter += 1
+        self._names.add(name)
+        return name
+    
+    def add(self, source: str, result: Dict) -> Dict:
+        """Grava o resumo de um resultado de summarize_export (ou registra o erro) e devolve a linha de totais"""
+        row = dict.fromkeys(SUMMARY_TOTALS_COLUMNS, '')
+        row['arquivo'] = source
+        if 'erro' in result:
+            row['erro'] = result['erro']
+        else:
+            row['resumo'] = self._entry_name(result['client_name'], result['account_id'])
+            row['client_name'] = result['client_name']
+            row['account_id'] = result['account_id']
+            row.update(result['totais'])
+            self.zip_file.writestr(row['resumo'], result['resumo'].encode('utf-8'))
+        self.rows.append(row)
+        return row
+    
+    def close(self, order: Optional[List[str]] = None) -> None:
+        """Grava o CSV de totais (na ordem `order` dos arquivos, se informada, com a linha de total geral) e fecha o ZIP"""
+        if self.closed:
+            return
+        self.closed = True
+        rows = self.rows
+        if order is not None:
+            position = {source: index for index, source in enumerate(order)}
+            rows = self.rows = sorted(rows, key=lambda row: position.get(row['arquivo'], len(position)))
+        
+        total = dict.fromkeys(SUMMARY_TOTALS_COLUMNS, '')
+        total['arquivo'] = 'Total geral'
+        for column in ('on_demand_anual', 'no_upfront_mensal', 'no_upfront_anual', 'all_upfront_anual', 'servicos'):
+            total[column] = sum(row[column] for row in rows if not row['erro'])
+        
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=SUMMARY_TOTALS_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+        writer.writerow(total)
+        self.zip_file.writestr(SUMMARY_TOTALS_FILE, buffer.getvalue().encode('utf-8'))
+        self.zip_file.close()
+    
+    def __enter__(self) -> 'SummaryZipWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        elif not self.closed:
+            # Interrompido: fechar o ZIP com as entradas já gravadas, sem o CSV de totais
+            self.closed = True
+            self.zip_file.close()
+
+def write_summary_zip(destination, paths: List[str], workers: Optional[int] = None, **options) -> List[Dict]:
+    """Resume vários CSVs em paralelo e grava um ZIP com o resumo de cada um e o CSV de totais.
+    
+    Os resumos entram no ZIP na ordem de entrada, assim que o arquivo e os anteriores terminam: os
+    nomes (e os sufixos de contas repetidas) não dependem de qual processo termina antes. `destination`
+    é um caminho ou um objeto de arquivo binário (inclusive sem `seek`). Devolve as linhas de totais na ordem de entrada.
+    """
+    paths = list(dict.fromkeys(paths))
+    position = {path: index for index, path in enumerate(paths)}
+    # Resumos que terminaram antes de um arquivo anterior: só o texto de cada um fica em espera
+    waiting: Dict[int, Tuple[str, Dict]] = {}
+    next_index = 0
+    with SummaryZipWriter(destination) as writer:
+        for path, result in _iter_parallel(summarize_path, paths, workers, **options):
+            waiting[position[path]] = (path, result)
+            while next_index in waiting:
+                writer.add(*waiting.pop(next_index))
+                next_index += 1
+        writer.close(paths)
+    return writer.rows
@@ -0,0 +1,203 @@
+"""Cache em disco dos itens normalizados de cada exportação (Parquet), com limite de tamanho e descarte LRU"""
+import hashlib
+import importlib.util
+import json
+import os
+import tempfile
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from .performance import measure_stage
+
+# Diretório e tamanho máximo do cache; CALCULADORA_CACHE_MB=0 desliga o cache
+CACHE_DIR_ENV = 'CALCULADORA_CACHE_DIR'
+CACHE_MAX_MB_ENV = 'CALCULADORA_CACHE_MB'
+DEFAULT_CACHE_MAX_MB = 512
+# Muda quando parse_line_items passa a produzir outros itens: as entradas antigas deixam de ser lidas
+CACHE_FORMAT_VERSION = 3
+_CACHE_SUFFIX = f'.v{CACHE_FORMAT_VERSION}.parquet'
+# Chave dos metadados do arquivo Parquet com os campos do resultado que não são colunas
+_METADATA_KEY = b'calculadora'
+
+def default_cache_dir() -> str:
+    """Diretório padrão: $CALCULADORA_CACHE_DIR ou calculadora/ dentro do cache do usuário"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(base, 'calculadora')
+
+def content_hash(file_bytes: bytes) -> str:
+    """Chave do cache: SHA-256 do conteúdo do arquivo"""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+@lru_cache(maxsize=None)
+def parse_fingerprint() -> str:
+    """SHA-256 das tabelas que entram nos itens normalizados: o catálogo de regiões (grupo de desconto
+    de cada item) e a tabela de descontos. Gravado em cada entrada; uma entrada com outra impressão
+    (tabela ou catálogo editados depois de gravada) é descartada na leitura"""
+    from .discounts import DISCOUNT_RULES_PATH
+    from .regions import AWS_REGIONS
+    
+    digest = hashlib.sha256(json.dumps([list(region) for region in AWS_REGIONS]).encode('utf-8'))
+    with open(DISCOUNT_RULES_PATH, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+class ParsedExportCache:
+    """Itens normalizados (saída de parse_line_items) em um arquivo Parquet por exportação.
+    
+    Vários processos podem usar o mesmo diretório: cada entrada é gravada em um arquivo
+    temporário e publicada com `os.replace`, então um leitor nunca vê um arquivo pela metade.
+    A data de modificação marca o último uso; acima de `max_bytes`, as entradas usadas há
+    mais tempo são apagadas. Cada entrada guarda a impressão do catálogo de regiões e da tabela
+    de descontos (`fingerprint`, por padrão parse_fingerprint()) e só é lida com a mesma impressão.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int, fingerprint: Optional[str] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fingerprint = fingerprint or parse_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, file_hash: str) -> str:
+        return os.path.join(self.directory, file_hash + _CACHE_SUFFIX)
+    
+    def __contains__(self, file_hash: str) -> bool:
+        return os.path.exists(self._path(file_hash))
+    
+    def get(self, file_hash: str) -> Optional[Dict]:
+        """Itens normalizados de uma exportação já vista, ou None"""
+        import pyarrow.parquet as pq
+        
+        path = self._path(file_hash)
+        with measure_stage('export_cache.get') as record:
+            try:
+                table = pq.read_table(path)
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            except Exception:
+                # Entrada ilegível (gravada por outra versão, disco cheio...): descartar e processar de novo
+                self._remove(path)
+                self.misses += 1
+                return None
+            metadata = json.loads(table.schema.metadata[_METADATA_KEY])
+            if metadata.get('fingerprint') != self.fingerprint:
+                # Gravada com outro catálogo de regiões ou outra tabela de descontos: processar de novo
+                self._remove(path)
+                self.misses += 1
+                return None
+            # Marcar o uso (a entrada pode ter sido descartada por outro processo nesse meio-tempo)
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            
+            line_items = table.replace_schema_metadata(None).to_pandas()
+            # O Parquet devolve as listas como arrays; os itens usam listas, como em parse_line_items
+            line_items['specs'] = [list(specs) if specs is not None else [] for specs in line_items['specs'].tolist()]
+            record['rows'] = len(line_items)
+        
+        self.hits += 1
+        return {
+            'client_name': metadata['client_name'],
+            'account_id': metadata['account_id'],
+            'regions': set(metadata['regions']),
+            'on_demand_total': metadata['on_demand_total'],
+            'line_items': line_items
+        }
+    
+    def put(self, file_hash: str, parsed: Dict) -> None:
+        """Grava os itens normalizados de uma exportação e aplica o limite de tamanho"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        with measure_stage('export_cache.put', rows=len(parsed['line_items'])):
+            metadata = {
+                'client_name': parsed['client_name'],
+                'account_id': parsed['account_id'],
+                'regions': sorted(parsed['regions']),
+                'on_demand_total': parsed['on_demand_total'],
+                'fingerprint': self.fingerprint
+            }
+            table = pa.Table.from_pandas(parsed['line_items'], preserve_index=False)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), _METADATA_KEY: json.dumps(metadata).encode('utf-8')})
+            
+            fd, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pq.write_table(table, f)
+                os.replace(temporary_path, self._path(file_hash))
+            except BaseException:
+                self._remove(temporary_path)
+                raise
+        
+        self.evict()
+    
+    def parse_export(self, file_bytes: bytes, file_hash: Optional[str] = None) -> Dict:
+        """parse_export com o cache: uma exportação já vista não é lida de novo"""
+        from .portfolio import parse_export
+        
+        file_hash = file_hash or content_hash(file_bytes)
+        parsed = self.get(file_hash)
+        if parsed is None:
+            parsed = parse_export(file_bytes)
+            self.put(file_hash, parsed)
+        return parsed
+    
+    def entries(self) -> List[os.DirEntry]:
+        """Entradas do cache, da usada há mais tempo para a mais recente"""
+        entries = []
+        with os.scandir(self.directory) as iterator:
+            for entry in iterator:
+                if entry.name.endswith(_CACHE_SUFFIX):
+                    try:
+                        entry.stat()
+                    except FileNotFoundError:
+                        # Apagada por outro processo durante a listagem
+                        continue
+                    entries.append(entry)
+        return sorted(entries, key=lambda entry: entry.stat().st_mtime)
+    
+    def size(self) -> int:
+        """Bytes ocupados pelas entradas"""
+        return sum(entry.stat().st_size for entry in self.entries())
+    
+    def evict(self) -> int:
+        """Apaga as entradas usadas há mais tempo até caber no limite; devolve quantas foram apagadas"""
+        entries = self.entries()
+        total = sum(entry.stat().st_size for entry in entries)
+        removed = 0
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            total -= entry.stat().st_size
+            self._remove(entry.path)
+            removed += 1
+        return removed
+    
+    def clear(self) -> None:
+        """Apaga todas as entradas"""
+        for entry in self.entries():
+            self._remove(entry.path)
+    
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+@lru_cache(maxsize=None)
+def default_cache() -> Optional[ParsedExportCache]:
+    """Cache configurado pelas variáveis de ambiente; None se desligado ou sem pyarrow (dependência opcional)"""
+    max_mb = float(os.environ.get(CACHE_MAX_MB_ENV, DEFAULT_CACHE_MAX_MB))
+    if max_mb <= 0:
+        return None
+    if importlib.util.find_spec('pyarrow') is None:
+        return None
+    try:
+        return ParsedExportCache(default_cache_dir(), int(max_mb * 1024 * 1024))
+    except OSError:
+        # Diretório sem permissão de escrita: seguir sem cache
+        return None
@@ -0,0 +1,273 @@
+"""Linha de comando: lotes de resumos, conjuntos de itens, grade de cenários, comparação de cotações, pasta monitorada e serviço HTTP"""
+import argparse
+import json
+import os
+import sys
+from typing import List
+
+from .options import (
+    CSV_ENGINE_ENV, CSV_ENGINES, DEFAULT_EXCHANGE_RATE, DEFAULT_TAX_RATE, GLOBAL_PAYMENT_TYPES, PAYMENT_OPTIONS,
+    SERVER_DEFAULT_HOST, SERVER_DEFAULT_PORT, SERVER_MAX_UPLOAD_MB, WATCH_DEFAULT_INTERVAL, WATCH_SETTLE_SECONDS
+)
+
+def _add_payment_arguments(parser: argparse.ArgumentParser) -> None:
+    """Formas de pagamento, com os mesmos nomes e padrões da barra lateral"""
+    parser.add_argument('--lambda-payment', choices=PAYMENT_OPTIONS, default=PAYMENT_OPTIONS[0], help="Forma de pagamento Lambda")
+    parser.add_argument('--fargate-payment', choices=PAYMENT_OPTIONS, default=PAYMENT_OPTIONS[0], help="Forma de pagamento ECS Fargate")
+    parser.add_argument('--payment-type', choices=GLOBAL_PAYMENT_TYPES, default=GLOBAL_PAYMENT_TYPES[0], help="Tipo de pagamento para EC2/RDS/ElastiCache")
+
+def _add_csv_engine_argument(parser: argparse.ArgumentParser) -> None:
+    """Leitor de CSV (o pyarrow lê com várias threads)"""
+    parser.add_argument('--csv-engine', choices=CSV_ENGINES, default=None, help=f"Leitor de CSV (padrão: ${CSV_ENGINE_ENV} ou auto, o pyarrow quando instalado)")
+
+def cli(argv: List[str]) -> int:
+    """Ponto de entrada de linha de comando (sem Streamlit)"""
+    parser = argparse.ArgumentParser(description="Resumo de Custos AWS - Savings Plans (linha de comando)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    batch = subparsers.add_parser('batch', help="Processa um diretório ou padrão glob de CSVs da Calculadora AWS")
+    batch.add_argument('inputs', nargs='+', help="Arquivos CSV, diretórios ou padrões glob")
+    batch.add_argument('-o', '--output-dir', default='resumos', help="Diretório dos resumos e do índice (padrão: resumos)")
+    batch.add_argument('--exchange-rate', type=float, default=DEFAULT_EXCHANGE_RATE, help="Taxa de câmbio USD para BRL")
+    batch.add_argument('--tax-rate', type=float, default=DEFAULT_TAX_RATE, help="Taxa de imposto (%%)")
+    _add_payment_arguments(batch)
+    _add_csv_engine_argument(batch)
+    batch.add_argument('-j', '--workers', type=int, default=None, help="Número de processos (padrão: todos os núcleos)")
+    batch.add_argument('--timings', action='store_true', help="Grava no índice o tempo e as linhas de cada etapa")
+    batch.add_argument('--track-memory', action='store_true', help="Grava também a memória de cada etapa (tracemalloc, mais lento)")
+    batch.add_argument('--profile', action='store_true', help="Grava um perfil cProfile (.prof) ao lado de cada resumo")
+    
+    bundle = subparsers.add_parser('bundle', help="ZIP com o resumo de cada CSV e um CSV de totais, gravado à medida que cada arquivo termina")
+    bundle.add_argument('inputs', nargs='+', help="Arquivos CSV, diretórios ou padrões glob")
+    bundle.add_argument('-o', '--output', required=True, help="Arquivo .zip ('-' para a saída padrão)")
+    bundle.add_argument('--exchange-rate', type=float, default=DEFAULT_EXCHANGE_RATE, help="Taxa de câmbio USD para BRL")
+    bundle.add_argument('--tax-rate', type=float, default=DEFAULT_TAX_RATE, help="Taxa de imposto (%%)")
+    _add_payment_arguments(bundle)
+    _add_csv_engine_argument(bundle)
+    bundle.add_argument('-j', '--workers', type=int, default=None, help="Número de processos (padrão: todos os núcleos)")
+    
+    export = subparsers.add_parser('export', help="Grava os itens processados de vários CSVs em Parquet ou Arrow IPC")
+    export.add_argument('inputs', nargs='+', help="Arquivos CSV, diretórios ou padrões glob")
+    export.add_argument('-o', '--output', required=True, help="Arquivo de saída (.parquet, .arrow ou .feather)")
+    _add_payment_arguments(export)
+    _add_csv_engine_argument(export)
+    export.add_argument('-j', '--workers', type=int, default=None, help="Número de processos (padrão: todos os núcleos)")
+    
+    report = subparsers.add_parser('report', help="Resumo (ou relatório consolidado) a partir de itens gravados por export, sem os CSVs")
+    report.add_argument('input', help="Arquivo .parquet, .arrow ou .feather")
+    report.add_argument('--exchange-rate', type=float, default=DEFAULT_EXCHANGE_RATE, help="Taxa de câmbio USD para BRL")
+    report.add_argument('--tax-rate', type=float, default=DEFAULT_TAX_RATE, help="Taxa de imposto (%%)")
+    report.add_argument('-o', '--output', help="Arquivo de texto (padrão: saída padrão)")
+    
+    scenarios = subparsers.add_parser('scenarios', help="Grade what-if de um CSV: formas de pagamento × câmbios × impostos")
+    scenarios.add_argument('input', help="Arquivo CSV da Calculadora AWS")
+    scenarios.add_argument('--exchange-rates', type=float, nargs='+', default=[DEFAULT_EXCHANGE_RATE], help="Taxas de câmbio USD para BRL")
+    scenarios.add_argument('--tax-rates', type=float, nargs='+', default=[DEFAULT_TAX_RATE], help="Taxas de imposto (%%)")
+    scenarios.add_argument('-o', '--output', help="CSV de saída (padrão: saída padrão)")
+    _add_csv_engine_argument(scenarios)
+    
+    diff = subparsers.add_parser('diff', help="Compara duas versões de uma exportação: itens adicionados, removidos e alterados")
+    diff.add_argument('old', help="CSV da versão anterior")
+    diff.add_argument('new', help="CSV da versão nova")
+    diff.add_argument('--exchange-rate', type=float, default=DEFAULT_EXCHANGE_RATE, help="Taxa de câmbio USD para BRL")
+    diff.add_argument('--tax-rate', type=float, default=DEFAULT_TAX_RATE, help="Taxa de imposto (%%)")
+    _add_payment_arguments(diff)
+    diff.add_argument('--json', action='store_true', help="Grava a comparação em JSON em vez do relatório em texto")
+    diff.add_argument('-o', '--output', help="Arquivo de saída (padrão: saída padrão)")
+    
+    watch = subparsers.add_parser('watch', help="Monitora uma pasta e gera o resumo e os totais de cada CSV novo ou alterado ao lado do arquivo")
+    watch.add_argument('directory', help="Pasta monitorada")
+    watch.add_argument('--interval', type=float, default=WATCH_DEFAULT_INTERVAL, help=f"Segundos entre varreduras (padrão: {WATCH_DEFAULT_INTERVAL:g})")
+    watch.add_argument('--settle', type=float, default=WATCH_SETTLE_SECONDS, help=f"Segundos sem modificação para considerar o arquivo completo (padrão: {WATCH_SETTLE_SECONDS:g})")
+    watch.add_argument('--manifest', help="Manifesto dos arquivos processados (padrão: .calculadora-manifest.json na pasta)")
+    watch.add_argument('--once', action='store_true', help="Processa o que há na pasta e termina")
+    watch.add_argument('--exchange-rate', type=float, default=DEFAULT_EXCHANGE_RATE, help="Taxa de câmbio USD para BRL")
+    watch.add_argument('--tax-rate', type=float, default=DEFAULT_TAX_RATE, help="Taxa de imposto (%%)")
+    _add_payment_arguments(watch)
+    _add_csv_engine_argument(watch)
+    watch.add_argument('-j', '--workers', type=int, default=None, help="Número de processos (padrão: todos os núcleos)")
+    
+    server = subparsers.add_parser('serve', help="Serviço HTTP local: POST /summary e /scenarios com os bytes do CSV")
+    server.add_argument('--host', default=SERVER_DEFAULT_HOST, help=f"Endereço (padrão: {SERVER_DEFAULT_HOST})")
+    server.add_argument('--port', type=int, default=SERVER_DEFAULT_PORT, help=f"Porta (padrão: {SERVER_DEFAULT_PORT})")
+    server.add_argument('-j', '--workers', type=int, default=None, help="Número de processos (padrão: todos os núcleos)")
+    server.add_argument('--max-upload-mb', type=int, default=SERVER_MAX_UPLOAD_MB, help=f"Tamanho máximo do CSV (padrão: {SERVER_MAX_UPLOAD_MB} MB)")
+    
+    args = parser.parse_args(argv)
+    
+    # Cada comando importa apenas o que usa: `serve` e `batch` não carregam o pandas neste processo
+    if args.command == 'serve':
+        from .server import serve
+        return serve(args.host, args.port, args.workers, args.max_upload_mb)
+    
+    if args.command == 'scenarios':
+        from .loader import load_csv_file, normalize_columns
+        from .pricing import parse_line_items
+        from .scenarios import scenario_matrix
+        parsed = parse_line_items(normalize_columns(load_csv_file(args.input, args.csv_engine)))
+        grid = scenario_matrix(parsed, args.exchange_rates, args.tax_rates)
+        grid.to_csv(args.output or sys.stdout, index=False)
+        return 0
+    
+    if args.command == 'report':
+        return _report(parser, args)
+    
+    if args.command == 'diff':
+        return _diff(parser, args)
+    
+    if args.command == 'watch':
+        return _watch(parser, args)
+    
+    from .batch import find_exports, run_batch
+    paths = find_exports(args.inputs)
+    if not paths:
+        parser.error("nenhum arquivo CSV encontrado")
+    
+    if args.command == 'export':
+        return _export(parser, args, paths)
+    
+    if args.command == 'bundle':
+        return _bundle(args, paths)
+    
+    try:
+        results = run_batch(
+            paths, args.output_dir, args.workers,
+            exchange_rate=args.exchange_rate,
+            tax_rate=args.tax_rate,
+            lambda_payment_option=args.lambda_payment,
+            fargate_payment_option=args.fargate_payment,
+            global_payment_type=args.payment_type,
+            timings=args.timings,
+            track_memory=args.track_memory,
+            profile=args.profile,
+            csv_engine=args.csv_engine
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    
+    index_path = os.path.join(args.output_dir, 'index.json')
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    
+    failed = sum(1 for result in results if 'erro' in result)
+    print(f"{len(results) - failed} resumo(s) gerado(s), {failed} erro(s). Índice: {index_path}", file=sys.stderr)
+    return 1 if failed else 0
+
+def _export(parser: argparse.ArgumentParser, args: argparse.Namespace, paths: List[str]) -> int:
+    """Comando `export`: lê e precifica os CSVs e grava todos os itens em um único arquivo"""
+    from .batch import price_exports
+    from .datasets import arrow_available, dataset_format, write_line_items
+    
+    if not arrow_available():
+        parser.error("o comando export precisa do pyarrow (pip install pyarrow)")
+    try:
+        dataset_format(args.output)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    options = {
+        'lambda_payment_option': args.lambda_payment,
+        'fargate_payment_option': args.fargate_payment,
+        'global_payment_type': args.payment_type
+    }
+    results = price_exports(paths, args.workers, csv_engine=args.csv_engine, **options)
+    processed = [result for result in results if 'erro' not in result]
+    write_line_items(args.output, processed, options)
+    
+    failed = len(results) - len(processed)
+    items = sum(len(instances) for data in processed for services in data['services_by_region'].values() for instances in services.values())
+    print(f"{items} item(ns) de {len(processed)} arquivo(s) gravados em {args.output}, {failed} erro(s)", file=sys.stderr)
+    return 1 if failed else 0
+
+def _bundle(args: argparse.Namespace, paths: List[str]) -> int:
+    """Comando `bundle`: ZIP com os resumos de todos os CSVs e o CSV de totais"""
+    from .batch import write_summary_zip
+    
+    options = {
+        'exchange_rate': args.exchange_rate,
+        'tax_rate': args.tax_rate,
+        'lambda_payment_option': args.lambda_payment,
+        'fargate_payment_option': args.fargate_payment,
+        'global_payment_type': args.payment_type,
+        'csv_engine': args.csv_engine
+    }
+    if args.output == '-':
+        rows = write_summary_zip(sys.stdout.buffer, paths, args.workers, **options)
+    else:
+        with open(args.output, 'wb') as f:
+            rows = write_summary_zip(f, paths, args.workers, **options)
+    
+    failed = sum(1 for row in rows if row['erro'])
+    print(f"{len(rows) - failed} resumo(s) em {args.output}, {failed} erro(s)", file=sys.stderr)
+    return 1 if failed else 0
+
+def _watch(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    """Comando `watch`: processa os CSVs novos ou alterados da pasta até ser interrompido (ou uma vez, com --once)"""
+    import signal
+    from .watch import FolderWatcher
+    
+    if not os.path.isdir(args.directory):
+        parser.error(f"pasta não encontrada: {args.directory}")
+    
+    watcher = FolderWatcher(
+        args.directory, args.workers, args.interval, args.settle, args.manifest,
+        exchange_rate=args.exchange_rate,
+        tax_rate=args.tax_rate,
+        lambda_payment_option=args.lambda_payment,
+        fargate_payment_option=args.fargate_payment,
+        global_payment_type=args.payment_type,
+        csv_engine=args.csv_engine
+    )
+    # Parada do serviço (SIGTERM) como Ctrl+C: o manifesto é gravado antes de sair
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    failed = watcher.run(once=args.once)
+    return 1 if failed and args.once else 0
+
+def _report(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    """Comando `report`: resumo de uma conta, ou relatório consolidado de várias, a partir do conjunto de itens"""
+    from .datasets import arrow_available, read_line_items
+    from .portfolio import generate_portfolio_summary
+    from .summary import generate_summary
+    
+    if not arrow_available():
+        parser.error("o comando report precisa do pyarrow (pip install pyarrow)")
+    try:
+        accounts, options = read_line_items(args.input)
+    except ValueError as e:
+        parser.error(str(e))
+    if not accounts:
+        parser.error(f"nenhum item em {args.input}")
+    
+    lambda_payment_option = options.get('lambda_payment_option', PAYMENT_OPTIONS[0])
+    fargate_payment_option = options.get('fargate_payment_option', PAYMENT_OPTIONS[0])
+    if len(accounts) == 1:
+        summary = generate_summary(accounts[0], args.exchange_rate, args.tax_rate, lambda_payment_option, fargate_payment_option)
+    else:
+        summary = generate_portfolio_summary(accounts, args.exchange_rate, args.tax_rate, lambda_payment_option, fargate_payment_option)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(summary)
+    else:
+        sys.stdout.write(summary)
+    return 0
+
+def _diff(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    """Comando `diff`: compara duas versões de uma exportação, com as mesmas formas de pagamento"""
+    from .quote_diff import diff_exports, generate_diff_report
+    
+    try:
+        diff = diff_exports(
+            args.old, args.new, args.exchange_rate, args.tax_rate,
+            args.lambda_payment, args.fargate_payment, args.payment_type
+        )
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    
+    output = json.dumps(diff, ensure_ascii=False, indent=2) + "\n" if args.json else generate_diff_report(diff)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        sys.stdout.write(output)
+    return 0
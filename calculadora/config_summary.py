@@ -0,0 +1,200 @@
+"""Leitura do "Resumo da configuração" de cada linha da exportação (apenas expressões regulares)"""
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, TypedDict
+
+# Padrões do "Resumo da configuração" (português e inglês), compilados uma única vez.
+# Todas as alternativas começam por um literal, para o regex saltar direto aos candidatos.
+# Os rótulos consomem apenas o texto até o "(" e capturam o valor por lookahead, para que
+# os marcadores soltos (ex.: "No Upfront" dentro de "Pricing strategy (...)") continuem visíveis.
+_CONFIG_TOKEN_RE = re.compile(
+    r'Instância do EC2 avançada \((?=(?P<ec2_instance_pt>[^)]+)\))'
+    r'|Advance EC2 instance \((?=(?P<ec2_instance_en>[^)]+)\))'
+    r'|Número de instâncias: (?P<instance_count_pt>\d+)'
+    r'|Number of instances: (?P<instance_count_en>\d+)'
+    r'|Pricing strategy \((?=(?P<pricing_strategy>[^)]+)\))'
+    r'|Sistema operacional \((?=(?P<operating_system_pt>[^)]+)\))'
+    r'|Operating system \((?=(?P<operating_system_en>[^)]+)\))'
+    r'|Tipo de instância \((?=(?P<instance_types_pt>[^)]+)\))'
+    r'|Instance type \((?=(?P<instance_types_en>[^)]+)\))'
+    r'|Nós \((?P<nodes_pt>\d+)\)'
+    r'|Nodes \((?P<nodes_en>\d+)\)'
+    r'|Número de tarefas ou pods \((?=(?P<tasks_pt>\d+) por dia\))'
+    r'|Number of tasks or pods \((?=(?P<tasks_en>\d+) per day\))'
+    r'|Quantidade de vCPU \((?=(?P<vcpu_pt>[\d.]+)\))'
+    r'|Amount of vCPU \((?=(?P<vcpu_en>[\d.]+)\))'
+    r'|Quantidade de memória alocada \((?=(?P<memory_pt>\d+) GB\))'
+    r'|Amount of memory allocated \((?=(?P<memory_en>\d+) GB\))'
+    r'| por dia'
+    r'|Multi|multi|OnDemand|Heavy Utilization|No Upfront|All Upfront|ARM|Valkey|Memcached'
+    r'|3[ -](?i:year)'
+)
+
+# Campos com todas as ocorrências (na ordem do texto), campos inteiros e marcadores sem valor
+_CONFIG_LIST_FIELDS = {'instance_types': str, 'nodes': int}
+_CONFIG_INT_FIELDS = {'instance_count', 'tasks'}
+_CONFIG_FLAGS = {
+    'multi': 'multi_az', 'ondemand': 'on_demand', 'heavy utilization': 'heavy_utilization',
+    'no upfront': 'no_upfront', 'all upfront': 'all_upfront', 'arm': 'arm', 'valkey': 'valkey',
+    'memcached': 'memcached', '3 year': 'three_year', '3-year': 'three_year',
+}
+# Nome do grupo no regex -> campo do registro (as variantes _pt/_en alimentam o mesmo campo)
+_CONFIG_GROUP_FIELDS = {
+    group: group[:-3] if group.endswith(('_pt', '_en')) else group
+    for group in _CONFIG_TOKEN_RE.groupindex
+}
+_EMPTY_CONFIG_RECORD = {
+    'ec2_instance': None, 'instance_count': None, 'pricing_strategy': None,
+    'operating_system': None, 'instance_types': None, 'nodes': None, 'tasks': None,
+    'tasks_fallback': None, 'vcpu': None, 'memory': None,
+    **{flag: False for flag in _CONFIG_FLAGS.values()},
+}
+
+# Textos de configuração distintos guardados por cached_instance_details (por processo)
+CONFIG_DETAILS_CACHE_SIZE = 8192
+
+class ConfigRecord(TypedDict):
+    """Atributos do "Resumo da configuração" extraídos em uma única leitura do texto"""
+    ec2_instance: Optional[str]
+    instance_count: Optional[int]
+    pricing_strategy: Optional[str]
+    operating_system: Optional[str]
+    instance_types: List[str]
+    nodes: List[int]
+    tasks: Optional[int]
+    tasks_fallback: Optional[int]
+    vcpu: Optional[str]
+    memory: Optional[str]
+    multi_az: bool
+    on_demand: bool
+    heavy_utilization: bool
+    no_upfront: bool
+    all_upfront: bool
+    three_year: bool
+    valkey: bool
+    memcached: bool
+    arm: bool
+
+def tokenize_config(config_text: str) -> ConfigRecord:
+    """Lê o texto de configuração uma única vez e devolve um registro com os atributos encontrados"""
+    record = _EMPTY_CONFIG_RECORD.copy()
+    record['instance_types'] = []
+    record['nodes'] = []
+    
+    for match in _CONFIG_TOKEN_RE.finditer(config_text):
+        group = match.lastgroup
+        if group is None:
+            text = match.group()
+            if text == ' por dia':
+                # Fallback "N por dia": recuar até o início dos dígitos que antecedem o marcador
+                if record['tasks_fallback'] is None:
+                    digits_start = digits_end = match.start()
+                    while digits_start > 0 and config_text[digits_start - 1].isdecimal():
+                        digits_start -= 1
+                    if digits_start < digits_end:
+                        record['tasks_fallback'] = int(config_text[digits_start:digits_end])
+            else:
+                record[_CONFIG_FLAGS[text.lower()]] = True
+            continue
+        
+        field = _CONFIG_GROUP_FIELDS[group]
+        value = match.group(group)
+        if field in _CONFIG_LIST_FIELDS:
+            record[field].append(_CONFIG_LIST_FIELDS[field](value))
+        elif record[field] is None:
+            # Assim como re.search, vale a primeira ocorrência
+            record[field] = int(value) if field in _CONFIG_INT_FIELDS else value
+    
+    return record
+
+def _purchase_option(record: ConfigRecord, heavy_utilization: bool = False) -> str:
+    """Opção de compra declarada na configuração (RDS/ElastiCache)"""
+    if record['on_demand']:
+        return 'On Demand'
+    if heavy_utilization and record['heavy_utilization']:
+        return 'Heavy Utilization'
+    if record['no_upfront']:
+        return 'No Upfront'
+    if record['all_upfront']:
+        return 'All Upfront'
+    return 'Reserved Instance'
+
+def extract_instance_details(config_text: str, service: str) -> Dict:
+    """Extrai detalhes das instâncias do texto de configuração"""
+    details = {'quantidade': 1, 'tipo': 'N/A', 'specs': []}
+    
+    if "EC2" in service:
+        record = tokenize_config(config_text)
+        if record['ec2_instance'] is not None:
+            details['tipo'] = record['ec2_instance']
+        if record['instance_count'] is not None:
+            details['quantidade'] = record['instance_count']
+        
+        pricing_strategy = record['pricing_strategy'] or 'N/A'
+        os_system = record['operating_system'] or 'N/A'
+        details['specs'] = [pricing_strategy, os_system]
+    
+    elif "RDS" in service or "Aurora" in service:
+        record = tokenize_config(config_text)
+        if record['instance_types']:
+            details['tipo'] = record['instance_types'][0]
+        if record['nodes']:
+            details['quantidade'] = record['nodes'][0]
+        
+        az_config = 'Multi AZ' if record['multi_az'] else 'Single AZ'
+        period = '3 anos' if record['three_year'] else '1 ano'
+        
+        # Engine type - usar o nome completo do serviço
+        details['specs'] = [az_config, _purchase_option(record), period, service]
+    
+    elif "ElastiCache" in service:
+        record = tokenize_config(config_text)
+        
+        # Combinar tipos de instância com número de nós
+        for instance_type, nodes in zip(record['instance_types'], record['nodes']):
+            # Pegar a instância com nós > 0 e que não seja r6gd.12xlarge
+            if nodes > 0 and 'r6gd.12xlarge' not in instance_type:
+                details['tipo'] = instance_type
+                details['quantidade'] = nodes
+                break
+        
+        # Mecanismo de cache - Valkey, Memcached ou Redis (padrão)
+        cache_engine = 'Redis'
+        if record['valkey']:
+            cache_engine = 'Valkey'
+        elif record['memcached']:
+            cache_engine = 'Memcached'
+        
+        period = '3 anos' if record['three_year'] else '1 ano'
+        details['specs'] = [_purchase_option(record, heavy_utilization=True), period, cache_engine]
+    
+    elif "AWS Fargate" in service or "Fargate" in service:
+        record = tokenize_config(config_text)
+        
+        # Número de tarefas/pods, com fallback para qualquer "N por dia"
+        if record['tasks'] is not None:
+            details['quantidade'] = record['tasks']
+        elif record['tasks_fallback'] is not None:
+            details['quantidade'] = record['tasks_fallback']
+        
+        architecture = 'ARM64' if record['arm'] else 'X86_64'
+        details['specs'] = [architecture]
+    
+    return details
+
+@lru_cache(maxsize=CONFIG_DETAILS_CACHE_SIZE)
+def cached_instance_details(config_text: str, service: str) -> Dict:
+    """extract_instance_details memorizado por (texto, serviço): configurações repetidas são lidas uma única vez.
+    
+    O dicionário devolvido é compartilhado entre as linhas com a mesma configuração e não deve ser alterado.
+    """
+    return extract_instance_details(config_text, service)
+
+def config_cache_info() -> Dict[str, int]:
+    """Acertos, leituras, tamanho e limite da memória de configurações deste processo"""
+    info = cached_instance_details.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'tamanho': info.currsize, 'maximo': info.maxsize}
+
+def clear_config_cache() -> None:
+    """Esvazia a memória de configurações e zera os contadores"""
+    cached_instance_details.cache_clear()
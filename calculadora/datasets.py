@@ -0,0 +1,188 @@
+"""Exportação e importação dos itens processados em Parquet ou Arrow IPC (pyarrow, dependência opcional)"""
+import importlib.util
+import json
+import math
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from .performance import measure_stage
+from .records import LineItem
+
+# Formatos aceitos, pela extensão do arquivo
+DATASET_FORMATS = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow'}
+# Colunas do conjunto de dados, uma linha por item processado
+DATASET_COLUMNS = [
+    'client_name', 'account_id', 'region', 'service_key', 'service_name', 'tipo', 'quantidade', 'specs',
+    'payment_mode', 'cost', 'upfront', 'config'
+]
+# Colunas de texto com poucos valores distintos: gravadas com dicionário (cada valor uma vez)
+_DICTIONARY_COLUMNS = ['client_name', 'account_id', 'region', 'service_key', 'service_name', 'tipo', 'payment_mode']
+# Chave dos metadados do esquema com as contas (On Demand, regiões) e as formas de pagamento usadas
+_METADATA_KEY = b'calculadora'
+
+def arrow_available() -> bool:
+    """O pyarrow está instalado?"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+def dataset_format(path: str, file_format: Optional[str] = None) -> str:
+    """Formato explícito ou deduzido da extensão ('parquet' ou 'arrow')"""
+    if file_format:
+        if file_format not in ('parquet', 'arrow'):
+            raise ValueError(f"Formato desconhecido: {file_format} (use parquet ou arrow)")
+        return file_format
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension not in DATASET_FORMATS:
+        raise ValueError(f"Extensão não reconhecida: {path} (use {', '.join(DATASET_FORMATS)})")
+    return DATASET_FORMATS[extension]
+
+def line_items_table(processed: List[Dict], options: Optional[Dict[str, str]] = None):
+    """Itens de um ou mais resultados processados (process_csv/price_line_items) como tabela Arrow"""
+    import pyarrow as pa
+    from .portfolio import consolidate_accounts
+    
+    # Uma entrada de metadados por conta: arquivos da mesma conta são somados, como no portfólio
+    accounts = consolidate_accounts(processed) if processed else []
+    columns = {name: [] for name in DATASET_COLUMNS}
+    for data in accounts:
+        for region, services in data['services_by_region'].items():
+            for service_key, instances in services.items():
+                count = len(instances)
+                columns['client_name'].extend([data['client_name']] * count)
+                columns['account_id'].extend([data['account_id']] * count)
+                columns['region'].extend([region] * count)
+                columns['service_key'].extend([service_key] * count)
+                for instance in instances:
+                    columns['service_name'].append(instance.service_name)
+                    columns['tipo'].append(instance.tipo)
+                    columns['quantidade'].append(instance.quantidade)
+                    columns['specs'].append(list(instance.specs))
+                    columns['payment_mode'].append(instance.payment_mode)
+                    columns['cost'].append(instance.cost)
+                    columns['upfront'].append(instance.upfront)
+                    # Resumo da configuração vazio chega como NaN
+                    columns['config'].append(instance.config if isinstance(instance.config, str) else None)
+    
+    types = {
+        'quantidade': pa.int64(),
+        'specs': pa.list_(pa.string()),
+        'cost': pa.float64(),
+        'upfront': pa.float64()
+    }
+    arrays = []
+    for name in DATASET_COLUMNS:
+        array = pa.array(columns[name], type=types.get(name, pa.string()))
+        if name in _DICTIONARY_COLUMNS:
+            array = array.dictionary_encode()
+        arrays.append(array)
+    
+    metadata = {
+        'contas': [
+            {
+                'client_name': data['client_name'],
+                'account_id': data['account_id'],
+                'on_demand_total': data.get('on_demand_total', 0),
+                'regions': sorted(data['regions'])
+            }
+            for data in accounts
+        ],
+        'opcoes': options or {}
+    }
+    return pa.Table.from_arrays(arrays, names=DATASET_COLUMNS).replace_schema_metadata({_METADATA_KEY: json.dumps(metadata, ensure_ascii=False).encode('utf-8')})
+
+def write_line_items(destination, processed: List[Dict], options: Optional[Dict[str, str]] = None, file_format: Optional[str] = None) -> None:
+    """Grava os itens em Parquet ou Arrow IPC; `destination` é um caminho ou um objeto de arquivo binário"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    file_format = dataset_format(destination if isinstance(destination, (str, os.PathLike)) else '', file_format)
+    with measure_stage('datasets.write') as record:
+        table = line_items_table(processed, options)
+        record['rows'] = table.num_rows
+        if file_format == 'parquet':
+            pq.write_table(table, destination)
+        else:
+            with pa.ipc.new_file(destination, table.schema) as writer:
+                writer.write_table(table)
+
+def read_line_items_table(source, file_format: Optional[str] = None):
+    """Lê a tabela Arrow de um caminho ou objeto de arquivo; arquivos Arrow IPC em disco são mapeados em memória (sem cópia)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    is_path = isinstance(source, (str, os.PathLike))
+    file_format = dataset_format(source if is_path else '', file_format)
+    with measure_stage('datasets.read') as record:
+        if file_format == 'parquet':
+            table = pq.read_table(source, memory_map=is_path, read_dictionary=_DICTIONARY_COLUMNS)
+        else:
+            table = pa.ipc.open_file(pa.memory_map(str(source)) if is_path else source).read_all()
+        record['rows'] = table.num_rows
+    return table
+
+def _column_values(table, name: str) -> list:
+    """Valores de uma coluna como objetos Python; colunas com dicionário criam cada valor distinto uma única vez"""
+    import pyarrow as pa
+    
+    values = []
+    for chunk in table.column(name).chunks:
+        if pa.types.is_dictionary(chunk.type):
+            dictionary = [sys.intern(value) for value in chunk.dictionary.to_pylist()]
+            values.extend([dictionary[index] for index in chunk.indices.to_numpy(zero_copy_only=False).tolist()])
+        else:
+            values.extend(chunk.to_pylist())
+    return values
+
+def processed_from_table(table) -> Tuple[List[Dict], Dict[str, str]]:
+    """Reconstrói os resultados processados (um por conta) e as formas de pagamento usadas, prontos para o resumo"""
+    missing = [name for name in DATASET_COLUMNS if name not in table.column_names]
+    if missing:
+        raise ValueError(f"Colunas faltando no conjunto de itens: {', '.join(missing)}")
+    
+    raw_metadata = (table.schema.metadata or {}).get(_METADATA_KEY)
+    metadata = json.loads(raw_metadata) if raw_metadata else {'contas': [], 'opcoes': {}}
+    
+    with measure_stage('datasets.rebuild', rows=table.num_rows):
+        accounts = {}
+        for account in metadata['contas']:
+            accounts[account['client_name'], account['account_id']] = {
+                'client_name': account['client_name'],
+                'account_id': account['account_id'],
+                'services_by_region': {},
+                'regions': set(account['regions']),
+                'on_demand_total': account['on_demand_total']
+            }
+        
+        # Colunas numéricas saem do Arrow sem cópia; os itens são montados uma única vez
+        cost = table.column('cost').to_numpy().tolist()
+        upfront = table.column('upfront').to_numpy().tolist()
+        quantidade = table.column('quantidade').to_numpy().tolist()
+        rows = zip(
+            _column_values(table, 'client_name'), _column_values(table, 'account_id'), _column_values(table, 'region'),
+            _column_values(table, 'service_key'), _column_values(table, 'service_name'), _column_values(table, 'tipo'),
+            quantidade, table.column('specs').to_pylist(), _column_values(table, 'payment_mode'), cost, upfront,
+            table.column('config').to_pylist()
+        )
+        intern = sys.intern
+        for client_name, account_id, region, service_key, service_name, tipo, count, specs, mode, item_cost, item_upfront, config in rows:
+            data = accounts.get((client_name, account_id))
+            if data is None:
+                # Conjunto gravado por outra ferramenta, sem os metadados da conta
+                data = accounts[client_name, account_id] = {
+                    'client_name': client_name,
+                    'account_id': account_id,
+                    'services_by_region': {},
+                    'regions': set(),
+                    'on_demand_total': 0
+                }
+            data['regions'].add(region)
+            data['services_by_region'].setdefault(region, {}).setdefault(service_key, []).append(LineItem(
+                tipo, count, tuple([intern(spec) for spec in specs or ()]), mode, item_cost, item_upfront, service_name,
+                config if config is not None else math.nan
+            ))
+    
+    return list(accounts.values()), metadata.get('opcoes', {})
+
+def read_line_items(source, file_format: Optional[str] = None) -> Tuple[List[Dict], Dict[str, str]]:
+    """Lê um conjunto de itens gravado por write_line_items: resultados por conta e as formas de pagamento usadas"""
+    return processed_from_table(read_line_items_table(source, file_format))
@@ -0,0 +1,75 @@
+"""Tabela de descontos por serviço, região (ou grupo de regiões), forma de pagamento e arquitetura"""
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .regions import DEFAULT_REGION_GROUP, REGIONS_BY_CODE, SAO_PAULO_GROUP
+
+# Tabela de descontos: uma linha por (serviço, grupo de região, pagamento, arquitetura), com
+# multiplicador sobre o custo base e crédito fixo. '*' vale para qualquer grupo/arquitetura,
+# "grupo_regiao" aceita também o código de uma região (ex.: us-west-1), que tem precedência sobre
+# o grupo, e "condicao_credito" restringe o crédito aos itens com a característica indicada.
+DISCOUNT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'descontos.csv')
+DISCOUNT_WILDCARD = '*'
+# Condições de crédito aceitas na tabela -> coluna booleana dos itens normalizados
+DISCOUNT_CREDIT_CONDITIONS = {'armazenamento_20gb': 'has_storage_discount'}
+
+@lru_cache(maxsize=None)
+def load_discount_rules(path: str = DISCOUNT_RULES_PATH) -> Dict[Tuple[str, str, str, str], Tuple[float, float, str]]:
+    """Carrega a tabela de descontos uma única vez e a compila em um índice por chave"""
+    rules = pd.read_csv(path, dtype=str, keep_default_na=False)
+    
+    unknown = set(rules['condicao_credito']) - set(DISCOUNT_CREDIT_CONDITIONS) - {''}
+    if unknown:
+        raise ValueError(f"Condição de crédito desconhecida em {path}: {', '.join(sorted(unknown))}")
+    unknown = set(rules['grupo_regiao']) - {SAO_PAULO_GROUP, DEFAULT_REGION_GROUP, DISCOUNT_WILDCARD} - set(REGIONS_BY_CODE)
+    if unknown:
+        raise ValueError(f"Grupo de região desconhecido em {path}: {', '.join(sorted(unknown))}")
+    
+    compiled = {}
+    for row in rules.itertuples(index=False):
+        key = (row.servico, row.grupo_regiao, row.pagamento, row.arquitetura)
+        if key in compiled:
+            raise ValueError(f"Regra de desconto duplicada em {path}: {', '.join(key)}")
+        compiled[key] = (float(row.multiplicador), float(row.credito), row.condicao_credito)
+    return compiled
+
+def _resolve_discount(rules: Dict, rule: str, region_code: str, region_group: str, payment_mode: str, architecture: str) -> Tuple[float, float, str]:
+    """Regra aplicável a uma combinação; a região tem precedência sobre o grupo, e ambos sobre '*'"""
+    for region_key in (region_code, region_group, DISCOUNT_WILDCARD):
+        for architecture_key in (architecture, DISCOUNT_WILDCARD):
+            found = rules.get((rule, region_key, payment_mode, architecture_key))
+            if found is not None:
+                return found
+    # Sem regra: custo base sem desconto
+    return 1.0, 0.0, ''
+
+def lookup_discounts(rule: str, region_group: np.ndarray, payment_mode: np.ndarray, architecture: np.ndarray, rules: Optional[Dict] = None, region_code: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Multiplicador, crédito e condição do crédito de cada item, por junção com a tabela de descontos
+    (`region_code`: código de cada item no catálogo, '' se desconhecido)"""
+    if rules is None:
+        rules = load_discount_rules()
+    if region_code is None:
+        region_code = np.full(len(region_group), '', dtype=object)
+    
+    # Reduzir as colunas às combinações distintas, resolver cada uma no índice e espalhar de volta
+    factorized = [pd.factorize(column) for column in (region_code, region_group, payment_mode, architecture)]
+    combination = np.zeros(len(region_group), dtype=np.int64)
+    for codes, values in factorized:
+        combination = combination * len(values) + codes
+    combinations, inverse = np.unique(combination, return_inverse=True)
+    
+    resolved = []
+    for remainder in combinations.tolist():
+        keys = []
+        for _, values in reversed(factorized):
+            remainder, index = divmod(remainder, len(values))
+            keys.append(values[index])
+        resolved.append(_resolve_discount(rules, rule, *reversed(keys)))
+    multiplier = np.array([found[0] for found in resolved], dtype=float)[inverse]
+    credit = np.array([found[1] for found in resolved], dtype=float)[inverse]
+    condition = np.array([found[2] for found in resolved], dtype=object)[inverse]
+    return multiplier, credit, condition
@@ -0,0 +1,167 @@
+"""Leitura da seção de detalhes dos CSVs da Calculadora AWS e normalização das colunas"""
+import csv
+import importlib.util
+import io
+import mmap
+import os
+import re
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from .options import CSV_ENGINE_ENV, CSV_ENGINES
+from .performance import measure_stage, timed_stage
+
+# Colunas obrigatórias do CSV (português e inglês) e o mapeamento inglês -> português
+REQUIRED_COLUMNS_PT = ['Hierarquia de grupos', 'Região', 'Serviço', 'Pagamento adiantado', 'Mensal', 'Resumo da configuração']
+REQUIRED_COLUMNS_EN = ['Group hierarchy', 'Region', 'Service', 'Upfront', 'Monthly', 'Configuration summary']
+COLUMN_MAPPING = dict(zip(REQUIRED_COLUMNS_EN, REQUIRED_COLUMNS_PT))
+
+# Esquema das colunas obrigatórias: textos de poucos valores distintos como categorias
+# (cada valor uma vez em memória) e valores em dinheiro já como float64
+COLUMN_DTYPES = {
+    'Hierarquia de grupos': 'category',
+    'Região': 'category',
+    'Serviço': 'category',
+    'Pagamento adiantado': 'float64',
+    'Mensal': 'float64',
+    'Resumo da configuração': 'str'
+}
+
+# Marcadores da seção de detalhes, procurados diretamente nos bytes (UTF-8) do arquivo.
+# O início consome a linha do marcador inteira; o fim é a primeira linha em branco
+# ou a linha da seção "Confirmação"/"Acknowledgement". Os marcadores de fim são literais
+# (busca rápida pelo texto) e a linha que os contém é encontrada depois, recuando até o "\n".
+_SECTION_START_RE = re.compile(rb'(?:Estimativa detalhada|Detailed Estimate)[^\n]*(?:\n|\Z)')
+_BLANK_LINE_RE = re.compile(rb'\n[ \t\r\f\v]*(?=\n|\Z)')
+_SECTION_END_MARKERS = (re.compile(re.escape('Confirmação'.encode('utf-8'))), re.compile(rb'Acknowledgement'))
+_NEWLINE_RE = re.compile(rb'\n')
+# Bytes lidos por vez ao recuar até o início de uma linha
+_LINE_START_CHUNK = 4096
+
+def _line_start(buffer, position: int, floor: int) -> int:
+    """Início da linha que contém `position`, sem recuar antes de `floor` (que é um início de linha)"""
+    while position > floor:
+        chunk_start = max(floor, position - _LINE_START_CHUNK)
+        newline = bytes(buffer[chunk_start:position]).rfind(b'\n')
+        if newline >= 0:
+            return chunk_start + newline + 1
+        position = chunk_start
+    return floor
+
+def _locate_detailed_section(buffer) -> Tuple[int, int]:
+    """Localiza o intervalo de bytes [início, fim) das linhas da seção 'Estimativa detalhada'"""
+    start_match = _SECTION_START_RE.search(buffer)
+    if not start_match:
+        raise ValueError("Seção 'Estimativa detalhada' ou 'Detailed Estimate' não encontrada")
+    start = start_match.end()
+    
+    # O cabeçalho nunca encerra a seção; procurar o fim a partir da linha seguinte
+    header_end = _NEWLINE_RE.search(buffer, start)
+    if not header_end:
+        return start, len(buffer)
+    blank_line = _BLANK_LINE_RE.search(buffer, header_end.start())
+    end = blank_line.start() + 1 if blank_line else len(buffer)
+    # Um marcador antes da linha em branco encerra a seção no início da sua linha
+    for marker in _SECTION_END_MARKERS:
+        found = marker.search(buffer, header_end.end(), end)
+        if found:
+            end = _line_start(buffer, found.start(), header_end.end())
+    return start, end
+
+def resolve_csv_engine(engine: Optional[str] = None) -> str:
+    """Leitor efetivo: o informado, o de $CALCULADORA_CSV_ENGINE ou, em 'auto', o pyarrow se estiver instalado"""
+    engine = engine or os.environ.get(CSV_ENGINE_ENV) or 'auto'
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"Leitor de CSV desconhecido: {engine} (opções: {', '.join(CSV_ENGINES)})")
+    if engine == 'auto':
+        return 'pyarrow' if importlib.util.find_spec('pyarrow') is not None else 'c'
+    return engine
+
+def _header_columns(buffer, start: int) -> List[str]:
+    """Nomes das colunas, lidos da linha de cabeçalho da seção"""
+    header_end = _NEWLINE_RE.search(buffer, start)
+    header = bytes(buffer[start:header_end.start() if header_end else len(buffer)])
+    return next(csv.reader([header.decode('utf-8').rstrip('\r')]), [])
+
+def _drop_tracebacks(error: BaseException) -> None:
+    """Solta os tracebacks do erro e das exceções encadeadas a ele (e com eles os quadros e suas variáveis)"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        error.__traceback__ = None
+        error = error.__cause__ or error.__context__
+
+def _read_detailed_section(buffer, engine: Optional[str] = None) -> pd.DataFrame:
+    """Entrega ao pandas apenas a faixa de bytes da seção de detalhes, com o esquema das colunas obrigatórias"""
+    with measure_stage('load_csv_file.locate_section'):
+        start, end = _locate_detailed_section(buffer)
+        header = _header_columns(buffer, start)
+    
+    # Ler só as colunas obrigatórias (em qualquer idioma), já com o tipo de cada uma
+    columns = [column for column in header if column in COLUMN_DTYPES or column in COLUMN_MAPPING]
+    dtype = {column: COLUMN_DTYPES[COLUMN_MAPPING.get(column, column)] for column in columns}
+    engine = resolve_csv_engine(engine)
+    with measure_stage(f'load_csv_file.read_csv.{engine}') as record:
+        with memoryview(buffer) as view, view[start:end] as section:
+            if engine == 'pyarrow':
+                # O pyarrow lê a fatia no lugar, sem cópia (o leitor é solto antes de liberar a fatia)
+                import pyarrow as pa
+                source = pa.BufferReader(pa.py_buffer(section))
+            else:
+                # O leitor C lê de um bloco contíguo: uma cópia só da seção, em uma única operação
+                source = io.BytesIO(bytes(section))
+            try:
+                df = pd.read_csv(source, encoding='utf-8', engine=engine, usecols=columns, dtype=dtype)
+            except BaseException as error:
+                # Os quadros do pandas no traceback ainda referenciam o leitor (e a fatia exportada):
+                # sem soltá-los, liberar a fatia falha com BufferError e esconde o erro de leitura
+                _drop_tracebacks(error)
+                raise
+            finally:
+                del source
+        record['rows'] = len(df)
+    
+    # Cabeçalho em inglês: normalizar os nomes para português já na leitura
+    if all(column in df.columns for column in REQUIRED_COLUMNS_EN):
+        df = df.rename(columns=COLUMN_MAPPING)
+    return df
+
+def load_csv_file(file_path_or_buffer, engine: Optional[str] = None) -> pd.DataFrame:
+    """Carrega o CSV lidando com a estrutura complexa do arquivo AWS.
+    
+    Devolve só as colunas obrigatórias, com os nomes em português; `engine` escolhe o leitor (veja CSV_ENGINES).
+    """
+    if hasattr(file_path_or_buffer, 'getbuffer'):
+        # Uploads do Streamlit (BytesIO): varrer o próprio buffer, sem copiá-lo
+        with file_path_or_buffer.getbuffer() as view:
+            return _read_detailed_section(view, engine)
+    
+    if hasattr(file_path_or_buffer, 'read'):
+        # Outros objetos de arquivo: uma única leitura para a memória
+        with measure_stage('load_csv_file.read_bytes'):
+            content = file_path_or_buffer.read()
+        return _read_detailed_section(content, engine)
+    
+    with open(file_path_or_buffer, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("Seção 'Estimativa detalhada' ou 'Detailed Estimate' não encontrada")
+        # Arquivos em disco: mapear em memória e deixar o sistema paginar sob demanda
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _read_detailed_section(mapped, engine)
+
+@timed_stage('normalize_columns')
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Valida as colunas obrigatórias e normaliza os nomes para português"""
+    is_portuguese = all(col in df.columns for col in REQUIRED_COLUMNS_PT)
+    is_english = all(col in df.columns for col in REQUIRED_COLUMNS_EN)
+    
+    if not is_portuguese and not is_english:
+        missing_pt = [col for col in REQUIRED_COLUMNS_PT if col not in df.columns]
+        missing_en = [col for col in REQUIRED_COLUMNS_EN if col not in df.columns]
+        raise ValueError(f"Colunas faltando no CSV. Português: {', '.join(missing_pt)} | Inglês: {', '.join(missing_en)}")
+    
+    if is_english:
+        df = df.rename(columns=COLUMN_MAPPING)
+    
+    return df
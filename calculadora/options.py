@@ -0,0 +1,41 @@
+"""Opções de pagamento, taxas padrão e as regras de preço que dependem de cada opção"""
+from typing import Dict, Optional
+
+# Opções expostas na barra lateral e na linha de comando
+PAYMENT_OPTIONS = ["No Upfront 12x pela AWS", "All Upfront 06x pela TdSynnex"]
+GLOBAL_PAYMENT_TYPES = ["All Upfront", "No Upfront"]
+DEFAULT_EXCHANGE_RATE = 5.50
+DEFAULT_TAX_RATE = 13.83
+
+# Endereço, porta e tamanho máximo do CSV do serviço HTTP local
+SERVER_DEFAULT_HOST = '127.0.0.1'
+SERVER_DEFAULT_PORT = 8765
+SERVER_MAX_UPLOAD_MB = 50
+
+# Pasta monitorada: segundos entre varreduras e sem modificação para considerar um CSV completo (cópia terminada)
+WATCH_DEFAULT_INTERVAL = 5.0
+WATCH_SETTLE_SECONDS = 2.0
+
+# Leitores de CSV aceitos ('pyarrow' usa várias threads); 'auto' escolhe o pyarrow quando instalado
+CSV_ENGINES = ['auto', 'pyarrow', 'c']
+CSV_ENGINE_ENV = 'CALCULADORA_CSV_ENGINE'
+
+# Regras de preço, na mesma precedência da cadeia original de descontos, e a opção de
+# pagamento de que cada uma depende ('Reserved' cobre EC2 e ElastiCache)
+PRICING_RULES = ['CloudFront', 'Lambda', 'Fargate', 'RDS', 'Reserved']
+PRICING_RULE_OPTIONS = {
+    'CloudFront': None,
+    'Lambda': 'lambda_payment_option',
+    'Fargate': 'fargate_payment_option',
+    'RDS': 'global_payment_type',
+    'Reserved': 'global_payment_type'
+}
+
+def pricing_options(lambda_payment_option: str, fargate_payment_option: str, global_payment_type: str) -> Dict[str, Optional[str]]:
+    """Opção de pagamento que se aplica a cada regra de preço"""
+    options = {
+        'lambda_payment_option': lambda_payment_option,
+        'fargate_payment_option': fargate_payment_option,
+        'global_payment_type': global_payment_type
+    }
+    return {rule: options.get(option) for rule, option in PRICING_RULE_OPTIONS.items()}
@@ -0,0 +1,105 @@
+"""Registro de desempenho das etapas do processamento (tempo, linhas, memória e perfil cProfile)"""
+import cProfile
+import io
+import marshal
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, List, Optional
+
+# Registro de desempenho ativo no contexto atual; as etapas do processamento se registram nele
+_ACTIVE_PERFORMANCE_LOG: ContextVar[Optional['PerformanceLog']] = ContextVar('performance_log', default=None)
+
+class PerformanceLog:
+    """Tempo, linhas e memória de cada etapa do processamento, com perfil cProfile opcional.
+    
+    Uso: `with PerformanceLog() as performance: process_csv(df)`; depois, `performance.records`.
+    """
+    
+    def __init__(self, track_memory: bool = False, profile: bool = False):
+        self.track_memory = track_memory
+        self.records: List[Dict] = []
+        self._profiler = cProfile.Profile() if profile else None
+        self._token = None
+        self._started_tracing = False
+        self._started_at = None
+        self.total_seconds = 0.0
+    
+    def __enter__(self) -> 'PerformanceLog':
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._token = _ACTIVE_PERFORMANCE_LOG.set(self)
+        self._started_at = time.perf_counter()
+        if self._profiler:
+            self._profiler.enable()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        if self._profiler:
+            self._profiler.disable()
+        self.total_seconds = time.perf_counter() - self._started_at
+        _ACTIVE_PERFORMANCE_LOG.reset(self._token)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+    
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None):
+        """Mede uma etapa; quem chama pode preencher record['rows'] quando só sabe a contagem no final"""
+        record = {'stage': name, 'rows': rows, 'seconds': 0.0, 'memory_delta_mb': None, 'memory_peak_mb': None}
+        tracing = self.track_memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            memory_before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            if tracing:
+                memory_after, memory_peak = tracemalloc.get_traced_memory()
+                record['memory_delta_mb'] = (memory_after - memory_before) / 1e6
+                record['memory_peak_mb'] = (memory_peak - memory_before) / 1e6
+            self.records.append(record)
+    
+    def profile_summary(self, limit: int = 25) -> str:
+        """As funções mais custosas (tempo acumulado) do perfil capturado"""
+        if not self._profiler:
+            return ''
+        output = io.StringIO()
+        pstats.Stats(self._profiler, stream=output).sort_stats('cumulative').print_stats(limit)
+        return output.getvalue()
+    
+    def profile_bytes(self) -> bytes:
+        """Perfil no formato de `pstats.Stats.dump_stats` (abre com pstats ou snakeviz)"""
+        if not self._profiler:
+            return b''
+        return marshal.dumps(pstats.Stats(self._profiler).stats)
+    
+    def dump_profile(self, path: str) -> None:
+        """Grava o perfil capturado em arquivo .prof"""
+        pstats.Stats(self._profiler).dump_stats(path)
+
+@contextmanager
+def measure_stage(name: str, rows: Optional[int] = None):
+    """Mede uma etapa no registro de desempenho ativo; sem registro ativo, só devolve um registro descartável"""
+    performance = _ACTIVE_PERFORMANCE_LOG.get()
+    if performance is None:
+        yield {'stage': name, 'rows': rows}
+        return
+    with performance.stage(name, rows) as record:
+        yield record
+
+def timed_stage(name: str):
+    """Decorador: mede a função inteira como uma etapa no registro de desempenho ativo"""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with measure_stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
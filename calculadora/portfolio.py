@@ -0,0 +1,96 @@
+"""Várias exportações (uma por conta): consolidação por conta e relatório do portfólio"""
+import io
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .loader import load_csv_file, normalize_columns
+from .pricing import parse_line_items
+from .summary import _write_financial_summary, aggregate_services, generate_summary
+
+def parse_export(source, csv_engine: Optional[str] = None) -> Dict:
+    """Lê, valida e normaliza um CSV da Calculadora (caminho, bytes ou objeto de arquivo)"""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return parse_line_items(normalize_columns(load_csv_file(source, csv_engine)))
+
+def merge_processed(processed: List[Dict]) -> Dict:
+    """Junta resultados processados da mesma conta em um só, com os serviços na ordem dos arquivos"""
+    merged = {
+        'client_name': processed[0]['client_name'],
+        'account_id': processed[0]['account_id'],
+        'services_by_region': {},
+        'regions': set(),
+        'on_demand_total': 0
+    }
+    for data in processed:
+        merged['regions'].update(data['regions'])
+        merged['on_demand_total'] += data.get('on_demand_total', 0)
+        for region, services in data['services_by_region'].items():
+            region_services = merged['services_by_region'].setdefault(region, {})
+            for service_type, instances in services.items():
+                region_services.setdefault(service_type, []).extend(instances)
+    return merged
+
+def consolidate_accounts(processed: List[Dict]) -> List[Dict]:
+    """Agrupa os resultados por conta (cliente + ID da conta), na ordem em que as contas aparecem"""
+    by_account = {}
+    for data in processed:
+        by_account.setdefault((data['client_name'], data['account_id']), []).append(data)
+    return [group[0] if len(group) == 1 else merge_processed(group) for group in by_account.values()]
+
+def portfolio_region_totals(accounts: List[Dict], aggregations: List[Dict]) -> pd.DataFrame:
+    """Totais anuais por conta e região, seguidos do total de cada conta e do total geral"""
+    rows = []
+    for data, aggregation in zip(accounts, aggregations):
+        for region_entry in aggregation['regions']:
+            rows.append({
+                'client_name': data['client_name'],
+                'account_id': data['account_id'],
+                'region': region_entry['region'],
+                'itens': sum(service['item_count'] for service in region_entry['services']),
+                'no_upfront_anual': region_entry['no_upfront_monthly'] * 12,
+                'all_upfront_anual': region_entry['all_upfront']
+            })
+        rows.append({
+            'client_name': data['client_name'],
+            'account_id': data['account_id'],
+            'region': 'Total da conta',
+            'itens': aggregation['item_count'],
+            'no_upfront_anual': aggregation['no_upfront_annual'],
+            'all_upfront_anual': aggregation['all_upfront']
+        })
+    rows.append({
+        'client_name': 'Total geral',
+        'account_id': '',
+        'region': '',
+        'itens': sum(aggregation['item_count'] for aggregation in aggregations),
+        'no_upfront_anual': sum(aggregation['no_upfront_annual'] for aggregation in aggregations),
+        'all_upfront_anual': sum(aggregation['all_upfront'] for aggregation in aggregations)
+    })
+    return pd.DataFrame(rows)
+
+def generate_portfolio_summary(accounts: List[Dict], exchange_rate: float, tax_rate: float = 13.83, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS", aggregations: Optional[List[Dict]] = None) -> str:
+    """Relatório consolidado: o resumo de cada conta, no formato de sempre, seguido dos totais gerais"""
+    if aggregations is None:
+        aggregations = [aggregate_services(data) for data in accounts]
+    
+    separator = "=" * 60 + "\n"
+    parts = [f"Relatório consolidado - {len(accounts)} conta(s) AWS\n\n"]
+    write = parts.append
+    
+    for data, aggregation in zip(accounts, aggregations):
+        write(separator)
+        write(generate_summary(data, exchange_rate, tax_rate, lambda_payment_option, fargate_payment_option, aggregation))
+        write("\n")
+    
+    write(separator)
+    write("Totais consolidados (todas as contas)\n\n")
+    _write_financial_summary(
+        write,
+        sum(aggregation['all_upfront'] for aggregation in aggregations),
+        sum(aggregation['no_upfront_monthly'] for aggregation in aggregations),
+        exchange_rate,
+        tax_rate
+    )
+    return ''.join(parts)
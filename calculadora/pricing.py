@@ -0,0 +1,277 @@
+"""Normalização das linhas em itens e aplicação das formas de pagamento e descontos"""
+import re
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config_summary import cached_instance_details
+from .discounts import DISCOUNT_CREDIT_CONDITIONS, lookup_discounts
+from .options import PRICING_RULES, pricing_options
+from .performance import measure_stage, timed_stage
+from .records import LineItem
+from .regions import DEFAULT_REGION_GROUP, region_code, region_discount_group
+
+def _contains_any(column: pd.Series, *terms: str) -> np.ndarray:
+    """Versão colunar de `any(term in valor for term in terms)` para uma coluna de texto"""
+    if len(terms) == 1:
+        matches = column.str.contains(terms[0], regex=False, na=False)
+    else:
+        matches = column.str.contains('|'.join(re.escape(term) for term in terms), regex=True, na=False)
+    return matches.to_numpy(dtype=bool)
+
+def _resolve_regions(region: pd.Series, resolve: Callable[[str], str], default: str) -> np.ndarray:
+    """`resolve` aplicado a cada linha, consultando o catálogo de regiões uma vez por rótulo distinto"""
+    codes, labels = pd.factorize(region)
+    # Região vazia (código -1) cai no último elemento: o valor padrão
+    return np.array([resolve(label) for label in labels] + [default], dtype=object)[codes]
+
+def _object_array(values: List) -> np.ndarray:
+    """Array de objetos com um elemento por valor (listas ficam inteiras, sem virar uma dimensão)"""
+    array = np.empty(len(values), dtype=object)
+    for index, value in enumerate(values):
+        array[index] = value
+    return array
+
+def _interned_values(values) -> List:
+    """Valores de uma coluna como lista, com cada valor distinto internado uma única vez
+    (região, serviço, tipo e textos repetidos ficam uma vez em memória)"""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    interned = _object_array([sys.intern(value) if isinstance(value, str) else value for value in uniques])
+    return interned[codes].tolist()
+
+def _interned_specs(specs_column: List) -> List[Tuple[str, ...]]:
+    """Specs como tuplas de textos internados; a mesma lista (mesma configuração) é convertida uma única vez"""
+    converted = {}
+    result = []
+    for specs in specs_column:
+        value = converted.get(id(specs))
+        if value is None:
+            value = converted[id(specs)] = tuple([sys.intern(spec) for spec in specs])
+        result.append(value)
+    return result
+
+def _extract_client_account(df: pd.DataFrame) -> Tuple[str, str]:
+    """Extrai nome do cliente e ID da conta da primeira linha de 'Hierarquia de grupos'"""
+    client_name, account_id = '', ''
+    if not df.empty and 'Hierarquia de grupos' in df.columns:
+        first_hierarchy = df['Hierarquia de grupos'].iloc[0]
+        if ' > ' in first_hierarchy:
+            client_account = first_hierarchy.split(' > ')[0].strip()
+            
+            if ' - ' in client_account:
+                parts = client_account.split(' - ')
+                if len(parts) >= 3:
+                    client_name = ' - '.join(parts[:-1]).strip()
+                    account_id = parts[-1].strip()
+                elif len(parts) == 2:
+                    client_name = parts[0].strip()
+                    account_id = parts[1].strip()
+            elif ' ' in client_account:
+                client_parts = client_account.rsplit(' ', 1)
+                client_name = client_parts[0].strip()
+                account_id = client_parts[1].strip()
+    return client_name, account_id
+
+def parse_line_items(df: pd.DataFrame) -> Dict:
+    """Primeira etapa: normaliza as linhas do CSV em itens que não dependem da forma de pagamento"""
+    client_name, account_id = _extract_client_account(df)
+    parsed = {
+        'client_name': client_name,
+        'account_id': account_id,
+        'regions': set(),
+        'on_demand_total': 0,
+        'line_items': pd.DataFrame(columns=[
+            'region', 'service_name', 'service_key', 'pricing_rule', 'config', 'upfront', 'monthly',
+            'region_group', 'architecture', 'is_heavy_utilization', 'has_storage_discount',
+            'tipo', 'quantidade', 'specs'
+        ])
+    }
+    
+    if df.empty:
+        return parsed
+    
+    with measure_stage('parse_line_items.classify', rows=len(df)):
+        region = df['Região']
+        service = df['Serviço']
+        
+        parsed['regions'].update(region.tolist())
+        
+        # Classificar os serviços de uma vez para todas as linhas
+        is_ec2 = _contains_any(service, 'EC2')
+        is_rds = _contains_any(service, 'RDS', 'Aurora')
+        is_elasticache = _contains_any(service, 'ElastiCache')
+        is_cloudfront = _contains_any(service, 'CloudFront')
+        is_lambda = _contains_any(service, 'Lambda')
+        is_fargate = _contains_any(service, 'Fargate')
+        
+        service_key = np.select(
+            [is_ec2, is_rds, is_elasticache, is_cloudfront, is_lambda, is_fargate],
+            ['EC2', 'RDS', 'ElastiCache', 'CloudFront', 'Lambda', 'Fargate'],
+            ''
+        )
+        pricing_rule = np.select([is_cloudfront, is_lambda, is_fargate, is_rds], PRICING_RULES[:-1], 'Reserved')
+        
+        # Custo On Demand anual na mesma passada
+        monthly = df['Mensal'].astype(float).fillna(0).to_numpy()
+        is_on_demand = _on_demand_mask(df)
+        parsed['on_demand_total'] = _on_demand_total(monthly, is_on_demand)
+        
+        # Pular linhas On Demand (exceto Lambda, Fargate e CloudFront)
+        keep = (service_key != '') & (~is_on_demand | is_lambda | is_fargate | is_cloudfront)
+        
+        kept = df[keep]
+    
+    with measure_stage('parse_line_items.extract_details', rows=len(kept)):
+        # Detalhes de cada par (configuração, serviço) distinto, lidos uma vez e espalhados pelas linhas
+        # (o resumo da configuração pode vir vazio, como NaN)
+        config_codes, configs = pd.factorize(kept['Resumo da configuração'], use_na_sentinel=False)
+        service_codes, services = pd.factorize(kept['Serviço'], use_na_sentinel=False)
+        pair_codes, pairs = pd.factorize(config_codes.astype(np.int64) * len(services) + service_codes)
+        details = [cached_instance_details(configs[pair // len(services)], services[pair % len(services)]) for pair in pairs.tolist()]
+    
+    with measure_stage('parse_line_items.build', rows=len(kept)):
+        # Marcadores do texto avaliados uma vez por configuração distinta
+        config_text = pd.Series(configs, dtype=kept['Resumo da configuração'].dtype)
+        parsed['line_items'] = pd.DataFrame({
+            'region': kept['Região'].array,
+            'service_name': kept['Serviço'].array,
+            'service_key': service_key[keep],
+            'pricing_rule': pricing_rule[keep],
+            'config': kept['Resumo da configuração'].array,
+            'upfront': kept['Pagamento adiantado'].astype(float).fillna(0).to_numpy(),
+            'monthly': monthly[keep],
+            'region_group': _resolve_regions(kept['Região'], region_discount_group, DEFAULT_REGION_GROUP),
+            'architecture': np.where(_contains_any(config_text, 'ARM'), 'ARM64', 'X86_64').astype(object)[config_codes],
+            'is_heavy_utilization': is_elasticache[keep] & _contains_any(config_text, 'cache.t2.micro')[config_codes],
+            'has_storage_discount': _contains_any(config_text, 'Quantidade de armazenamento (20 GB)')[config_codes],
+            'tipo': _object_array([row_details.get('tipo', 'N/A') for row_details in details])[pair_codes],
+            'quantidade': np.array([row_details.get('quantidade', 1) for row_details in details], dtype=np.int64)[pair_codes],
+            'specs': _object_array([row_details.get('specs', []) for row_details in details])[pair_codes]
+        })
+    
+    return parsed
+
+def price_rule(line_items: pd.DataFrame, rule: str, option: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Segunda etapa: forma de pagamento e custo dos itens de uma regra de preço, na ordem dos itens"""
+    items = line_items[line_items['pricing_rule'] == rule]
+    upfront = items['upfront'].to_numpy(dtype=float)
+    monthly = items['monthly'].to_numpy(dtype=float)
+    payment_mode = np.full(len(items), 'No Upfront', dtype=object)
+    
+    # Forma de pagamento e custo base; os descontos vêm da tabela de descontos
+    if rule == 'CloudFront':
+        # Garantir que usa o valor mensal correto
+        base_cost = np.where(monthly > 0, monthly, upfront)
+    
+    elif rule == 'Lambda':
+        # Lambda sempre processa (mesmo On Demand)
+        if 'All Upfront' in option:
+            payment_mode[:] = 'All Upfront'
+            base_cost = np.where(upfront > 0, upfront, monthly)
+        else:
+            base_cost = monthly
+    
+    elif rule == 'Fargate':
+        # Fargate sempre processa (mesmo On Demand) e usa o valor mensal como base
+        if 'All Upfront' in option:
+            payment_mode[:] = 'All Upfront'
+        base_cost = monthly
+    
+    else:
+        # EC2, RDS e ElastiCache usam o tipo de pagamento global
+        payment_mode[:] = option
+        if option == 'All Upfront':
+            # Correção especial para ElastiCache cache.t2.micro
+            payment_mode[items['is_heavy_utilization'].to_numpy(dtype=bool)] = 'Heavy Utilization'
+        
+        if rule == 'RDS':
+            base_cost = monthly if option == 'No Upfront' else upfront
+        else:
+            base_cost = np.where(payment_mode == 'All Upfront', upfront, monthly)
+    
+    multiplier, credit, condition = lookup_discounts(
+        rule, items['region_group'].to_numpy(dtype=object), payment_mode, items['architecture'].to_numpy(dtype=object),
+        region_code=_resolve_regions(items['region'], lambda label: region_code(label) or '', '')
+    )
+    for condition_name, column in DISCOUNT_CREDIT_CONDITIONS.items():
+        credit[(condition == condition_name) & ~items[column].to_numpy(dtype=bool)] = 0.0
+    
+    return payment_mode, base_cost * multiplier - credit
+
+@timed_stage('assemble_services')
+def assemble_services(parsed: Dict, priced: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> Dict:
+    """Monta o resultado final (services_by_region) a partir dos itens e dos preços de cada regra"""
+    result = {
+        'client_name': parsed['client_name'],
+        'account_id': parsed['account_id'],
+        'services_by_region': {},
+        'regions': set(parsed['regions']),
+        'on_demand_total': parsed['on_demand_total']
+    }
+    
+    line_items = parsed['line_items']
+    payment_mode = np.empty(len(line_items), dtype=object)
+    total_cost = np.zeros(len(line_items))
+    pricing_rule = line_items['pricing_rule'].to_numpy()
+    for rule, (rule_modes, rule_costs) in priced.items():
+        mask = pricing_rule == rule
+        payment_mode[mask] = rule_modes
+        total_cost[mask] = rule_costs
+    
+    # Itens agrupados por (região, serviço), na ordem da primeira ocorrência de cada grupo e das linhas
+    # dentro dele; cada grupo vira a lista de itens com um único `map` sobre as colunas já ordenadas
+    region_codes, regions = pd.factorize(line_items['region'], use_na_sentinel=False)
+    service_codes, service_keys = pd.factorize(line_items['service_key'], use_na_sentinel=False)
+    service_count = max(len(service_keys), 1)
+    group_codes, groups = pd.factorize(region_codes.astype(np.int64) * service_count + service_codes)
+    order = np.argsort(group_codes, kind='stable')
+    bounds = np.searchsorted(group_codes[order], np.arange(len(groups) + 1)).tolist()
+    
+    columns = [
+        _interned_values(line_items['tipo'].to_numpy(dtype=object)[order]),
+        line_items['quantidade'].to_numpy()[order].tolist(),
+        _interned_specs(line_items['specs'].to_numpy(dtype=object)[order].tolist()),
+        _interned_values(payment_mode[order]),
+        total_cost[order].tolist(),
+        line_items['upfront'].to_numpy(dtype=float)[order].tolist(),
+        _interned_values(line_items['service_name'].to_numpy(dtype=object)[order]),
+        _interned_values(line_items['config'].to_numpy(dtype=object)[order])
+    ]
+    region_names = [sys.intern(region) for region in regions]
+    service_names = [sys.intern(service) for service in service_keys]
+    services_by_region = result['services_by_region']
+    for group, group_start, group_end in zip(groups.tolist(), bounds, bounds[1:]):
+        region = region_names[group // service_count]
+        service_key = service_names[group % service_count]
+        services_by_region.setdefault(region, {})[service_key] = list(map(LineItem, *(column[group_start:group_end] for column in columns)))
+    
+    return result
+
+def price_line_items(parsed: Dict, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS", global_payment_type: str = "All Upfront") -> Dict:
+    """Aplica as formas de pagamento aos itens normalizados e monta o resultado"""
+    options = pricing_options(lambda_payment_option, fargate_payment_option, global_payment_type)
+    priced = {}
+    for rule, option in options.items():
+        with measure_stage(f'price_rule.{rule}'):
+            priced[rule] = price_rule(parsed['line_items'], rule, option)
+    return assemble_services(parsed, priced)
+
+def process_csv(df: pd.DataFrame, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS", global_payment_type: str = "All Upfront") -> Dict:
+    """Processa o DataFrame e extrai informações relevantes"""
+    return price_line_items(parse_line_items(df), lambda_payment_option, fargate_payment_option, global_payment_type)
+
+def _on_demand_mask(df: pd.DataFrame) -> np.ndarray:
+    """Linhas On Demand, identificadas pela hierarquia de grupos"""
+    return _contains_any(df['Hierarquia de grupos'], 'On-demand', 'On Demand', 'On-Demand')
+
+def _on_demand_total(monthly: np.ndarray, is_on_demand: np.ndarray) -> float:
+    """Soma anual dos valores mensais On Demand, na ordem das linhas"""
+    return sum((monthly[is_on_demand] * 12).tolist())
+
+def calculate_on_demand_costs(df: pd.DataFrame) -> float:
+    """Calcula o custo total On Demand anual"""
+    if df.empty:
+        return 0
+    return _on_demand_total(df['Mensal'].astype(float).fillna(0).to_numpy(), _on_demand_mask(df))
@@ -0,0 +1,197 @@
+"""Comparação de duas versões de uma cotação: itens adicionados, removidos e alterados e a diferença nos totais"""
+import math
+from typing import Dict, List, Optional, Tuple
+
+from .options import DEFAULT_EXCHANGE_RATE, DEFAULT_TAX_RATE, GLOBAL_PAYMENT_TYPES, PAYMENT_OPTIONS
+from .performance import measure_stage, timed_stage
+from .regions import region_code
+
+# Situação de cada chave na comparação, na ordem do relatório
+DIFF_STATUSES = ['adicionado', 'removido', 'alterado', 'inalterado']
+# Diferenças de custo abaixo de meio centavo são arredondamento, não mudança
+_COST_TOLERANCE = 0.005
+
+def line_item_key(region: str, service_key: str, instance) -> Tuple:
+    """Chave normalizada de um item: região (pelo código do catálogo, PT e EN iguais), serviço, tipo e specs"""
+    return (region_code(region) or region, service_key, instance['tipo'], tuple(instance['specs']))
+
+def index_line_items(data: Dict) -> Dict[Tuple, Dict]:
+    """Itens de um resultado processado agrupados pela chave normalizada, com quantidades e custos somados.
+    
+    Os custos seguem as regras do resumo: No Upfront mensal e All Upfront anual
+    (Lambda e Fargate All Upfront têm valor mensal, multiplicado por 12).
+    """
+    index = {}
+    for region, services in data['services_by_region'].items():
+        for service_key, instances in services.items():
+            all_upfront_months = 12 if service_key in ('Lambda', 'Fargate') else 1
+            for instance in instances:
+                key = line_item_key(region, service_key, instance)
+                entry = index.get(key)
+                if entry is None:
+                    entry = index[key] = {
+                        'region': region,
+                        'service_key': service_key,
+                        'tipo': instance['tipo'],
+                        'specs': list(instance['specs']),
+                        'itens': 0,
+                        'quantidade': 0,
+                        'no_upfront_mensal': 0.0,
+                        'all_upfront_anual': 0.0
+                    }
+                entry['itens'] += 1
+                entry['quantidade'] += instance['quantidade']
+                payment_mode = instance['payment_mode']
+                if payment_mode == 'No Upfront':
+                    entry['no_upfront_mensal'] += instance['cost']
+                elif payment_mode == 'All Upfront' or payment_mode == 'Heavy Utilization':
+                    entry['all_upfront_anual'] += instance['cost'] * all_upfront_months
+    return index
+
+def _annual_cost(entry: Optional[Dict]) -> float:
+    """Custo anual de uma chave (No Upfront × 12 + All Upfront)"""
+    if entry is None:
+        return 0.0
+    return entry['no_upfront_mensal'] * 12 + entry['all_upfront_anual']
+
+def _diff_row(key: Tuple, old: Optional[Dict], new: Optional[Dict]) -> Dict:
+    """Linha da comparação de uma chave, com os valores antes e depois"""
+    reference = new if new is not None else old
+    old_quantity = old['quantidade'] if old is not None else 0
+    new_quantity = new['quantidade'] if new is not None else 0
+    old_cost = _annual_cost(old)
+    new_cost = _annual_cost(new)
+    
+    if old is None:
+        status = 'adicionado'
+    elif new is None:
+        status = 'removido'
+    elif old_quantity != new_quantity or not math.isclose(old_cost, new_cost, abs_tol=_COST_TOLERANCE):
+        status = 'alterado'
+    else:
+        status = 'inalterado'
+    
+    return {
+        'situacao': status,
+        'regiao': reference['region'],
+        'codigo_regiao': key[0],
+        'servico': reference['service_key'],
+        'tipo': reference['tipo'],
+        'specs': reference['specs'],
+        'quantidade_antes': old_quantity,
+        'quantidade_depois': new_quantity,
+        'custo_anual_antes': old_cost,
+        'custo_anual_depois': new_cost,
+        'diferenca_anual': new_cost - old_cost
+    }
+
+def _totals(index: Dict[Tuple, Dict], data: Dict, exchange_rate: float, tax_rate: float) -> Dict[str, float]:
+    """Totais anuais de uma versão, em USD e em BRL com impostos (como no resumo financeiro)"""
+    no_upfront_annual = sum(entry['no_upfront_mensal'] for entry in index.values()) * 12
+    all_upfront = sum(entry['all_upfront_anual'] for entry in index.values())
+    with_taxes = 1 + tax_rate / 100
+    return {
+        'on_demand_anual': data.get('on_demand_total', 0),
+        'no_upfront_anual': no_upfront_annual,
+        'all_upfront_anual': all_upfront,
+        'no_upfront_anual_brl': no_upfront_annual * with_taxes * exchange_rate,
+        'all_upfront_anual_brl': all_upfront * with_taxes * exchange_rate
+    }
+
+@timed_stage('diff_quotes')
+def diff_quotes(old: Dict, new: Dict, exchange_rate: float = DEFAULT_EXCHANGE_RATE, tax_rate: float = DEFAULT_TAX_RATE) -> Dict:
+    """Compara dois resultados processados (process_csv/price_line_items) pela chave normalizada dos itens.
+    
+    Cada versão é indexada uma vez e a junção percorre os dois índices uma única vez (tempo linear).
+    Devolve as linhas por chave (novas na ordem da versão nova, removidas ao final), a contagem por
+    situação e os totais antes, depois e a diferença, em USD e BRL.
+    """
+    with measure_stage('diff_quotes.index') as record:
+        old_index = index_line_items(old)
+        new_index = index_line_items(new)
+        record['rows'] = len(old_index) + len(new_index)
+    
+    with measure_stage('diff_quotes.join', rows=len(old_index) + len(new_index)):
+        rows = [_diff_row(key, old_index.get(key), entry) for key, entry in new_index.items()]
+        rows.extend(_diff_row(key, entry, None) for key, entry in old_index.items() if key not in new_index)
+    
+    counts = dict.fromkeys(DIFF_STATUSES, 0)
+    for row in rows:
+        counts[row['situacao']] += 1
+    
+    old_totals = _totals(old_index, old, exchange_rate, tax_rate)
+    new_totals = _totals(new_index, new, exchange_rate, tax_rate)
+    return {
+        'antes': {'client_name': old['client_name'], 'account_id': old['account_id']},
+        'depois': {'client_name': new['client_name'], 'account_id': new['account_id']},
+        'linhas': rows,
+        'contagem': counts,
+        'totais': {
+            name: {'antes': old_totals[name], 'depois': new_totals[name], 'diferenca': new_totals[name] - old_totals[name]}
+            for name in old_totals
+        },
+        'exchange_rate': exchange_rate,
+        'tax_rate': tax_rate
+    }
+
+# Rótulos dos totais no relatório e na interface
+DIFF_TOTAL_LABELS = {
+    'on_demand_anual': "On Demand (USD/ano)",
+    'no_upfront_anual': "No Upfront (USD/ano)",
+    'all_upfront_anual': "All Upfront (USD/ano)",
+    'no_upfront_anual_brl': "No Upfront com imposto (R$/ano)",
+    'all_upfront_anual_brl': "All Upfront com imposto (R$/ano)"
+}
+
+def _describe_row(row: Dict) -> str:
+    """Descrição de uma linha no relatório: serviço, tipo e specs, região"""
+    specs = ', '.join(str(spec) for spec in row['specs'])
+    description = f"{row['servico']} {row['tipo']}" + (f" ({specs})" if specs else '')
+    return f"{description} - {row['regiao']}"
+
+def generate_diff_report(diff: Dict) -> str:
+    """Relatório em texto da comparação: itens adicionados, removidos e alterados e a diferença nos totais"""
+    parts = [
+        "Comparação de cotações\n",
+        f"Antes: {diff['antes']['client_name']} - {diff['antes']['account_id']}\n",
+        f"Depois: {diff['depois']['client_name']} - {diff['depois']['account_id']}\n\n"
+    ]
+    write = parts.append
+    
+    counts = diff['contagem']
+    write(f"{counts['adicionado']} adicionado(s), {counts['removido']} removido(s), {counts['alterado']} alterado(s), {counts['inalterado']} inalterado(s)\n\n")
+    
+    sections = (('adicionado', "Adicionados"), ('removido', "Removidos"), ('alterado', "Alterados"))
+    for status, title in sections:
+        rows = [row for row in diff['linhas'] if row['situacao'] == status]
+        if not rows:
+            continue
+        write(f"{title}:\n")
+        for row in rows:
+            if status == 'adicionado':
+                write(f"+ {row['quantidade_depois']}x {_describe_row(row)}: USD {row['custo_anual_depois']:,.2f}/ano\n")
+            elif status == 'removido':
+                write(f"- {row['quantidade_antes']}x {_describe_row(row)}: USD {row['custo_anual_antes']:,.2f}/ano\n")
+            else:
+                write(
+                    f"~ {_describe_row(row)}: {row['quantidade_antes']} -> {row['quantidade_depois']}, "
+                    f"USD {row['custo_anual_antes']:,.2f} -> {row['custo_anual_depois']:,.2f}/ano ({row['diferenca_anual']:+,.2f})\n"
+                )
+        write("\n")
+    
+    write(f"Diferença nos totais (câmbio R$ {diff['exchange_rate']:.2f}, imposto {diff['tax_rate']:.2f}%):\n")
+    for name, label in DIFF_TOTAL_LABELS.items():
+        total = diff['totais'][name]
+        write(f"{label}: {total['antes']:,.2f} -> {total['depois']:,.2f} ({total['diferenca']:+,.2f})\n")
+    return ''.join(parts)
+
+def diff_exports(old_source, new_source, exchange_rate: float = DEFAULT_EXCHANGE_RATE, tax_rate: float = DEFAULT_TAX_RATE, lambda_payment_option: str = PAYMENT_OPTIONS[0], fargate_payment_option: str = PAYMENT_OPTIONS[0], global_payment_type: str = GLOBAL_PAYMENT_TYPES[0]) -> Dict:
+    """Lê, precifica (com as mesmas formas de pagamento) e compara duas exportações (caminhos ou bytes)"""
+    from .portfolio import parse_export
+    from .pricing import price_line_items
+    
+    versions: List[Dict] = [
+        price_line_items(parse_export(source), lambda_payment_option, fargate_payment_option, global_payment_type)
+        for source in (old_source, new_source)
+    ]
+    return diff_quotes(versions[0], versions[1], exchange_rate, tax_rate)
@@ -0,0 +1,63 @@
+"""Itens processados de cada serviço e sua conversão para dicionários e colunas"""
+from typing import Dict, List, Tuple
+
+class LineItem:
+    """Item processado de um serviço; com slots ocupa uma fração de um dict e é serializável com pickle"""
+    __slots__ = ('tipo', 'quantidade', 'specs', 'payment_mode', 'cost', 'upfront', 'service_name', 'config')
+    
+    def __init__(self, tipo: str, quantidade: int, specs: Tuple[str, ...], payment_mode: str, cost: float, upfront: float, service_name: str, config: str):
+        self.tipo = tipo
+        self.quantidade = quantidade
+        self.specs = specs
+        self.payment_mode = payment_mode
+        self.cost = cost
+        self.upfront = upfront
+        self.service_name = service_name
+        self.config = config
+    
+    def __getitem__(self, key: str):
+        """Acesso por chave, compatível com o formato em dicionário (item['cost'])"""
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def __reduce__(self):
+        # Serializa como tupla posicional, sem repetir os nomes dos campos
+        return (LineItem, tuple(getattr(self, field) for field in self.__slots__))
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, LineItem):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+    
+    def __repr__(self) -> str:
+        return f"LineItem({self.tipo!r}, {self.quantidade!r}, {self.payment_mode!r}, {self.cost!r})"
+    
+    def to_dict(self) -> Dict:
+        """Item como dicionário (para JSON e exibição)"""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+def services_to_dict(data: Dict) -> Dict:
+    """Resultado processado com os itens convertidos em dicionários e as regiões em lista ordenada, pronto para JSON"""
+    result = dict(data)
+    result['regions'] = sorted(data['regions'])
+    result['services_by_region'] = {
+        region: {service_type: [instance.to_dict() for instance in instances] for service_type, instances in services.items()}
+        for region, services in data['services_by_region'].items()
+    }
+    return result
+
+# Colunas de line_item_columns: região e serviço seguidos dos campos de cada item
+LINE_ITEM_COLUMNS = ['region', 'service_type'] + list(LineItem.__slots__)
+
+def line_item_columns(data: Dict) -> Dict[str, List]:
+    """Itens de um resultado processado como colunas (uma linha por item), para tabelas"""
+    columns = {name: [] for name in LINE_ITEM_COLUMNS}
+    for region, services in data['services_by_region'].items():
+        for service_type, instances in services.items():
+            columns['region'].extend([region] * len(instances))
+            columns['service_type'].extend([service_type] * len(instances))
+            for field in LineItem.__slots__:
+                columns[field].extend([instance[field] for instance in instances])
+    return columns
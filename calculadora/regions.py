@@ -0,0 +1,145 @@
+"""Catálogo das regiões AWS: código, rótulos da Calculadora em português e inglês, grupo de desconto e nome no resumo"""
+import re
+import unicodedata
+import warnings
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Grupos de região da tabela de descontos (coluna grupo_regiao)
+SAO_PAULO_GROUP = 'sao-paulo'
+DEFAULT_REGION_GROUP = 'demais'
+
+class AwsRegion(NamedTuple):
+    """Região AWS como aparece na coluna 'Região' da Calculadora"""
+    code: str
+    name_pt: str
+    name_en: str
+    # Grupo de região da tabela de descontos
+    discount_group: str = DEFAULT_REGION_GROUP
+    # Nome no resumo; vazio usa o rótulo do próprio CSV
+    summary_name: str = ''
+
+AWS_REGIONS = (
+    AwsRegion('us-east-1', 'Leste dos EUA (N. da Virgínia)', 'US East (N. Virginia)', summary_name='N. Virginia'),
+    AwsRegion('us-east-2', 'Leste dos EUA (Ohio)', 'US East (Ohio)'),
+    AwsRegion('us-west-1', 'Oeste dos EUA (N. da Califórnia)', 'US West (N. California)'),
+    AwsRegion('us-west-2', 'Oeste dos EUA (Oregon)', 'US West (Oregon)'),
+    AwsRegion('ca-central-1', 'Canadá (Central)', 'Canada (Central)'),
+    AwsRegion('ca-west-1', 'Oeste do Canadá (Calgary)', 'Canada West (Calgary)'),
+    AwsRegion('mx-central-1', 'México (Central)', 'Mexico (Central)'),
+    AwsRegion('sa-east-1', 'América do Sul (São Paulo)', 'South America (Sao Paulo)', SAO_PAULO_GROUP, 'São Paulo'),
+    AwsRegion('eu-central-1', 'Europa (Frankfurt)', 'Europe (Frankfurt)'),
+    AwsRegion('eu-central-2', 'Europa (Zurique)', 'Europe (Zurich)'),
+    AwsRegion('eu-west-1', 'Europa (Irlanda)', 'Europe (Ireland)'),
+    AwsRegion('eu-west-2', 'Europa (Londres)', 'Europe (London)'),
+    AwsRegion('eu-west-3', 'Europa (Paris)', 'Europe (Paris)'),
+    AwsRegion('eu-south-1', 'Europa (Milão)', 'Europe (Milan)'),
+    AwsRegion('eu-south-2', 'Europa (Espanha)', 'Europe (Spain)'),
+    AwsRegion('eu-north-1', 'Europa (Estocolmo)', 'Europe (Stockholm)'),
+    AwsRegion('af-south-1', 'África (Cidade do Cabo)', 'Africa (Cape Town)'),
+    AwsRegion('il-central-1', 'Israel (Tel Aviv)', 'Israel (Tel Aviv)'),
+    AwsRegion('me-south-1', 'Oriente Médio (Bahrein)', 'Middle East (Bahrain)'),
+    AwsRegion('me-central-1', 'Oriente Médio (Emirados Árabes Unidos)', 'Middle East (UAE)'),
+    AwsRegion('ap-east-1', 'Ásia-Pacífico (Hong Kong)', 'Asia Pacific (Hong Kong)'),
+    AwsRegion('ap-east-2', 'Ásia-Pacífico (Taipei)', 'Asia Pacific (Taipei)'),
+    AwsRegion('ap-south-1', 'Ásia-Pacífico (Mumbai)', 'Asia Pacific (Mumbai)'),
+    AwsRegion('ap-south-2', 'Ásia-Pacífico (Hyderabad)', 'Asia Pacific (Hyderabad)'),
+    AwsRegion('ap-northeast-1', 'Ásia-Pacífico (Tóquio)', 'Asia Pacific (Tokyo)'),
+    AwsRegion('ap-northeast-2', 'Ásia-Pacífico (Seul)', 'Asia Pacific (Seoul)'),
+    AwsRegion('ap-northeast-3', 'Ásia-Pacífico (Osaka)', 'Asia Pacific (Osaka)'),
+    AwsRegion('ap-southeast-1', 'Ásia-Pacífico (Singapura)', 'Asia Pacific (Singapore)'),
+    AwsRegion('ap-southeast-2', 'Ásia-Pacífico (Sydney)', 'Asia Pacific (Sydney)'),
+    AwsRegion('ap-southeast-3', 'Ásia-Pacífico (Jacarta)', 'Asia Pacific (Jakarta)'),
+    AwsRegion('ap-southeast-4', 'Ásia-Pacífico (Melbourne)', 'Asia Pacific (Melbourne)'),
+    AwsRegion('ap-southeast-5', 'Ásia-Pacífico (Malásia)', 'Asia Pacific (Malaysia)'),
+    AwsRegion('ap-southeast-6', 'Ásia-Pacífico (Nova Zelândia)', 'Asia Pacific (New Zealand)'),
+    AwsRegion('ap-southeast-7', 'Ásia-Pacífico (Tailândia)', 'Asia Pacific (Thailand)'),
+    AwsRegion('us-gov-east-1', 'AWS GovCloud (Leste dos EUA)', 'AWS GovCloud (US-East)'),
+    AwsRegion('us-gov-west-1', 'AWS GovCloud (Oeste dos EUA)', 'AWS GovCloud (US-West)'),
+)
+
+# Código da região dentro de um rótulo, ex.: "Europe (Frankfurt) eu-central-1"
+_REGION_CODE_RE = re.compile(r'\b[a-z]{2}(?:-gov)?-[a-z]+-\d\b')
+_PARENTHESES_RE = re.compile(r'\(([^)]*)\)')
+
+def _normalize_label(label: str) -> str:
+    """Rótulo sem acentos, sem diferença de maiúsculas e com espaços simples"""
+    decomposed = unicodedata.normalize('NFKD', label)
+    return ' '.join(''.join(char for char in decomposed if not unicodedata.combining(char)).casefold().split())
+
+def _build_indexes() -> Tuple[Dict[str, AwsRegion], Dict[str, AwsRegion], Dict[str, AwsRegion]]:
+    """Índices do catálogo: rótulos completos (PT, EN e código), o nome entre parênteses quando é único
+    e os nomes procurados em qualquer posição do rótulo: lugares ("São Paulo") e áreas ("América do Sul") únicos"""
+    labels = {}
+    places: Dict[str, List[AwsRegion]] = {}
+    areas: Dict[str, List[AwsRegion]] = {}
+    for region in AWS_REGIONS:
+        labels[region.code] = region
+        for name in (region.name_pt, region.name_en):
+            labels[_normalize_label(name)] = region
+            place = _PARENTHESES_RE.search(name)
+            if place:
+                for index, key in ((places, place.group(1)), (areas, name[:place.start()])):
+                    entries = index.setdefault(_normalize_label(key), [])
+                    if region not in entries:
+                        entries.append(region)
+    # "Central" (Canadá e México) não identifica uma região sozinho
+    unique_places = {place: entries[0] for place, entries in places.items() if len(entries) == 1}
+    # Fora dos parênteses, ficam de fora as áreas contidas em outra ("Canadá" em "Oeste do Canadá") e os
+    # lugares que também são áreas ("AWS GovCloud (Leste dos EUA)" não é "Leste dos EUA")
+    names = {
+        area: entries[0] for area, entries in areas.items()
+        if len(entries) == 1 and not any(area != other and area in other for other in areas)
+    }
+    names.update({place: region for place, region in unique_places.items() if place.replace('-', ' ') not in areas})
+    return labels, unique_places, names
+
+REGIONS_BY_CODE = {region.code: region for region in AWS_REGIONS}
+_LABEL_INDEX, _PLACE_INDEX, _NAME_INDEX = _build_indexes()
+# Nomes do _NAME_INDEX como palavras inteiras, os mais longos primeiro
+_NAME_RE = re.compile(r'(?<!\w)(?:' + '|'.join(re.escape(name) for name in sorted(_NAME_INDEX, key=len, reverse=True)) + r')(?!\w)')
+
+@lru_cache(maxsize=None)
+def resolve_region(label: str) -> Optional[AwsRegion]:
+    """Região do catálogo para um rótulo da coluna 'Região' (PT, EN ou código); None se desconhecida.
+    
+    Cada rótulo distinto é resolvido uma única vez; um rótulo desconhecido gera um aviso, porque
+    os seus itens recebem os descontos do grupo padrão.
+    """
+    if not isinstance(label, str):
+        return None
+    normalized = _normalize_label(label)
+    region = _LABEL_INDEX.get(normalized)
+    if region is not None:
+        return region
+    
+    # Rótulos com o código da região ou com variações fora dos parênteses ("US East (N. Virginia) - Local")
+    code = _REGION_CODE_RE.search(normalized)
+    if code and code.group() in REGIONS_BY_CODE:
+        return REGIONS_BY_CODE[code.group()]
+    place = _PARENTHESES_RE.search(normalized)
+    if place and place.group(1).strip() in _PLACE_INDEX:
+        return _PLACE_INDEX[place.group(1).strip()]
+    # Rótulos fora do formato da Calculadora ("Sao Paulo", "América do Sul - Local"): o nome do lugar ou da área
+    name = _NAME_RE.search(normalized)
+    if name:
+        return _NAME_INDEX[name.group()]
+    
+    if normalized:
+        warnings.warn(f"Região desconhecida: {label!r}; usando os descontos do grupo '{DEFAULT_REGION_GROUP}'", stacklevel=2)
+    return None
+
+def region_discount_group(label: str) -> str:
+    """Grupo de região da tabela de descontos; regiões fora do catálogo usam o grupo padrão"""
+    region = resolve_region(label)
+    return region.discount_group if region is not None else DEFAULT_REGION_GROUP
+
+def region_summary_name(label: str) -> str:
+    """Nome da região no resumo: o nome curto do catálogo, quando houver, ou o próprio rótulo"""
+    region = resolve_region(label)
+    return region.summary_name if region is not None and region.summary_name else label
+
+def region_code(label: str) -> Optional[str]:
+    """Código da região (ex.: 'sa-east-1'), ou None se o rótulo não está no catálogo"""
+    region = resolve_region(label)
+    return region.code if region is not None else None
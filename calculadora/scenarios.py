@@ -0,0 +1,103 @@
+"""Grade what-if de formas de pagamento, câmbios e impostos sobre os itens já normalizados"""
+from itertools import product
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .options import GLOBAL_PAYMENT_TYPES, PAYMENT_OPTIONS, PRICING_RULE_OPTIONS, pricing_options
+from .pricing import price_rule
+
+# Regras cujo valor All Upfront é mensal e entra ×12 no total anual (como no resumo)
+_MONTHLY_ALL_UPFRONT_RULES = ('Lambda', 'Fargate')
+
+def scenario_totals(parsed: Dict, price: Optional[Callable[[str, Optional[str]], Tuple[np.ndarray, np.ndarray]]] = None) -> pd.DataFrame:
+    """Totais em USD de todas as combinações de formas de pagamento, a partir dos itens já normalizados.
+    
+    Cada regra é precificada uma única vez por opção de pagamento; as combinações só somam os subtotais.
+    `price(rule, option)` permite trocar `price_rule` por uma versão em cache.
+    """
+    if price is None:
+        price = lambda rule, option: price_rule(parsed['line_items'], rule, option)
+    
+    # Subtotais (No Upfront mensal, All Upfront anual) de cada regra para cada opção que ela aceita
+    subtotals = {}
+    for rule, option_name in PRICING_RULE_OPTIONS.items():
+        choices = {None: [None], 'global_payment_type': GLOBAL_PAYMENT_TYPES}.get(option_name, PAYMENT_OPTIONS)
+        for option in choices:
+            payment_mode, cost = price(rule, option)
+            no_upfront = cost[payment_mode == 'No Upfront'].sum()
+            all_upfront = cost[(payment_mode == 'All Upfront') | (payment_mode == 'Heavy Utilization')].sum()
+            if rule in _MONTHLY_ALL_UPFRONT_RULES:
+                all_upfront *= 12
+            subtotals[rule, option] = (no_upfront, all_upfront)
+    
+    rows = []
+    for global_payment_type, lambda_payment_option, fargate_payment_option in product(GLOBAL_PAYMENT_TYPES, PAYMENT_OPTIONS, PAYMENT_OPTIONS):
+        options = pricing_options(lambda_payment_option, fargate_payment_option, global_payment_type)
+        no_upfront_monthly = sum(subtotals[rule, option][0] for rule, option in options.items())
+        all_upfront = sum(subtotals[rule, option][1] for rule, option in options.items())
+        rows.append({
+            'global_payment_type': global_payment_type,
+            'lambda_payment_option': lambda_payment_option,
+            'fargate_payment_option': fargate_payment_option,
+            'on_demand_anual': parsed['on_demand_total'],
+            'no_upfront_anual': no_upfront_monthly * 12,
+            'all_upfront_anual': all_upfront
+        })
+    return pd.DataFrame(rows)
+
+def scenario_matrix(parsed: Dict, exchange_rates: List[float], tax_rates: List[float], price: Optional[Callable[[str, Optional[str]], Tuple[np.ndarray, np.ndarray]]] = None) -> pd.DataFrame:
+    """Grade what-if: cada combinação de formas de pagamento × câmbio × imposto, com totais em USD e BRL,
+    economia sobre o On Demand e a parcela 6x da TdSynnex, calculados de uma vez sobre a grade inteira"""
+    totals = scenario_totals(parsed, price)
+    
+    # Produto cartesiano: combinações (mais lentas) × câmbios × impostos (mais rápidos)
+    grid = totals.loc[totals.index.repeat(len(exchange_rates) * len(tax_rates))].reset_index(drop=True)
+    grid['exchange_rate'] = np.tile(np.repeat(np.asarray(exchange_rates, dtype=float), len(tax_rates)), len(totals))
+    grid['tax_rate'] = np.tile(np.asarray(tax_rates, dtype=float), len(totals) * len(exchange_rates))
+    
+    # Mesmas fórmulas do resumo financeiro do generate_summary
+    tax_factor = 1 + grid['tax_rate'] / 100
+    no_upfront = grid['no_upfront_anual']
+    all_upfront = grid['all_upfront_anual']
+    grid['no_upfront_anual_brl'] = no_upfront * tax_factor * grid['exchange_rate']
+    grid['no_upfront_mensal_brl'] = grid['no_upfront_anual_brl'] / 12
+    grid['all_upfront_anual_brl'] = all_upfront * tax_factor * grid['exchange_rate']
+    grid['parcela_tdsynnex_brl'] = grid['all_upfront_anual_brl'] / 6
+    grid['total_anual'] = no_upfront + all_upfront
+    grid['total_anual_brl'] = grid['no_upfront_anual_brl'] + grid['all_upfront_anual_brl']
+    
+    # Economia sobre o On Demand (sem On Demand no arquivo, fica vazia)
+    on_demand = grid['on_demand_anual'].where(grid['on_demand_anual'] > 0)
+    grid['economia_no_upfront'] = (on_demand - no_upfront) / on_demand * 100
+    grid['economia_all_upfront'] = (on_demand - all_upfront) / on_demand * 100
+    grid['economia_total'] = (on_demand - grid['total_anual']) / on_demand * 100
+    return grid
+
+def parse_rate_list(text: str) -> List[float]:
+    """Lista de taxas separadas por ponto e vírgula; aceita vírgula decimal (ex.: "5,20; 5,50")"""
+    values = [value.strip().replace(',', '.') for value in text.split(';')]
+    try:
+        return [float(value) for value in values if value]
+    except ValueError:
+        raise ValueError(f"Lista de valores inválida: {text!r} (separe os valores por ponto e vírgula)") from None
+
+# Colunas da grade de cenários e os rótulos exibidos no app
+SCENARIO_COLUMN_LABELS = {
+    'global_payment_type': 'EC2/RDS/ElastiCache',
+    'lambda_payment_option': 'Lambda',
+    'fargate_payment_option': 'Fargate',
+    'exchange_rate': 'Câmbio',
+    'tax_rate': 'Imposto (%)',
+    'no_upfront_anual': 'No Upfront anual (USD)',
+    'no_upfront_mensal_brl': 'No Upfront 12x (BRL c/ imposto)',
+    'all_upfront_anual': 'All Upfront anual (USD)',
+    'all_upfront_anual_brl': 'All Upfront anual (BRL c/ imposto)',
+    'parcela_tdsynnex_brl': 'Parcela 06x TdSynnex (BRL)',
+    'total_anual': 'Total anual (USD)',
+    'total_anual_brl': 'Total anual (BRL c/ imposto)',
+    'economia_no_upfront': 'Economia No Upfront (%)',
+    'economia_all_upfront': 'Economia All Upfront (%)',
+    'economia_total': 'Economia total (%)'
+}
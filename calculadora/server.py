@@ -0,0 +1,138 @@
+"""Serviço HTTP local (sem Streamlit): o CSV vai no corpo do POST e as opções na query string"""
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .batch import scenario_records, summarize_export
+from .options import (
+    DEFAULT_EXCHANGE_RATE, DEFAULT_TAX_RATE, GLOBAL_PAYMENT_TYPES, PAYMENT_OPTIONS,
+    SERVER_DEFAULT_HOST, SERVER_DEFAULT_PORT, SERVER_MAX_UPLOAD_MB
+)
+
+def _query_float(query: Dict[str, List[str]], name: str, default: float) -> float:
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        return float(values[-1])
+    except ValueError:
+        raise ValueError(f"Parâmetro '{name}' inválido: {values[-1]!r}") from None
+
+def _query_floats(query: Dict[str, List[str]], name: str, default: float) -> List[float]:
+    """Lista de números: parâmetro repetido ou separado por vírgula (?exchange_rate=5.2,5.5)"""
+    raw = [item for value in query.get(name, []) for item in value.split(',') if item.strip()]
+    if not raw:
+        return [default]
+    try:
+        return [float(item) for item in raw]
+    except ValueError:
+        raise ValueError(f"Parâmetro '{name}' inválido: {','.join(raw)!r}") from None
+
+def _query_choice(query: Dict[str, List[str]], name: str, choices: List[str]) -> str:
+    values = query.get(name)
+    if not values:
+        return choices[0]
+    if values[-1] not in choices:
+        raise ValueError(f"Parâmetro '{name}' inválido: {values[-1]!r} (opções: {', '.join(choices)})")
+    return values[-1]
+
+def summary_request_options(query: Dict[str, List[str]]) -> Dict:
+    """Opções de /summary a partir da query string, com os mesmos nomes e padrões da linha de comando"""
+    return {
+        'exchange_rate': _query_float(query, 'exchange_rate', DEFAULT_EXCHANGE_RATE),
+        'tax_rate': _query_float(query, 'tax_rate', DEFAULT_TAX_RATE),
+        'lambda_payment_option': _query_choice(query, 'lambda_payment', PAYMENT_OPTIONS),
+        'fargate_payment_option': _query_choice(query, 'fargate_payment', PAYMENT_OPTIONS),
+        'global_payment_type': _query_choice(query, 'payment_type', GLOBAL_PAYMENT_TYPES)
+    }
+
+class SummaryRequestHandler(BaseHTTPRequestHandler):
+    """Endpoints do serviço:
+    
+    - GET  /health                      -> {"status": "ok"}
+    - POST /summary?exchange_rate=...   -> resumo em texto e totais (corpo: bytes do CSV)
+    - POST /scenarios?exchange_rate=5.2,5.5&tax_rate=13.83 -> grade de cenários
+    
+    O processamento roda no pool de processos do servidor; esta thread só espera o resultado.
+    """
+    server_version = "CalculadoraAWS/1.0"
+    
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _read_body(self) -> Optional[bytes]:
+        """Corpo da requisição; responde 411/413 e devolve None quando não pode ser lido"""
+        length = self.headers.get('Content-Length', '')
+        if not length.isdigit():
+            self._send_json(411, {'erro': "Cabeçalho Content-Length obrigatório"})
+            return None
+        length = int(length)
+        if length > self.server.max_upload_bytes:
+            self._send_json(413, {'erro': f"Arquivo maior que o limite de {self.server.max_upload_bytes // (1024 * 1024)} MB"})
+            return None
+        return self.rfile.read(length)
+    
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'erro': "Endpoint não encontrado"})
+    
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path not in ('/summary', '/scenarios'):
+            self._send_json(404, {'erro': "Endpoint não encontrado"})
+            return
+        
+        file_bytes = self._read_body()
+        if file_bytes is None:
+            return
+        
+        query = parse_qs(url.query)
+        try:
+            if url.path == '/summary':
+                future = self.server.executor.submit(summarize_export, file_bytes, **summary_request_options(query))
+            else:
+                future = self.server.executor.submit(
+                    scenario_records, file_bytes,
+                    _query_floats(query, 'exchange_rate', DEFAULT_EXCHANGE_RATE),
+                    _query_floats(query, 'tax_rate', DEFAULT_TAX_RATE)
+                )
+            result = future.result()
+        except ValueError as e:
+            # Opções inválidas, CSV sem a seção de detalhes ou sem as colunas obrigatórias
+            self._send_json(400, {'erro': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'erro': f"Erro ao processar arquivo: {e}"})
+            return
+        
+        self._send_json(200, result)
+
+def make_server(host: str = SERVER_DEFAULT_HOST, port: int = SERVER_DEFAULT_PORT, workers: Optional[int] = None, max_upload_mb: int = SERVER_MAX_UPLOAD_MB, executor=None) -> ThreadingHTTPServer:
+    """Cria o servidor HTTP com um pool limitado de processos (porta 0 escolhe uma porta livre; `executor` permite injetar outro pool)"""
+    server = ThreadingHTTPServer((host, port), SummaryRequestHandler)
+    server.executor = executor or ProcessPoolExecutor(max_workers=workers)
+    server.max_upload_bytes = max_upload_mb * 1024 * 1024
+    return server
+
+def serve(host: str = SERVER_DEFAULT_HOST, port: int = SERVER_DEFAULT_PORT, workers: Optional[int] = None, max_upload_mb: int = SERVER_MAX_UPLOAD_MB) -> int:
+    """Atende requisições até Ctrl+C"""
+    server = make_server(host, port, workers, max_upload_mb)
+    print(f"Servindo em http://{server.server_address[0]}:{server.server_address[1]} (Ctrl+C para encerrar)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.executor.shutdown()
+    return 0
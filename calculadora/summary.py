@@ -0,0 +1,214 @@
+"""Agregação dos itens por região e serviço e geração do resumo em texto"""
+from typing import Callable, Dict, Optional
+
+from .performance import timed_stage
+from .regions import region_summary_name
+
+# Ordem dos serviços no resumo e, para os serviços com instâncias reservadas, o título da seção,
+# a unidade da quantidade, quantas posições de 'specs' são lidas e a chave de agrupamento
+SUMMARY_SERVICE_ORDER = ['EC2', 'RDS', 'ElastiCache', 'CloudFront', 'Lambda', 'Fargate']
+_SUMMARY_INSTANCE_SECTIONS = {
+    # tipo (pricing strategy, sistema operacional)
+    'EC2': ("EC2 Instances", "instâncias", 2, lambda tipo, specs: f"{tipo} ({specs[0]}, {specs[1]})"),
+    # tipo (AZ, período, engine)
+    'RDS': ("RDS", "instâncias", 4, lambda tipo, specs: f"{tipo} ({specs[0]}, {specs[2]}, {specs[3]})"),
+    # tipo (período, mecanismo de cache)
+    'ElastiCache': ("ElastiCache", "nós", 3, lambda tipo, specs: f"{tipo} ({specs[1]}, {specs[2]})"),
+}
+
+@timed_stage('aggregate_services')
+def aggregate_services(data: Dict) -> Dict:
+    """Percorre os serviços processados uma única vez: totais por região, serviço e forma de pagamento,
+    quantidades, agrupamento das instâncias e totais gerais (On Demand, No Upfront e All Upfront)"""
+    services_by_region = data['services_by_region']
+    aggregation = {
+        'regions': [],
+        'region_count': len(data['regions']),
+        'item_count': 0,
+        'on_demand_annual': data.get('on_demand_total', 0),
+        'no_upfront_monthly': 0,
+        'no_upfront_annual': 0,
+        'all_upfront': 0
+    }
+    
+    # Totais por tipo de pagamento
+    total_no_upfront = 0
+    total_all_upfront = 0
+    
+    # Processar por região
+    for region in sorted(data['regions']):
+        if region not in services_by_region:
+            continue
+        
+        services = services_by_region[region]
+        region_entry = {
+            'region': region,
+            'region_name': region_summary_name(region),
+            'services': [],
+            'no_upfront_monthly': 0,
+            'all_upfront': 0
+        }
+        
+        # Processar cada serviço
+        for service_type in SUMMARY_SERVICE_ORDER:
+            instances = services.get(service_type)
+            if not instances:
+                continue
+            
+            section = _SUMMARY_INSTANCE_SECTIONS.get(service_type)
+            if section:
+                _, _, specs_needed, group_key = section
+            
+            # Uma única passada: custos por tipo de pagamento, quantidade total e agrupamento por chave
+            no_upfront_cost = 0
+            all_upfront_cost = 0
+            total_quantity = 0
+            no_upfront_grouped = {}
+            all_upfront_grouped = {}
+            
+            for instance in instances:
+                payment_mode = instance['payment_mode']
+                quantity = instance['quantidade']
+                total_quantity += quantity
+                
+                if payment_mode == 'No Upfront':
+                    no_upfront_cost += instance['cost']
+                elif payment_mode == 'All Upfront' or payment_mode == 'Heavy Utilization':
+                    all_upfront_cost += instance['cost']
+                
+                if section:
+                    specs = instance['specs']
+                    if len(specs) < specs_needed:
+                        specs = list(specs) + ['N/A'] * (specs_needed - len(specs))
+                    key = group_key(instance['tipo'], specs)
+                    grouped = no_upfront_grouped if payment_mode == 'No Upfront' else all_upfront_grouped
+                    grouped[key] = grouped.get(key, 0) + quantity
+            
+            # Para Lambda e Fargate All Upfront, o valor é mensal: multiplicar por 12 no total anual
+            all_upfront_annual = all_upfront_cost * 12 if service_type in ('Lambda', 'Fargate') else all_upfront_cost
+            
+            region_entry['services'].append({
+                'service_type': service_type,
+                'item_count': len(instances),
+                'total_quantity': total_quantity,
+                'no_upfront_cost': no_upfront_cost,
+                'all_upfront_cost': all_upfront_cost,
+                'all_upfront_annual': all_upfront_annual,
+                'no_upfront_grouped': no_upfront_grouped,
+                'all_upfront_grouped': all_upfront_grouped
+            })
+            region_entry['no_upfront_monthly'] += no_upfront_cost
+            region_entry['all_upfront'] += all_upfront_annual
+            aggregation['item_count'] += len(instances)
+            
+            # Somar aos totais gerais
+            total_no_upfront += no_upfront_cost
+            total_all_upfront += all_upfront_annual
+        
+        aggregation['regions'].append(region_entry)
+    
+    aggregation['no_upfront_monthly'] = total_no_upfront
+    aggregation['no_upfront_annual'] = total_no_upfront * 12
+    aggregation['all_upfront'] = total_all_upfront
+    return aggregation
+
+def _write_financial_summary(write: Callable[[str], None], total_all_upfront: float, total_no_upfront: float, exchange_rate: float, tax_rate: float) -> None:
+    """Resumo financeiro All Upfront (anual) e No Upfront (total mensal) com impostos e conversão para BRL"""
+    if total_all_upfront > 0:
+        all_upfront_taxes = total_all_upfront * (tax_rate / 100)
+        all_upfront_with_taxes = total_all_upfront + all_upfront_taxes
+        all_upfront_brl = all_upfront_with_taxes * exchange_rate
+        all_upfront_parcela = all_upfront_brl / 6
+        
+        write("Resumo financeiro All Upfront:\n")
+        write(f"Valor total (sem imposto): USD {total_all_upfront:,.2f}/ano\n")
+        write(f"Impostos: USD {all_upfront_taxes:,.2f}/ano\n")
+        write(f"Valor do dólar (aproximado): R$ {exchange_rate:.2f}\n")
+        write(f"Valor total em reais (com imposto): R$ {all_upfront_brl:,.2f}/ano\n")
+        write(f"Parcelamento TdSynnex(com imposto): 06x R$ {all_upfront_parcela:,.2f} via TdSynnex\n\n")
+    
+    if total_no_upfront > 0:
+        no_upfront_annual = total_no_upfront * 12
+        no_upfront_taxes = no_upfront_annual * (tax_rate / 100)
+        no_upfront_with_taxes = no_upfront_annual + no_upfront_taxes
+        no_upfront_brl_monthly = no_upfront_with_taxes * exchange_rate / 12
+        
+        write("Resumo financeiro No Upfront:\n")
+        write(f"Valor total (sem imposto): USD {no_upfront_annual:,.2f}/ano\n")
+        write(f"Impostos: USD {no_upfront_taxes:,.2f}/ano\n")
+        write(f"Valor do dólar (aproximado): R$ {exchange_rate:.2f}\n")
+        write(f"Valor total em reais (com imposto): 12x R$ {no_upfront_brl_monthly:,.2f} via AWS\n")
+
+@timed_stage('generate_summary')
+def generate_summary(data: Dict, exchange_rate: float, tax_rate: float = 13.83, lambda_payment_option: str = "No Upfront 12x pela AWS", fargate_payment_option: str = "No Upfront 12x pela AWS", aggregation: Optional[Dict] = None) -> str:
+    """Gera o resumo formatado baseado nos modelos"""
+    if aggregation is None:
+        aggregation = aggregate_services(data)
+    
+    client_name = data['client_name']
+    account_id = data['account_id']
+    
+    # As partes do texto são acumuladas em uma lista e unidas uma única vez no final
+    parts = [f"Resumos dos recursos a serem reservados\n{client_name} - {account_id}\n\n"]
+    write = parts.append
+    
+    for region_entry in aggregation['regions']:
+        region_name = region_entry['region_name']
+        write(f"{region_name}\n")
+        
+        for service in region_entry['services']:
+            service_type = service['service_type']
+            no_upfront_cost = service['no_upfront_cost']
+            all_upfront_cost = service['all_upfront_cost']
+            total_quantity = service['total_quantity']
+            
+            # Gerar seção do serviço
+            section = _SUMMARY_INSTANCE_SECTIONS.get(service_type)
+            if section:
+                title, unit, _, _ = section
+                write(f"{title} - {total_quantity:02d} {unit} - Conta AWS {account_id}\n")
+                write("Tipos de Instancias:\n")
+                
+                if service['no_upfront_grouped']:
+                    write("No Upfront:\n")
+                    write(''.join([f"-{total_qty} - {instance_key}\n" for instance_key, total_qty in service['no_upfront_grouped'].items()]))
+                
+                if service['all_upfront_grouped']:
+                    write("All Upfront:\n")
+                    write(''.join([f"-{total_qty} - {instance_key}\n" for instance_key, total_qty in service['all_upfront_grouped'].items()]))
+                
+                if no_upfront_cost > 0:
+                    write(f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n")
+                if all_upfront_cost > 0:
+                    write(f"Valor total All Upfront: USD {all_upfront_cost:,.2f}/ano\n")
+            
+            elif service_type == 'CloudFront':
+                write(f"CloudFront - Conta AWS {account_id}\n")
+                write("Período: 1 ano\n")
+                write("Forma de pagamento: No Upfront em 12x pela AWS\n")
+                write(f"Valor total mensal: USD {no_upfront_cost:,.2f} (sem impostos)\n")
+            
+            elif service_type == 'Lambda':
+                write(f"Lambda - Conta AWS {account_id}\n")
+                write(f"Forma de pagamento: {lambda_payment_option}\n")
+                if no_upfront_cost > 0:
+                    write(f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n")
+                if all_upfront_cost > 0:
+                    write(f"Valor total All Upfront: USD {service['all_upfront_annual']:,.2f}/ano\n")
+            
+            elif service_type == 'Fargate':
+                write(f"ECS fargate - {region_name} - Conta AWS {account_id}\n")
+                write("Período: 1 ano\n")
+                write(f"Forma de pagamento: {fargate_payment_option}\n")
+                write(f"Total de tarefas/pods: {total_quantity}\n")
+                
+                if no_upfront_cost > 0:
+                    write(f"Valor total No Upfront: USD {no_upfront_cost:,.2f}/mês\n")
+                if all_upfront_cost > 0:
+                    write(f"Valor total All Upfront: USD {service['all_upfront_annual']:,.2f}/ano\n")
+            
+            write("\n")
+    
+    _write_financial_summary(write, aggregation['all_upfront'], aggregation['no_upfront_monthly'], exchange_rate, tax_rate)
+    
+    return ''.join(parts)
@@ -0,0 +1,207 @@
+"""Pasta monitorada: processa as exportações novas ou alteradas em um pool de processos, com manifesto persistido"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from .batch import _compute_result, process_export
+from .options import WATCH_DEFAULT_INTERVAL, WATCH_SETTLE_SECONDS
+
+# Manifesto gravado na pasta monitorada: tamanho, mtime e hash de cada CSV já processado
+WATCH_MANIFEST_FILE = '.calculadora-manifest.json'
+WATCH_MANIFEST_VERSION = 1
+
+def file_sha256(path: str) -> str:
+    """SHA-256 do conteúdo, lido em blocos"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def process_watched_file(path: str, known_hash: Optional[str] = None, **options) -> Dict:
+    """Processa um CSV da pasta: resumo (.txt) e totais (.json) ao lado do arquivo.
+    
+    Roda no processo do pool; se o conteúdo tem o hash já registrado (só o mtime mudou), não processa de novo.
+    """
+    file_hash = file_sha256(path)
+    if file_hash == known_hash:
+        return {'arquivo': path, 'sha256': file_hash, 'inalterado': True}
+    
+    result = process_export(path, os.path.dirname(path) or '.', **options)
+    result['sha256'] = file_hash
+    result['totais'] = os.path.splitext(path)[0] + '.json'
+    with open(result['totais'], 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return result
+
+class WatchManifest:
+    """Estado persistido da pasta: um registro por CSV com tamanho, mtime, hash e o resultado.
+    
+    Um arquivo com o mesmo tamanho e mtime do registro não é lido de novo; gravado em um arquivo
+    temporário e publicado com `os.replace`, como o cache em disco.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('versao') == WATCH_MANIFEST_VERSION:
+                self.entries = manifest['arquivos']
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, AttributeError):
+            # Manifesto ilegível: começar do zero (os arquivos são comparados pelo hash)
+            print(f"Manifesto inválido ignorado: {path}", file=sys.stderr)
+    
+    def is_current(self, name: str, stat: os.stat_result) -> bool:
+        """O arquivo está como na última vez em que foi processado?"""
+        entry = self.entries.get(name)
+        return entry is not None and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size
+    
+    def known_hash(self, name: str) -> Optional[str]:
+        entry = self.entries.get(name)
+        return entry.get('sha256') if entry else None
+    
+    def record(self, name: str, stat: os.stat_result, result: Dict) -> None:
+        """Registra o resultado do processamento com o tamanho e o mtime vistos antes de processar"""
+        entry = self.entries.get(name, {}) if result.get('inalterado') else {}
+        entry.update({'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'processado_em': time.time()})
+        if 'erro' in result:
+            entry['erro'] = result['erro']
+        elif not result.get('inalterado'):
+            entry.update({
+                'sha256': result['sha256'],
+                'resumo': result['resumo'],
+                'totais': result['totais'],
+                'all_upfront_anual': result['all_upfront_anual'],
+                'no_upfront_anual': result['no_upfront_anual']
+            })
+        self.entries[name] = entry
+    
+    def forget(self, names: List[str]) -> None:
+        """Remove os registros de arquivos que saíram da pasta"""
+        for name in names:
+            self.entries.pop(name, None)
+    
+    def save(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'versao': WATCH_MANIFEST_VERSION, 'arquivos': self.entries}, f, ensure_ascii=False, indent=2)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            try:
+                os.remove(temporary_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+class FolderWatcher:
+    """Monitora uma pasta e processa cada CSV novo ou alterado em um pool de processos.
+    
+    A varredura usa apenas tamanho e mtime (sem ler os arquivos); o hash é calculado no pool,
+    junto com o processamento. Os arquivos são enviados ao pool sem esperar os anteriores, então
+    uma leva de centenas de arquivos se distribui pelos núcleos enquanto a varredura continua.
+    """
+    
+    def __init__(self, directory: str, workers: Optional[int] = None, interval: float = WATCH_DEFAULT_INTERVAL, settle_seconds: float = WATCH_SETTLE_SECONDS, manifest_path: Optional[str] = None, **options):
+        self.directory = directory
+        self.workers = workers
+        self.interval = interval
+        self.settle_seconds = settle_seconds
+        self.options = options
+        self.manifest = WatchManifest(manifest_path or os.path.join(directory, WATCH_MANIFEST_FILE))
+        # Arquivo -> (futuro, stat visto ao enviar)
+        self.pending: Dict[str, tuple] = {}
+        # CSVs vistos na última varredura que ainda estavam sendo gravados
+        self.settling = 0
+        self.processed = 0
+        self.failed = 0
+    
+    def scan(self) -> List[str]:
+        """CSVs novos ou alterados, já completos, que ainda não estão no pool; esquece os que saíram da pasta"""
+        now = time.time()
+        found = {}
+        with os.scandir(self.directory) as iterator:
+            for entry in iterator:
+                if entry.is_file() and entry.name.lower().endswith('.csv'):
+                    try:
+                        found[entry.name] = entry.stat()
+                    except FileNotFoundError:
+                        continue
+        
+        self.manifest.forget([name for name in self.manifest.entries if name not in found])
+        ready = []
+        self.settling = 0
+        for name, stat in sorted(found.items()):
+            if name in self.pending or self.manifest.is_current(name, stat):
+                continue
+            # Arquivo ainda sendo copiado: esperar a próxima varredura
+            if now - stat.st_mtime < self.settle_seconds:
+                self.settling += 1
+                continue
+            ready.append(name)
+        return ready
+    
+    def submit(self, executor: ProcessPoolExecutor, names: List[str]) -> None:
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            future = executor.submit(process_watched_file, path, self.manifest.known_hash(name), **self.options)
+            self.pending[name] = (future, stat)
+    
+    def collect(self, done: List[Future]) -> None:
+        """Registra no manifesto os arquivos terminados e grava o manifesto uma vez"""
+        finished = set(done)
+        for name, (future, stat) in list(self.pending.items()):
+            if future not in finished:
+                continue
+            del self.pending[name]
+            result = _compute_result(os.path.join(self.directory, name), future.result)
+            self.manifest.record(name, stat, result)
+            if 'erro' in result:
+                self.failed += 1
+            elif not result.get('inalterado'):
+                self.processed += 1
+        self.manifest.save()
+    
+    def run(self, once: bool = False) -> int:
+        """Laço principal: varre, envia os arquivos prontos ao pool e registra os que terminam.
+        
+        Com `once`, processa o que há na pasta e termina; sem ele, roda até ser interrompido (Ctrl+C).
+        Devolve o número de arquivos com erro.
+        """
+        print(f"Monitorando {os.path.abspath(self.directory)} (a cada {self.interval:g}s)", file=sys.stderr)
+        executor = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            while True:
+                self.submit(executor, self.scan())
+                if once and not self.pending and not self.settling:
+                    break
+                if not self.pending:
+                    time.sleep(self.interval if not once else min(self.interval, self.settle_seconds))
+                    continue
+                
+                # Esperar o próximo arquivo terminar ou o próximo intervalo de varredura
+                done, _ = wait([future for future, _ in self.pending.values()], timeout=self.interval, return_when=FIRST_COMPLETED)
+                if done:
+                    self.collect(list(done))
+        except KeyboardInterrupt:
+            print("Interrompido; arquivos em andamento serão processados de novo na próxima execução", file=sys.stderr)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.manifest.save()
+        
+        print(f"{self.processed} arquivo(s) processado(s), {self.failed} erro(s)", file=sys.stderr)
+        return self.failed
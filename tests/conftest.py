@@ -0,0 +1,28 @@
+"""Configuração dos testes: o pacote calculadora da raiz do repositório e as exportações de exemplo"""
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(TESTS_DIR, 'data')
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+def read_data(name: str) -> bytes:
+    with open(os.path.join(DATA_DIR, name), 'rb') as f:
+        return f.read()
+
+@pytest.fixture(params=['pt', 'en'])
+def language(request) -> str:
+    return request.param
+
+@pytest.fixture
+def export_bytes(language) -> bytes:
+    """Exportação de exemplo (os mesmos itens nos layouts PT e EN)"""
+    return read_data(f'export_{language}.csv')
+
+@pytest.fixture(params=['pyarrow', 'c'])
+def csv_engine(request) -> str:
+    if request.param == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    return request.param
@@ -0,0 +1,33 @@
+"""Leitura dos CSVs enviados ao Portfólio no pool de processos do lote"""
+import pytest
+
+from calculadora import content_hash, iter_parsed_uploads, parse_export
+from conftest import read_data
+
+@pytest.fixture
+def uploads():
+    export_pt = read_data('export_pt.csv')
+    first_row = export_pt.index(b'ACME Ltda')
+    files = {
+        'export_pt.csv': export_pt,
+        'export_en.csv': read_data('export_en.csv'),
+        # Aspa sem fechamento antes da primeira linha de dados
+        'malformado.csv': export_pt[:first_row] + b'X,"aspas sem fechamento,\n' + export_pt[first_row:],
+    }
+    return {content_hash(file_bytes): (name, file_bytes) for name, file_bytes in files.items()}
+
+@pytest.mark.parametrize('cache', ['sem-cache', 'com-cache'])
+@pytest.mark.parametrize('workers', [1, 2])
+def test_iter_parsed_uploads(uploads, workers, cache, tmp_path, monkeypatch):
+    monkeypatch.setenv('CALCULADORA_CACHE_DIR', str(tmp_path))
+    monkeypatch.setenv('CALCULADORA_CACHE_MB', '0' if cache == 'sem-cache' else '16')
+    
+    results = {file_hash: (name, parsed) for file_hash, name, parsed in iter_parsed_uploads(uploads, workers)}
+    assert {file_hash: name for file_hash, (name, _) in results.items()} == {file_hash: name for file_hash, (name, _) in uploads.items()}
+    for file_hash, (name, parsed) in results.items():
+        if name == 'malformado.csv':
+            assert parsed['arquivo'].startswith('malformado.csv [') and parsed['erro']
+        else:
+            expected = parse_export(uploads[file_hash][1])
+            assert parsed['line_items'].equals(expected['line_items'])
+            assert parsed['regions'] == expected['regions']
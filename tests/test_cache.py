@@ -0,0 +1,50 @@
+"""Cache em disco dos itens normalizados: leitura, impressão do catálogo e da tabela de descontos"""
+import pandas as pd
+import pytest
+
+from calculadora import ParsedExportCache, content_hash, parse_export
+
+pytest.importorskip('pyarrow')
+
+def _parsed_equal(cached, parsed):
+    assert {key: cached[key] for key in ('client_name', 'account_id', 'regions', 'on_demand_total')} == \
+        {key: parsed[key] for key in ('client_name', 'account_id', 'regions', 'on_demand_total')}
+    pd.testing.assert_frame_equal(cached['line_items'], parsed['line_items'], check_dtype=False)
+
+def test_round_trip(export_bytes, tmp_path):
+    cache = ParsedExportCache(str(tmp_path), 64 * 1024 * 1024)
+    parsed = cache.parse_export(export_bytes)
+    assert (cache.hits, cache.misses) == (0, 1)
+    
+    cached = cache.parse_export(export_bytes)
+    assert (cache.hits, cache.misses) == (1, 1)
+    _parsed_equal(cached, parsed)
+    _parsed_equal(cached, parse_export(export_bytes))
+
+def test_entry_with_another_fingerprint_is_discarded(export_bytes, tmp_path):
+    file_hash = content_hash(export_bytes)
+    ParsedExportCache(str(tmp_path), 64 * 1024 * 1024, fingerprint='tabela-antiga').parse_export(export_bytes)
+    
+    cache = ParsedExportCache(str(tmp_path), 64 * 1024 * 1024)
+    assert file_hash in cache
+    assert cache.get(file_hash) is None
+    assert file_hash not in cache
+    
+    cache.parse_export(export_bytes)
+    assert cache.get(file_hash) is not None
+
+def test_fingerprint_follows_the_discount_table(tmp_path, monkeypatch):
+    from calculadora import cache, discounts
+    
+    original = cache.parse_fingerprint()
+    table = tmp_path / 'descontos.csv'
+    with open(discounts.DISCOUNT_RULES_PATH, 'rb') as f:
+        table.write_bytes(f.read().replace(b'0.70', b'0.65'))
+    monkeypatch.setattr(discounts, 'DISCOUNT_RULES_PATH', str(table))
+    cache.parse_fingerprint.cache_clear()
+    try:
+        assert cache.parse_fingerprint() != original
+    finally:
+        monkeypatch.undo()
+        cache.parse_fingerprint.cache_clear()
+    assert cache.parse_fingerprint() == original
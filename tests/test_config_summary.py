@@ -0,0 +1,104 @@
+"""Leitura do "Resumo da configuração": tokenize_config e os detalhes de cada serviço"""
+import pytest
+
+from calculadora import extract_instance_details, tokenize_config
+
+def test_empty_text():
+    record = tokenize_config("")
+    assert record['instance_types'] == [] and record['nodes'] == []
+    assert record['ec2_instance'] is None and record['instance_count'] is None and record['tasks_fallback'] is None
+    assert not any(record[flag] for flag in ('multi_az', 'on_demand', 'no_upfront', 'all_upfront', 'three_year', 'arm'))
+
+def test_empty_records_are_independent():
+    tokenize_config("Nós (2), Tipo de instância (cache.t3.medium)")
+    assert tokenize_config("")['nodes'] == []
+
+@pytest.mark.parametrize('text', [
+    "Sistema operacional (Linux), Carga de trabalho (Consistent, Número de instâncias: 3), Instância do EC2 avançada (m5.large)",
+    "Operating system (Linux), Workload (Consistent, Number of instances: 3), Advance EC2 instance (m5.large)",
+])
+def test_portuguese_and_english_labels(text):
+    record = tokenize_config(text)
+    assert (record['operating_system'], record['instance_count'], record['ec2_instance']) == ('Linux', 3, 'm5.large')
+
+def test_first_occurrence_wins_for_single_fields():
+    record = tokenize_config("Número de instâncias: 2, Número de instâncias: 5, Sistema operacional (Linux), Operating system (Windows)")
+    assert record['instance_count'] == 2
+    assert record['operating_system'] == 'Linux'
+
+def test_list_fields_keep_every_occurrence_in_order():
+    record = tokenize_config("Nós (0), Tipo de instância (cache.r6gd.12xlarge), Nodes (3), Instance type (cache.m6g.large)")
+    assert record['nodes'] == [0, 3]
+    assert record['instance_types'] == ['cache.r6gd.12xlarge', 'cache.m6g.large']
+
+def test_flags_inside_labelled_values():
+    # "No Upfront" dentro de "Pricing strategy (...)" continua marcando a opção
+    record = tokenize_config("Pricing strategy (EC2 Instance Savings Plans 1yr No Upfront)")
+    assert record['pricing_strategy'] == 'EC2 Instance Savings Plans 1yr No Upfront'
+    assert record['no_upfront'] and not record['all_upfront']
+
+@pytest.mark.parametrize('text, expected', [
+    ("Prazo (3 Year)", True),
+    ("Term (3 year)", True),
+    ("Term (3-YEAR)", True),
+    ("Term (1 year)", False),
+    ("Prazo (13 years)", True),
+])
+def test_three_year_term(text, expected):
+    assert tokenize_config(text)['three_year'] is expected
+
+@pytest.mark.parametrize('text, expected', [
+    ("Opção de implantação (Multi-AZ)", True),
+    ("Deployment option (multi-AZ)", True),
+    ("Opção de implantação (Single-AZ)", False),
+])
+def test_multi_az(text, expected):
+    assert tokenize_config(text)['multi_az'] is expected
+
+@pytest.mark.parametrize('text, tasks, fallback', [
+    ("Número de tarefas ou pods (12 por dia)", 12, 12),
+    ("Number of tasks or pods (7 per day)", 7, None),
+    # Sem o rótulo: o primeiro "N por dia" do texto
+    ("Execuções (25 por dia), Solicitações (40 por dia)", None, 25),
+    ("Execuções (muitas por dia)", None, None),
+    ("25 por dia", None, 25),
+])
+def test_tasks_and_fallback(text, tasks, fallback):
+    record = tokenize_config(text)
+    assert (record['tasks'], record['tasks_fallback']) == (tasks, fallback)
+
+def test_unterminated_label_is_ignored():
+    record = tokenize_config("Tipo de instância (db.t3.medium")
+    assert record['instance_types'] == []
+
+def test_ec2_details():
+    details = extract_instance_details("Sistema operacional (Linux), Número de instâncias: 2, Instância do EC2 avançada (m5.large), Pricing strategy (OnDemand)", "Amazon EC2")
+    assert details == {'quantidade': 2, 'tipo': 'm5.large', 'specs': ['OnDemand', 'Linux']}
+
+def test_ec2_details_defaults():
+    assert extract_instance_details("", "Amazon EC2") == {'quantidade': 1, 'tipo': 'N/A', 'specs': ['N/A', 'N/A']}
+
+def test_rds_details():
+    details = extract_instance_details("Nós (2), Tipo de instância (db.r6g.large), Opção de implantação (Multi-AZ), Prazo (3 Year), Opção de compra (No Upfront)", "Amazon Aurora MySQL-Compatible")
+    assert details == {'quantidade': 2, 'tipo': 'db.r6g.large', 'specs': ['Multi AZ', 'No Upfront', '3 anos', 'Amazon Aurora MySQL-Compatible']}
+
+@pytest.mark.parametrize('text, expected', [
+    ("Opção de compra (OnDemand), Opção de compra (Heavy Utilization)", 'On Demand'),
+    ("Opção de compra (Heavy Utilization)", 'Heavy Utilization'),
+    ("Opção de compra (No Upfront), Opção de compra (All Upfront)", 'No Upfront'),
+    ("Opção de compra (All Upfront)", 'All Upfront'),
+    ("", 'Reserved Instance'),
+])
+def test_elasticache_purchase_option(text, expected):
+    assert extract_instance_details(text, "Amazon ElastiCache")['specs'][0] == expected
+
+def test_elasticache_skips_empty_and_placeholder_nodes():
+    text = "Nós (0), Tipo de instância (cache.t3.medium), Nós (4), Tipo de instância (cache.r6gd.12xlarge), Nós (2), Tipo de instância (cache.m6g.large), Mecanismo de cache (Memcached)"
+    assert extract_instance_details(text, "Amazon ElastiCache") == {'quantidade': 2, 'tipo': 'cache.m6g.large', 'specs': ['Reserved Instance', '1 ano', 'Memcached']}
+
+def test_fargate_details():
+    assert extract_instance_details("Arquitetura da CPU (ARM), Número de tarefas ou pods (4 por dia)", "AWS Fargate") == {'quantidade': 4, 'tipo': 'N/A', 'specs': ['ARM64']}
+    assert extract_instance_details("Execuções (9 por dia)", "AWS Fargate") == {'quantidade': 9, 'tipo': 'N/A', 'specs': ['X86_64']}
+
+def test_other_services_are_not_tokenized():
+    assert extract_instance_details("Nós (3), Tipo de instância (x)", "Amazon S3") == {'quantidade': 1, 'tipo': 'N/A', 'specs': []}
@@ -0,0 +1,66 @@
+"""Tabela de descontos: um caso por linha de descontos.csv, aplicado pelo process_csv"""
+import pandas as pd
+import pytest
+
+from calculadora import load_discount_rules, process_csv
+
+SAO_PAULO = 'América do Sul (São Paulo)'
+OHIO = 'Leste dos EUA (Ohio)'
+NO_UPFRONT = "No Upfront 12x pela AWS"
+ALL_UPFRONT = "All Upfront 06x pela TdSynnex"
+FARGATE_ARM = "Arquitetura da CPU (ARM), Número de tarefas ou pods (4 por dia)"
+FARGATE_X86 = "Arquitetura da CPU (x86), Número de tarefas ou pods (4 por dia)"
+RDS_20GB = "Quantidade de armazenamento (20 GB), Nós (1), Tipo de instância (db.t3.medium)"
+RDS_100GB = "Quantidade de armazenamento (100 GB), Nós (1), Tipo de instância (db.t3.medium)"
+
+# (linha da tabela, serviço, região, resumo da configuração, adiantado, mensal, opções de process_csv, forma de pagamento, custo)
+DISCOUNT_CASES = [
+    (('CloudFront', '*', 'No Upfront', '*'), "Amazon CloudFront", OHIO, "", 0, 45.0, {}, 'No Upfront', 31.5),
+    (('Lambda', 'sao-paulo', 'All Upfront', '*'), "AWS Lambda", SAO_PAULO, "", 480.0, 40.0, {'lambda_payment_option': ALL_UPFRONT}, 'All Upfront', 408.0),
+    (('Lambda', 'sao-paulo', 'No Upfront', '*'), "AWS Lambda", SAO_PAULO, "", 480.0, 40.0, {'lambda_payment_option': NO_UPFRONT}, 'No Upfront', 36.0),
+    (('Lambda', 'demais', 'All Upfront', '*'), "AWS Lambda", OHIO, "", 0, 50.0, {'lambda_payment_option': ALL_UPFRONT}, 'All Upfront', 41.5),
+    (('Lambda', 'demais', 'No Upfront', '*'), "AWS Lambda", OHIO, "", 480.0, 50.0, {'lambda_payment_option': NO_UPFRONT}, 'No Upfront', 44.0),
+    (('Fargate', 'sao-paulo', 'All Upfront', 'ARM64'), "AWS Fargate", SAO_PAULO, FARGATE_ARM, 0, 200.0, {'fargate_payment_option': ALL_UPFRONT}, 'All Upfront', 148.0),
+    (('Fargate', 'sao-paulo', 'All Upfront', 'X86_64'), "AWS Fargate", SAO_PAULO, FARGATE_X86, 0, 200.0, {'fargate_payment_option': ALL_UPFRONT}, 'All Upfront', 156.0),
+    (('Fargate', 'sao-paulo', 'No Upfront', 'ARM64'), "AWS Fargate", SAO_PAULO, FARGATE_ARM, 0, 200.0, {'fargate_payment_option': NO_UPFRONT}, 'No Upfront', 158.0),
+    (('Fargate', 'sao-paulo', 'No Upfront', 'X86_64'), "AWS Fargate", SAO_PAULO, FARGATE_X86, 0, 200.0, {'fargate_payment_option': NO_UPFRONT}, 'No Upfront', 170.0),
+    (('Fargate', 'demais', 'All Upfront', '*'), "AWS Fargate", OHIO, FARGATE_ARM, 0, 300.0, {'fargate_payment_option': ALL_UPFRONT}, 'All Upfront', 219.0),
+    (('Fargate', 'demais', 'No Upfront', 'ARM64'), "AWS Fargate", OHIO, FARGATE_ARM, 0, 300.0, {'fargate_payment_option': NO_UPFRONT}, 'No Upfront', 237.0),
+    (('Fargate', 'demais', 'No Upfront', 'X86_64'), "AWS Fargate", OHIO, FARGATE_X86, 0, 300.0, {'fargate_payment_option': NO_UPFRONT}, 'No Upfront', 240.0),
+    (('RDS', 'sao-paulo', 'No Upfront', '*'), "Amazon RDS for MySQL", SAO_PAULO, RDS_20GB, 900.0, 80.0, {'global_payment_type': 'No Upfront'}, 'No Upfront', 75.62),
+    (('RDS', 'demais', 'No Upfront', '*'), "Amazon RDS for MySQL", OHIO, RDS_20GB, 900.0, 80.0, {'global_payment_type': 'No Upfront'}, 'No Upfront', 77.7),
+]
+
+def _price_one(service: str, region: str, config: str, upfront: float, monthly: float, **options):
+    """Forma de pagamento e custo de uma única linha da exportação"""
+    df = pd.DataFrame({
+        'Hierarquia de grupos': ["ACME Ltda - 123456789012 > Savings Plans"],
+        'Região': [region],
+        'Serviço': [service],
+        'Pagamento adiantado': [upfront],
+        'Mensal': [monthly],
+        'Resumo da configuração': [config]
+    })
+    [items] = process_csv(df, **options)['services_by_region'][region].values()
+    [item] = items
+    return item.payment_mode, item.cost
+
+def test_every_rule_has_a_case():
+    assert sorted(case[0] for case in DISCOUNT_CASES) == sorted(load_discount_rules())
+
+@pytest.mark.parametrize('rule, service, region, config, upfront, monthly, options, payment_mode, cost', DISCOUNT_CASES, ids=['-'.join(case[0]) for case in DISCOUNT_CASES])
+def test_discount_rule(rule, service, region, config, upfront, monthly, options, payment_mode, cost):
+    assert _price_one(service, region, config, upfront, monthly, **options) == (payment_mode, pytest.approx(cost))
+
+@pytest.mark.parametrize('region, config', [(SAO_PAULO, RDS_100GB), (OHIO, RDS_100GB)])
+def test_rds_credit_requires_20gb_storage(region, config):
+    assert _price_one("Amazon RDS for MySQL", region, config, 900.0, 80.0, global_payment_type='No Upfront') == ('No Upfront', pytest.approx(80.0))
+
+def test_rds_all_upfront_uses_upfront_without_credit():
+    assert _price_one("Amazon RDS for MySQL", SAO_PAULO, RDS_20GB, 900.0, 80.0, global_payment_type='All Upfront') == ('All Upfront', pytest.approx(900.0))
+
+def test_service_without_rule_keeps_base_cost():
+    # EC2 não tem linha na tabela: custo base da forma de pagamento global
+    config = "Número de instâncias: 2, Instância do EC2 avançada (m5.large)"
+    assert _price_one("Amazon EC2", SAO_PAULO, config, 1200.0, 100.0, global_payment_type='All Upfront') == ('All Upfront', pytest.approx(1200.0))
+    assert _price_one("Amazon EC2", SAO_PAULO, config, 1200.0, 100.0, global_payment_type='No Upfront') == ('No Upfront', pytest.approx(100.0))
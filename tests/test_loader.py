@@ -0,0 +1,99 @@
+"""Leitura da seção de detalhes: limites da seção e erros do leitor de CSV"""
+import io
+
+import pandas as pd
+import pytest
+
+from calculadora import REQUIRED_COLUMNS_PT, load_csv_file, summarize_export
+
+def _load(content: bytes, csv_engine: str) -> pd.DataFrame:
+    return load_csv_file(io.BytesIO(content), csv_engine)
+
+def _without_acknowledgement(export_bytes: bytes) -> bytes:
+    """Exportação cortada logo depois da última linha da tabela, sem a seção de confirmação"""
+    return export_bytes[:export_bytes.rindex(b'\n\n') + 1]
+
+def _acknowledgement_line(export_bytes: bytes) -> bytes:
+    return b'Acknowledgement' if b'Acknowledgement' in export_bytes else 'Confirmação'.encode('utf-8')
+
+def test_reads_only_the_detailed_section(export_bytes, csv_engine):
+    df = _load(export_bytes, csv_engine)
+    # Colunas sempre com os nomes em português; linhas da tabela, sem o preâmbulo e a confirmação
+    assert list(df.columns) == REQUIRED_COLUMNS_PT
+    assert len(df) == 12
+    assert df['Serviço'].iloc[0] == 'Amazon EC2'
+    assert df['Serviço'].iloc[-1] == 'Amazon Simple Storage Service (S3)'
+    assert df['Mensal'].sum() == pytest.approx(1260.0)
+
+@pytest.mark.parametrize('variant', [
+    'bom',
+    'crlf',
+    'bom_crlf',
+    'sem_confirmacao',
+    'sem_confirmacao_e_sem_quebra_final',
+    'confirmacao_sem_linha_em_branco',
+    'linha_em_branco_com_espacos',
+])
+def test_section_boundaries(export_bytes, csv_engine, variant):
+    expected = _load(export_bytes, csv_engine)
+    content = export_bytes
+    if variant in ('bom', 'bom_crlf'):
+        content = b'\xef\xbb\xbf' + content
+    if variant in ('crlf', 'bom_crlf'):
+        content = content.replace(b'\n', b'\r\n')
+    if variant == 'sem_confirmacao':
+        content = _without_acknowledgement(content)
+    if variant == 'sem_confirmacao_e_sem_quebra_final':
+        content = _without_acknowledgement(content).rstrip(b'\n')
+    if variant == 'confirmacao_sem_linha_em_branco':
+        marker = _acknowledgement_line(content)
+        content = content.replace(b'\n\n' + marker, b'\n' + marker)
+    if variant == 'linha_em_branco_com_espacos':
+        marker = _acknowledgement_line(content)
+        content = content.replace(b'\n\n' + marker, b'\n \t\n' + marker)
+    pd.testing.assert_frame_equal(_load(content, csv_engine), expected)
+
+def test_path_and_buffer_give_the_same_rows(export_bytes, csv_engine, tmp_path):
+    path = tmp_path / 'exportacao.csv'
+    path.write_bytes(export_bytes.replace(b'\n', b'\r\n'))
+    pd.testing.assert_frame_equal(load_csv_file(str(path), csv_engine), _load(export_bytes, csv_engine))
+
+@pytest.mark.parametrize('content', [b'', b'Resumo da estimativa\n1,2\n', b'Hierarquia de grupos,Regi\xc3\xa3o\n'])
+def test_missing_section(content, csv_engine, tmp_path):
+    with pytest.raises(ValueError, match='Estimativa detalhada'):
+        _load(content, csv_engine)
+    path = tmp_path / 'exportacao.csv'
+    path.write_bytes(content)
+    with pytest.raises(ValueError, match='Estimativa detalhada'):
+        load_csv_file(str(path), csv_engine)
+
+@pytest.fixture
+def malformed_bytes(export_bytes) -> bytes:
+    """Exportação com uma aspa sem fechamento antes da primeira linha de dados"""
+    first_row = export_bytes.index(b'ACME Ltda')
+    return export_bytes[:first_row] + b'X,"aspas sem fechamento,\n' + export_bytes[first_row:]
+
+def test_malformed_path_raises_parser_error(malformed_bytes, csv_engine, tmp_path):
+    path = tmp_path / 'exportacao.csv'
+    path.write_bytes(malformed_bytes)
+    with pytest.raises(ValueError) as raised:
+        load_csv_file(str(path), csv_engine)
+    if csv_engine == 'pyarrow':
+        assert isinstance(raised.value, pd.errors.ParserError)
+    # O mapeamento do arquivo foi liberado
+    path.unlink()
+
+def test_malformed_buffer_raises_parser_error(malformed_bytes, csv_engine):
+    source = io.BytesIO(malformed_bytes)
+    with pytest.raises(ValueError) as raised:
+        load_csv_file(source, csv_engine)
+    if csv_engine == 'pyarrow':
+        assert isinstance(raised.value, pd.errors.ParserError)
+    # Nenhuma visão do buffer ficou exportada
+    source.truncate(0)
+
+def test_malformed_bytes_raises_parser_error(malformed_bytes, csv_engine):
+    with pytest.raises(ValueError) as raised:
+        summarize_export(malformed_bytes, csv_engine=csv_engine)
+    if csv_engine == 'pyarrow':
+        assert isinstance(raised.value, pd.errors.ParserError)
@@ -0,0 +1,83 @@
+"""Processamento das exportações de exemplo: itens, formas de pagamento, custos e o resumo em texto"""
+import io
+
+import pytest
+
+from calculadora import calculate_on_demand_costs, generate_summary, load_csv_file, normalize_columns, process_csv
+from conftest import read_data
+
+SAO_PAULO = {'pt': 'América do Sul (São Paulo)', 'en': 'South America (Sao Paulo)'}
+VIRGINIA = {'pt': 'Leste dos EUA (N. da Virgínia)', 'en': 'US East (N. Virginia)'}
+OHIO = {'pt': 'Leste dos EUA (Ohio)', 'en': 'US East (Ohio)'}
+
+def _load(export_bytes: bytes):
+    return normalize_columns(load_csv_file(io.BytesIO(export_bytes)))
+
+def _items(data):
+    """(região, serviço) -> [(tipo, quantidade, specs, forma de pagamento, custo, adiantado)]"""
+    return {
+        (region, service_type): [(item.tipo, item.quantidade, item.specs, item.payment_mode, round(item.cost, 6), item.upfront) for item in items]
+        for region, services in data['services_by_region'].items()
+        for service_type, items in services.items()
+    }
+
+def test_process_csv_items(export_bytes, language):
+    data = process_csv(_load(export_bytes))
+    sao_paulo, virginia, ohio = SAO_PAULO[language], VIRGINIA[language], OHIO[language]
+    
+    assert data['client_name'] == 'ACME Ltda - Filial'
+    assert data['account_id'] == '123456789012'
+    assert data['regions'] == {sao_paulo, virginia, ohio}
+    # EC2 On-Demand e Lambda On Demand: (60 + 50) * 12
+    assert data['on_demand_total'] == pytest.approx(1320.0)
+    # Serviços na ordem da primeira linha de cada (região, serviço); EC2 On-Demand e S3 ficam de fora
+    assert _items(data) == {
+        (sao_paulo, 'EC2'): [('m5.large', 2, ('EC2 Instance Savings Plans 1yr No Upfront', 'Linux'), 'All Upfront', 1200.0, 1200.0)],
+        (sao_paulo, 'RDS'): [('db.t3.medium', 1, ('Multi AZ', 'No Upfront', '1 ano', 'Amazon RDS for PostgreSQL'), 'All Upfront', 900.0, 900.0)],
+        (sao_paulo, 'Lambda'): [('N/A', 1, (), 'No Upfront', 36.0, 0.0)],
+        (sao_paulo, 'Fargate'): [('N/A', 4, ('ARM64',), 'No Upfront', 158.0, 0.0)],
+        (ohio, 'RDS'): [('db.r6g.large', 2, ('Single AZ', 'All Upfront', '3 anos', 'Amazon Aurora MySQL-Compatible'), 'All Upfront', 1500.0, 1500.0)],
+        (ohio, 'ElastiCache'): [('cache.m6g.large', 3, ('All Upfront', '3 anos', 'Valkey'), 'All Upfront', 2000.0, 2000.0)],
+        (ohio, 'Fargate'): [('N/A', 10, ('X86_64',), 'No Upfront', 240.0, 0.0)],
+        (virginia, 'ElastiCache'): [('cache.t2.micro', 2, ('Heavy Utilization', '1 ano', 'Redis'), 'Heavy Utilization', 30.0, 300.0)],
+        (virginia, 'Lambda'): [('N/A', 1, (), 'No Upfront', 44.0, 480.0)],
+        (virginia, 'CloudFront'): [('N/A', 1, (), 'No Upfront', 31.5, 0.0)],
+    }
+    assert list(data['services_by_region'][sao_paulo]) == ['EC2', 'RDS', 'Lambda', 'Fargate']
+
+def test_process_csv_no_upfront(export_bytes, language):
+    data = process_csv(_load(export_bytes), "All Upfront 06x pela TdSynnex", "All Upfront 06x pela TdSynnex", "No Upfront")
+    items = _items(data)
+    sao_paulo, virginia, ohio = SAO_PAULO[language], VIRGINIA[language], OHIO[language]
+    
+    # EC2 e ElastiCache usam o valor mensal; RDS usa o mensal menos o crédito de 20 GB em São Paulo
+    # (o marcador do crédito é o texto em português do resumo da configuração)
+    assert items[sao_paulo, 'EC2'][0][3:5] == ('No Upfront', 100.0)
+    assert items[sao_paulo, 'RDS'][0][3:5] == ('No Upfront', 75.62 if language == 'pt' else 80.0)
+    assert items[ohio, 'RDS'][0][3:5] == ('No Upfront', 150.0)
+    assert items[virginia, 'ElastiCache'][0][3:5] == ('No Upfront', 30.0)
+    # Lambda e Fargate em All Upfront
+    assert items[sao_paulo, 'Lambda'][0][3:5] == ('All Upfront', 34.0)
+    assert items[virginia, 'Lambda'][0][3:5] == ('All Upfront', 398.4)
+    assert items[sao_paulo, 'Fargate'][0][3:5] == ('All Upfront', 148.0)
+    assert items[ohio, 'Fargate'][0][3:5] == ('All Upfront', 219.0)
+
+def test_process_csv_same_items_in_both_layouts():
+    pt = process_csv(_load(read_data('export_pt.csv')))
+    en = process_csv(_load(read_data('export_en.csv')))
+    assert [services for services in _items(pt).values()] == [services for services in _items(en).values()]
+
+def test_calculate_on_demand_costs(export_bytes):
+    assert calculate_on_demand_costs(_load(export_bytes)) == pytest.approx(1320.0)
+
+def test_generate_summary(export_bytes, language):
+    data = process_csv(_load(export_bytes))
+    expected = read_data(f'resumo_{language}.txt').decode('utf-8')
+    assert generate_summary(data, 5.5, 13.83) == expected
+
+def test_generate_summary_totals(export_bytes):
+    summary = generate_summary(process_csv(_load(export_bytes)), 5.5, 13.83)
+    # All Upfront: 1200 + 900 + 1500 + 2000 + 30; No Upfront: (36 + 158 + 44 + 31.5 + 240) * 12
+    assert "Valor total (sem imposto): USD 5,630.00/ano" in summary
+    assert "Valor total (sem imposto): USD 6,114.00/ano" in summary
+    assert "Valor total em reais (com imposto): R$ 35,247.46/ano" in summary
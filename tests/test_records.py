@@ -0,0 +1,41 @@
+"""Itens processados: dicionários prontos para JSON, pickle e colunas"""
+import io
+import json
+import pickle
+
+from calculadora import LINE_ITEM_COLUMNS, line_item_columns, load_csv_file, normalize_columns, process_csv, services_to_dict
+
+def _process(export_bytes: bytes):
+    return process_csv(normalize_columns(load_csv_file(io.BytesIO(export_bytes))))
+
+def test_services_to_dict_json_round_trip(export_bytes):
+    data = _process(export_bytes)
+    converted = services_to_dict(data)
+    
+    assert json.loads(json.dumps(converted)) == {
+        **converted,
+        'services_by_region': {
+            region: {service_type: [{**item, 'specs': list(item['specs'])} for item in items] for service_type, items in services.items()}
+            for region, services in converted['services_by_region'].items()
+        }
+    }
+    assert converted['regions'] == sorted(data['regions'])
+    # O resultado original não é alterado
+    assert isinstance(data['regions'], set)
+    
+    first_region = next(iter(data['services_by_region']))
+    first_service = next(iter(data['services_by_region'][first_region]))
+    item = data['services_by_region'][first_region][first_service][0]
+    assert converted['services_by_region'][first_region][first_service][0] == item.to_dict()
+
+def test_line_items_pickle(export_bytes):
+    data = _process(export_bytes)
+    restored = pickle.loads(pickle.dumps(data['services_by_region']))
+    assert restored == data['services_by_region']
+
+def test_line_item_columns(export_bytes):
+    data = _process(export_bytes)
+    columns = line_item_columns(data)
+    assert list(columns) == LINE_ITEM_COLUMNS
+    assert len(columns['cost']) == sum(len(items) for services in data['services_by_region'].values() for items in services.values()) == 10
+    assert columns['service_type'][:2] == ['EC2', 'RDS']
@@ -0,0 +1,68 @@
+"""Catálogo de regiões: rótulos da Calculadora, variações fora do formato e rótulos desconhecidos"""
+import warnings
+
+import pandas as pd
+import pytest
+
+from calculadora import AWS_REGIONS, process_csv, region_discount_group, region_summary_name, resolve_region
+
+@pytest.mark.parametrize('region', AWS_REGIONS, ids=lambda region: region.code)
+def test_catalog_labels(region):
+    for label in (region.name_pt, region.name_en, region.code, region.name_pt.upper()):
+        assert resolve_region(label) is region
+
+@pytest.mark.parametrize('label, code', [
+    ("South America (Sao Paulo)", 'sa-east-1'),
+    ("America do Sul (Sao Paulo)", 'sa-east-1'),
+    ("São Paulo", 'sa-east-1'),
+    ("Sao Paulo", 'sa-east-1'),
+    ("América do Sul", 'sa-east-1'),
+    ("South America", 'sa-east-1'),
+    ("São Paulo - Zona Local", 'sa-east-1'),
+    ("SA East (Sao Paulo) Local Zone", 'sa-east-1'),
+    ("US East (N. Virginia) - Local", 'us-east-1'),
+    ("Europe (Frankfurt) eu-central-1", 'eu-central-1'),
+    ("Frankfurt", 'eu-central-1'),
+    ("Oeste do Canadá", 'ca-west-1'),
+    ("AWS GovCloud (US-East)", 'us-gov-east-1'),
+])
+def test_label_variants(label, code):
+    assert resolve_region(label).code == code
+
+@pytest.mark.parametrize('label', [
+    # Mais de uma região com o mesmo nome: não escolher uma delas
+    "Leste dos EUA",
+    "US-East",
+    "Canadá",
+    "Central",
+    "Europa",
+    "Zona local (Lima)",
+])
+def test_unknown_labels_warn(label):
+    resolve_region.cache_clear()
+    with pytest.warns(UserWarning, match='Região desconhecida'):
+        assert resolve_region(label) is None
+    assert region_discount_group(label) == 'demais'
+    assert region_summary_name(label) == label
+
+def test_empty_label_does_not_warn():
+    resolve_region.cache_clear()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert resolve_region("") is None
+        assert resolve_region(float('nan')) is None
+
+@pytest.mark.parametrize('label', ["América do Sul (São Paulo)", "Sao Paulo", "São Paulo", "América do Sul"])
+def test_sao_paulo_variants_get_sao_paulo_discounts(label):
+    df = pd.DataFrame({
+        'Hierarquia de grupos': ["ACME Ltda - 123456789012 > Savings Plans"],
+        'Região': [label],
+        'Serviço': ["AWS Lambda"],
+        'Pagamento adiantado': [0.0],
+        'Mensal': [40.0],
+        'Resumo da configuração': [""]
+    })
+    [item] = process_csv(df)['services_by_region'][label]['Lambda']
+    # Lambda No Upfront: 0,90 em São Paulo (0,88 nas demais regiões)
+    assert item.cost == pytest.approx(36.0)
+    assert region_summary_name(label) == 'São Paulo'